@@ -0,0 +1,319 @@
+#   Copyright:
+#       Copyright 2017 Ahmad RezazadehReyhani
+#
+#       Licensed under the Apache License, Version 2.0 (the 'License');
+#       you may not use this file except in compliance with the License.
+#       You may obtain a copy of the License at
+#
+#          http://www.apache.org/licenses/LICENSE-2.0
+#
+#       Unless required by applicable law or agreed to in writing, software
+#       distributed under the License is distributed on an 'AS IS' BASIS,
+#       WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#       See the License for the specific language governing permissions and
+#       limitations under the License.
+#
+#   Acknowledgment:
+#       Grateful appreciation to the Farhang Wireless Inc. for their support and generously funding the implementation of this library.
+#       http://farhangwireless.com/
+
+
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy
+from fixedpointlib import FXP, FXPArray, dtype, modes
+from fixedpointexpr import lazy
+from fixedpointmath import NCO, CORDIC, reciprocal, sqrt
+
+
+class _DictFXP:
+    # object layout of FXP before __slots__: value and six parameters in the instance __dict__
+    def __init__(self, val, template):
+        self._val   = val
+        self.intg   = template[0]
+        self.frac   = template[1]
+        self.type   = template[2]
+        self.opmode = template[3]
+        self.sat    = template[4]
+        self.round  = template[5]
+
+
+def bytes_per_object(make, n=100000):
+    '''
+    returns the number of allocated bytes per object when n objects are kept in a list
+    the list itself is not counted
+    '''
+    objs = [None]*n
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    for i in range(n):
+        objs[i] = make(i)
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return size/n
+
+
+def bench_memory(n=100000):
+    # returns bytes per scalar object of the __dict__ layout and of the FXP layout
+    # both layouts store the same raw values
+    templ = (3, 12, dtype.fxp, modes.FIXEDWIDTH, True, True)
+    return {'__dict__ layout': bytes_per_object(lambda i: _DictFXP(((i % 4096) - 2048)*4, templ), n),
+            'FXP':             bytes_per_object(lambda i: FXP((i % 4096)/1024 - 2, templ), n),
+            'FXPArray element': FXPArray(numpy.zeros(n), templ)._val.nbytes/n}
+
+
+
+def allocations(fn, number=100):
+    '''
+    returns (peak, retained) bytes per call of fn measured with tracemalloc
+    peak is the largest temporary allocation of a single call, retained is the memory still held after number calls
+    '''
+    fn()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    fn()
+    peak = tracemalloc.get_traced_memory()[1] - start
+    start = tracemalloc.get_traced_memory()[0]
+    for i in range(number):
+        fn()
+    retained = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return peak, retained/number
+
+
+def rate(fn, items=1, duration=0.2, repeat=3):
+    '''
+    returns items per second of fn, best of repeat runs
+    the number of calls per run is calibrated so that one run takes about duration seconds
+    '''
+    number = 1
+    while(True):
+        t = time.perf_counter()
+        for i in range(number):
+            fn()
+        t = time.perf_counter() - t
+        if(t >= duration/4):
+            break
+        number *= 4
+    number = max(1, int(number*duration/t))
+    best = float('inf')
+    for r in range(repeat):
+        t = time.perf_counter()
+        for i in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - t)/number)
+    return items/best
+
+
+def cases(n=100000):
+    '''
+    returns the list of (name, fn, items) benchmark cases
+    items is the number of operations done by one call of fn
+    '''
+    templ = (3, 12, dtype.fxp, modes.FIXEDWIDTH, True, True)
+    other = (7, 6, dtype.fxp, modes.FIXEDFRAC, False, False)
+    a = FXP(1.2345, templ)
+    c = FXP(1.2345, templ)
+    x = numpy.random.RandomState(0).uniform(-4, 4, n)
+    A = FXPArray(x, templ)
+    B = FXPArray(x[::-1], templ)
+    C = A.copy()
+
+    D = FXPArray(x[::2].repeat(2), templ)
+    E = FXPArray(-x, templ)
+    expr = lazy(A, B, C, D, E)
+    expr = ((expr[0]*expr[1]) + (expr[2]*expr[3])) - expr[4]
+
+    nco    = NCO(round(0.01*2**32), templ)
+    cordic = CORDIC(16, (2, 13, dtype.fxp, modes.FIXEDWIDTH, True, True))
+    P      = abs(A)
+
+    xs = list(A[:64])
+    hs = list(B[:64])
+
+    def accumulate():
+        acc = FXP(0, templ)
+        for i in range(64):
+            acc += xs[i] * hs[i]
+
+    def convert():
+        c.convert(template=other)
+        c.convert(template=templ)
+
+    out = [('FXP(float, tuple)',       lambda: FXP(1.2345, templ),  1),
+           ('FXP(float, FXP)',         lambda: FXP(1.2345, a),      1)]
+    for opmode in (modes.FULL, modes.FIXEDFRAC, modes.FIXEDWIDTH):
+        p = FXP(1.2345,  (3, 12, dtype.fxp, opmode, True, True))
+        q = FXP(-0.7654, (3, 12, dtype.fxp, opmode, True, True))
+        out += [('_add ' + opmode, (lambda p, q: lambda: FXP._add(p, q))(p, q), 1),
+                ('_sub ' + opmode, (lambda p, q: lambda: FXP._sub(p, q))(p, q), 1),
+                ('_mul ' + opmode, (lambda p, q: lambda: FXP._mul(p, q))(p, q), 1)]
+    # MANUAL output widths are given with the operation
+    p = FXP(1.2345,  (3, 12, dtype.fxp, modes.MANUAL, True, True))
+    q = FXP(-0.7654, (3, 12, dtype.fxp, modes.MANUAL, True, True))
+    out += [('add ' + modes.MANUAL, lambda: FXP.add(p, q, 4, 12, dtype.fxp, modes.MANUAL), 1),
+            ('sub ' + modes.MANUAL, lambda: FXP.sub(p, q, 4, 12, dtype.fxp, modes.MANUAL), 1),
+            ('mul ' + modes.MANUAL, lambda: FXP.mul(p, q, 6, 12, dtype.fxp, modes.MANUAL), 1)]
+    out += [('_add_dispatch int',      lambda: FXP._add_dispatch(a, 3), 1),
+            ('_sub_dispatch int',      lambda: FXP._sub_dispatch(a, 3), 1),
+            ('_mul_dispatch int',      lambda: FXP._mul_dispatch(a, 3), 1),
+            ('acc += a * b',           accumulate,                      64),
+            ('FXP.dot',                lambda: FXP.dot(xs, hs),         64),
+            ('convert',                convert,                         2),
+            ('to_hex',                 a.to_hex,                        1),
+            ('to_binary',              a.to_binary,                     1),
+            ('FXPArray quantize',      lambda: FXPArray(x, templ),      n),
+            ('FXPArray _add',          lambda: A + B,                   n),
+            ('FXPArray _mul',          lambda: A * B,                   n),
+            ('FXPArray _add out=',     lambda: FXPArray.add(A, B, out=C), n),
+            ('FXPArray (a*b+c*d)-e',   lambda: ((A*B) + (C*D)) - E,     n),
+            ('Expr (a*b+c*d)-e',       expr.evaluate,                   n),
+            ('NCO cos/sin',            lambda: nco(n),                  n),
+            ('CORDIC rotate',          lambda: cordic.rotate(A, B, D),  n),
+            ('reciprocal',             lambda: reciprocal(A, other),    n),
+            ('sqrt',                   lambda: sqrt(P, templ),          n),
+            ('FXPArray to_hex',        A.to_hex,                        n),
+            ('FXPArray to_binary',     A.to_binary,                     n)]
+    return out
+
+
+# cases that use the native kernels of libfixedpointnative.so
+_KERNELS = ('FXPArray quantize', 'FXPArray _add', 'FXPArray _mul', 'FXPArray _add out=', 'FXPArray (a*b+c*d)-e', 'Expr (a*b+c*d)-e')
+
+
+def bench(n=100000, duration=0.2):
+    '''
+    runs all cases and returns a list of result dictionaries
+    the kernel cases are run with and without the native kernels when libfixedpointnative.so is built
+    '''
+    results = []
+    for native in ([False, True] if FXPArray._lib is not None else [False]):
+        FXPArray.native(native)
+        for name, fn, items in cases(n):
+            if(native and name not in _KERNELS):
+                continue
+            if(name in _KERNELS):
+                name += ' (native)' if native else ' (numpy)'
+            peak, retained = allocations(fn, 10 if items > 1 else 1000)
+            results.append({'name': name, 'items': items, 'ops_per_sec': rate(fn, items, duration),
+                            'peak_bytes': peak, 'retained_bytes': retained})
+    FXPArray.native(False)
+    return results
+
+
+_CPP_LINE = re.compile(r'^\s*(.+?)\s*=\s*\[(\d+), (\d+), ([01.]+|float), (\d), (\d), (\d), (\d)\]\s*=\s*(\S+)')
+
+
+def cpp_cases():
+    # returns the values printed by test_fixedpointlib.cpp computed with fixedpointlib.py, keyed by the printed name
+    number1 = -11.123456789
+    number2 = 39.987654321
+    v = {}
+    v['var_1']   = FXP(number1, (30,10,dtype.fxp, modes.FULL,False,False))
+    v['var_2']   = FXP(number1, (10,10,dtype.fxp, modes.FULL,False,False))
+    v['var_3']   = FXP(number1, (9,5,dtype.fxp, modes.FIXEDFRAC,False,False))
+    v['var_4']   = FXP(number2, (7,1,dtype.fxp, modes.FIXEDFRAC,False,False))
+    v['var_5']   = FXP(number2, v['var_4'])
+    v['int_1']   = FXP(-3, (3,0,dtype.int, modes.FIXEDFRAC,False,False))
+    v['uint_1']  = FXP(+3, (3,0,dtype.uint, modes.FIXEDFRAC,False,False))
+    v['var_inf'] = FXP('inf', (7,1,dtype.float, modes.FIXEDFRAC,False,False))
+    v['var_1 + var_2'] = v['var_1'] + v['var_2']
+    v['var_3 + var_4'] = v['var_3'] + v['var_4']
+    v['var_3 - var_4'] = v['var_3'] - v['var_4']
+    v['var_3 * var_4'] = v['var_3'] * v['var_4']
+    v['var_3 + 2']     = v['var_3'] + 2
+    v['3 - var_3']     = 3 - v['var_3']
+    v['5 * var_3']     = 5 * v['var_3']
+    v['add(var_3, var_4, 4, 3)'] = FXP.add(v['var_3'], v['var_4'], 4, 3, dtype.fxp, modes.MANUAL, True, True)
+    v['sub(var_3, var_4, 6, 4)'] = FXP.sub(v['var_3'], v['var_4'], 6, 4, dtype.fxp, modes.MANUAL, False, False)
+    v['mul(var_3, var_4, 9, 2)'] = FXP.mul(v['var_3'], v['var_4'], 9, 2, dtype.fxp, modes.MANUAL, True, True)
+    return v
+
+
+def check_cpp(path):
+    '''
+    runs the C++ test program (build with "make" in the src directory) and compares every printed value with fixedpointlib.py
+    returns the number of compared values and the list of mismatches, or None if the program is not built
+    '''
+    if(not os.path.isfile(path)):
+        return None
+    types  = [dtype.int, dtype.uint, dtype.fxp, dtype.ufxp, dtype.float]
+    opmode = [modes.FULL, modes.FIXEDFRAC, modes.FIXEDWIDTH, modes.MANUAL]
+    v = cpp_cases()
+    checked = 0
+    mismatches = []
+    for line in subprocess.run([path], stdout=subprocess.PIPE, check=True, universal_newlines=True).stdout.splitlines():
+        m = _CPP_LINE.match(line)
+        if(m is None or m.group(1) not in v):
+            continue
+        x = v[m.group(1)]
+        bits = x.to_binary()
+        cpp = (int(m.group(2)), int(m.group(3)), m.group(4), types[int(m.group(5))], opmode[int(m.group(6))],
+               m.group(7) == '1', m.group(8) == '1', float(m.group(9)))
+        # python MANUAL results have no opmode
+        py  = (x.intg, x.frac, bits[bits.find(':')+1:], x.type, x.opmode or modes.MANUAL, x.sat, x.round, x.val())
+        checked += 1
+        if(cpp != py):
+            mismatches.append({'name': m.group(1), 'cpp': line.strip(), 'python': str(py)})
+    return {'checked': checked, 'mismatches': mismatches}
+
+
+def report(run, baseline=None):
+    # prints a benchmark run, with the ratio to a baseline run if given
+    base = {} if baseline is None else {r['name']: r['ops_per_sec'] for r in baseline['results']}
+    print('%-28s %14s %12s %12s' % ('case', 'ops/sec', 'peak B/call', 'kept B/call') + ('  vs base' if base else ''))
+    for r in run['results']:
+        line = '%-28s %14.0f %12.0f %12.1f' % (r['name'], r['ops_per_sec'], r['peak_bytes'], r['retained_bytes'])
+        if(r['name'] in base):
+            line += '  %7.2fx' % (r['ops_per_sec']/base[r['name']])
+        print(line)
+    print()
+    print('memory (bytes per object)')
+    for name, size in run['memory'].items():
+        print('  %-16s: %7.1f' % (name, size))
+    print()
+    if(run['cpp'] is None):
+        print('C++ comparison skipped, test_fixedpointlib.out is not built')
+    else:
+        print('C++ comparison: %d values checked, %d mismatches' % (run['cpp']['checked'], len(run['cpp']['mismatches'])))
+        for m in run['cpp']['mismatches']:
+            print('  %s\n    C++    : %s\n    Python : %s' % (m['name'], m['cpp'], m['python']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='benchmarks of fixedpointlib.py')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--baseline', help='json file of an earlier run to compare with')
+    parser.add_argument('--quick', action='store_true', help='short runs with small arrays')
+    parser.add_argument('--cpp', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_fixedpointlib.out'),
+                        help='path of the C++ test program')
+    args = parser.parse_args(argv)
+
+    n = 1000 if args.quick else 100000
+    run = {'python':   platform.python_version(),
+           'numpy':    numpy.__version__,
+           'machine':  platform.machine(),
+           'time':     time.strftime('%Y-%m-%dT%H:%M:%S'),
+           'results':  bench(n, 0.02 if args.quick else 0.2),
+           'memory':   bench_memory(n),
+           'cpp':      check_cpp(args.cpp)}
+    baseline = None
+    if(args.baseline is not None):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    report(run, baseline)
+    if(args.json is not None):
+        with open(args.json, 'w') as f:
+            json.dump(run, f, indent=1)
+    return 1 if run['cpp'] is not None and run['cpp']['mismatches'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
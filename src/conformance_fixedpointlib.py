@@ -0,0 +1,626 @@
+#   Copyright:
+#       Copyright 2017 Ahmad RezazadehReyhani
+#
+#       Licensed under the Apache License, Version 2.0 (the "License");
+#       you may not use this file except in compliance with the License.
+#       You may obtain a copy of the License at
+#
+#          http://www.apache.org/licenses/LICENSE-2.0
+#
+#       Unless required by applicable law or agreed to in writing, software
+#       distributed under the License is distributed on an "AS IS" BASIS,
+#       WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#       See the License for the specific language governing permissions and
+#       limitations under the License.
+#
+#   Acknowledgment:
+#       Grateful appreciation to the Farhang Wireless Inc. for their support and generously funding the implementation of this library.
+#       http://farhangwireless.com/
+
+
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy
+from fixedpointlib import FXP, FXPArray, Format, dtype, modes
+from fixedpointcpp import build, cpp_format, trace
+
+
+# operations of the harness, codes of the C++ driver are the list indices
+OPS      = ['quantize', 'add', 'sub', 'mul', 'neg', 'abs', 'shl', 'shr', 'copy']
+_BINARY  = ('add', 'sub', 'mul')
+# types and modes in the order of the C++ enums
+_TYPES   = [dtype.int, dtype.uint, dtype.fxp, dtype.ufxp, dtype.float]
+_MODES   = [modes.FULL, modes.FIXEDFRAC, modes.FIXEDWIDTH, modes.MANUAL]
+# widest raw word of fixedpointlib.cpp (double raw words)
+_BITS    = 52
+# block header of the case file: op, n, operand format a (6), operand format b (6), opmode, sat, round, shift
+_HEADER  = 18
+
+_DRIVER = r'''
+// conformance driver of conformance_fixedpointlib.py
+// usage: driver cases.bin results.bin
+//     cases.bin holds blocks of float64 words: a header (op, n, format a, format b, opmode, sat, round, shift)
+//     followed by n operand values a and n operand values b
+//     results.bin receives the output format (6 words) and the n raw words of every block
+//     the time of the operations (without file I/O) is printed in seconds
+
+#include <cstdio>
+#include <ctime>
+#include <vector>
+#include "fixedpointlib.cpp"
+
+enum ops {OP_QUANTIZE, OP_ADD, OP_SUB, OP_MUL, OP_NEG, OP_ABS, OP_SHL, OP_SHR, OP_COPY};
+
+tuple _tuple(const double* h)
+{
+    return tuple((int)h[0], (int)h[1], (dtype)(int)h[2], (modes)(int)h[3], h[4] != 0, h[5] != 0);
+}
+
+int main(int argc, char** argv)
+{
+    if(argc != 3)
+    {
+        cerr << "usage: " << argv[0] << " cases.bin results.bin\n";
+        return 1;
+    }
+    FILE* f = fopen(argv[1], "rb");
+    if(f == NULL)
+    {
+        cerr << "can not read " << argv[1] << "\n";
+        return 1;
+    }
+    fseek(f, 0, SEEK_END);
+    size_t size = (size_t)ftell(f)/sizeof(double);
+    fseek(f, 0, SEEK_SET);
+    vector<double> in(size + 1);
+    if(fread(&in[0], sizeof(double), size, f) != size)
+    {
+        cerr << "can not read " << argv[1] << "\n";
+        return 1;
+    }
+    fclose(f);
+
+    vector<double> out;
+    clock_t elapsed = 0;
+    size_t p = 0;
+    while(p + %(header)d <= size)
+    {
+        const double* h   = &in[p];
+        int op            = (int)h[0];
+        long n            = (long)h[1];
+        tuple ta          = _tuple(h + 2);
+        tuple tb          = _tuple(h + 8);
+        modes opmode      = (modes)(int)h[14];
+        bool sat          = h[15] != 0;
+        bool rounding     = h[16] != 0;
+        int shift         = (int)h[17];
+        const double* va  = h + %(header)d;
+        const double* vb  = va + n;
+        size_t q          = out.size();
+        out.resize(q + 6 + n);
+
+        clock_t start = clock();
+        FXP r;
+        for(long i = 0; i < n; i++)
+        {
+            FXP a(va[i], ta);
+            switch(op)
+            {
+                case OP_QUANTIZE: r = a; break;
+                case OP_ADD:      r = _add(a, FXP(vb[i], tb), opmode, sat, rounding); break;
+                case OP_SUB:      r = _sub(a, FXP(vb[i], tb), opmode, sat, rounding); break;
+                case OP_MUL:      r = _mul(a, FXP(vb[i], tb), opmode, sat, rounding); break;
+                case OP_NEG:      r = -a; break;
+                case OP_ABS:      r = abs(a); break;
+                case OP_SHL:      r = a << shift; break;
+                case OP_SHR:      r = a >> shift; break;
+                default:          r = a.copy(tb);
+            }
+            out[q + 6 + i] = r._val;
+        }
+        elapsed += clock() - start;
+
+        out[q]     = r.intg;
+        out[q + 1] = r.frac;
+        out[q + 2] = r.type;
+        out[q + 3] = r.opmode;
+        out[q + 4] = r.sat;
+        out[q + 5] = r.rounding;
+        p += %(header)d + 2*n;
+    }
+
+    f = fopen(argv[2], "wb");
+    if((f == NULL) || (fwrite(&out[0], sizeof(double), out.size(), f) != out.size()))
+    {
+        cerr << "can not write " << argv[2] << "\n";
+        return 1;
+    }
+    fclose(f);
+    printf("%%.9f\n", double(elapsed)/CLOCKS_PER_SEC);
+    return 0;
+}
+''' % {'header': _HEADER}
+
+
+class Block:
+    '''
+    Block of test cases which share the operation and the formats
+    op is one of OPS, fa and fb are the operand formats (fb is the output template of copy), opmode, sat and round are the
+    parameters of add, sub and mul, shift is the shift of shl and shr, a and b are float64 arrays of operand values
+    '''
+    def __init__(self, op, fa, fb, opmode, sat, round, shift, a, b):
+        self.op     = op
+        self.fa     = fa
+        self.fb     = fb
+        self.opmode = opmode
+        self.sat    = sat
+        self.round  = round
+        self.shift  = shift
+        self.a      = a
+        self.b      = b
+
+    def case(self, i):
+        # returns the block of the single case i
+        return Block(self.op, self.fa, self.fb, self.opmode, self.sat, self.round, self.shift, self.a[i:i+1], self.b[i:i+1])
+
+    def header(self):
+        # returns the header words of the block in the C++ driver layout
+        words = [OPS.index(self.op), len(self.a)]
+        for fmt in (self.fa, self.fb):
+            words += [fmt.intg, fmt.frac, _TYPES.index(fmt.type), _MODES.index(fmt.opmode or modes.MANUAL), fmt.sat, fmt.round]
+        return words + [_MODES.index(self.opmode), self.sat, self.round, self.shift]
+
+    def __str__(self):
+        # the first case of the block
+        s = '%s a=%r %s' % (self.op, float(self.a[0]), tuple(self.fa))
+        if(self.op in _BINARY):
+            s += ' b=%r %s opmode=%s sat=%s round=%s' % (float(self.b[0]), tuple(self.fb), self.opmode, self.sat, self.round)
+        elif(self.op == 'copy'):
+            s += ' template=%s' % (tuple(self.fb),)
+        elif(self.op in ('shl', 'shr')):
+            s += ' shift=%d' % self.shift
+        return s
+
+
+def _format(rng, type, bits):
+    # private function, returns a random format of given type with at most bits integer and fractional bits
+    sat, round = bool(rng.integers(2)), bool(rng.integers(2))
+    mode = _MODES[rng.integers(3)]
+    if(type == dtype.float):
+        return Format(0, 0, type, mode, sat, round)
+    width = int(rng.integers(1, bits + 1))
+    if(type == dtype.int or type == dtype.uint):
+        return Format(width, 0, type, mode, sat, round)
+    frac = int(rng.integers(0, width + 1))
+    return Format(width - frac, frac, type, mode, sat, round)
+
+
+def _values(rng, fmt, n):
+    '''
+    private function
+    returns n random operand values for format fmt: representable values, values out of range in both directions,
+    rounding ties, the range limits and their neighbours, zero and the special inputs inf and -inf
+    '''
+    if(fmt.type == dtype.float):
+        return rng.standard_normal(n) * 2.0**rng.integers(-20, 20, n)
+    lo, hi, scale = float(fmt.lo), float(fmt.hi), float(fmt.scale)
+    span = float(fmt.mask + 1)
+    kind = rng.integers(0, 8, n)
+    raw  = numpy.floor(rng.uniform(lo, hi + 1, n))
+    val  = numpy.where(kind == 0, rng.uniform(lo - span, hi + span, n), raw)
+    val  = numpy.where(kind == 1, raw + 0.5, val)
+    val  = numpy.where(kind == 2, rng.uniform(lo - span, hi + span, n), val)
+    val  = numpy.where(kind == 3, rng.choice([lo, hi, lo - 1, hi + 1, 0.0], n), val)
+    val  = val / scale
+    val  = numpy.where(kind == 4, rng.choice([numpy.inf, -numpy.inf, 0.0], n), val)
+    if(not fmt.signed):
+        # values of uint and ufxp objects must be non-negative
+        val = numpy.abs(val)
+    return val
+
+
+def generate(rng, n, size=4096, ops=OPS):
+    '''
+    public function
+    returns a list of blocks with n random test cases in total, size cases per block
+    every block draws the operation, the operand types and formats, the opmode, sat and round of the operation and
+    the shift, formats are limited to the raw words of fixedpointlib.cpp (52 bits including the result)
+    '''
+    blocks = []
+    while(n > 0):
+        m = min(n, size)
+        op = ops[rng.integers(len(ops))]
+        if(rng.random() < 0.05 and op not in ('shl', 'shr')):
+            ta = tb = dtype.float
+        else:
+            fixed = [dtype.int, dtype.uint, dtype.fxp, dtype.ufxp]
+            ta, tb = fixed[rng.integers(4)], fixed[rng.integers(4)]
+            if(op == 'neg'):
+                # negative values of unsigned objects are not defined
+                ta = (dtype.int, dtype.fxp)[rng.integers(2)]
+        shift = int(rng.integers(1, 9))
+        bits = {'mul': _BITS - 1, 'add': _BITS - 1, 'sub': _BITS - 1, 'shl': _BITS - 8}.get(op, _BITS)
+        fa = _format(rng, ta, bits)
+        # exact products must fit in the raw words, the operand widths of mul are drawn up to a 52-bit product
+        fb = _format(rng, tb, _BITS - fa.intg - fa.frac if op == 'mul' else bits)
+        while(op in ('add', 'sub') and max(fa.intg, fb.intg) + max(fa.frac, fb.frac) + 1 > _BITS):
+            # aligned sums must fit in the raw words
+            fb = _format(rng, tb, bits)
+        blocks.append(Block(op, fa, fb, _MODES[rng.integers(4)], bool(rng.integers(2)), bool(rng.integers(2)), shift,
+                            _values(rng, fa, m), _values(rng, fb, m)))
+        n -= m
+    return blocks
+
+
+def python_format(block):
+    # public function, returns the output format of the block by the rules of fixedpointlib.py
+    op, fa = block.op, block.fa
+    if(op in _BINARY):
+        return FXP._infer_format(op, fa, block.fb, 0, 0, None, block.opmode, block.sat, block.round)
+    elif(op == 'shl'):
+        return Format(fa.intg + block.shift, max(fa.frac - block.shift, 0), fa.type, fa.opmode, fa.sat, fa.round)
+    elif(op == 'shr'):
+        return Format(max(fa.intg - block.shift, 0), fa.frac + block.shift, fa.type, fa.opmode, fa.sat, fa.round)
+    elif(op == 'copy'):
+        return block.fb
+    return fa
+
+
+def python_array(block, fmt=None):
+    '''
+    public function
+    evaluates the block with FXPArray objects and returns the output object
+    for add, sub and mul, fmt overrides the output format (the format of the C++ result where the rules differ)
+    '''
+    a = FXPArray(block.a, block.fa)
+    op = block.op
+    if(op in _BINARY):
+        b = FXPArray(block.b, block.fb)
+        if(fmt is None):
+            return getattr(FXPArray, op)(a, b, opmode=block.opmode, sat=block.sat, round=block.round)
+        return getattr(FXPArray, op)(a, b, fmt.intg, fmt.frac, fmt.type, modes.MANUAL, fmt.sat, fmt.round)
+    elif(op == 'neg'):
+        return -a
+    elif(op == 'abs'):
+        return abs(a)
+    elif(op == 'shl'):
+        return a << block.shift
+    elif(op == 'shr'):
+        return a >> block.shift
+    elif(op == 'copy'):
+        return a.copy(block.fb)
+    return a
+
+
+def python_scalar(block, i):
+    # public function, evaluates case i of the block with FXP objects and returns the output object
+    a = FXP(float(block.a[i]), block.fa)
+    op = block.op
+    if(op in _BINARY):
+        return getattr(FXP, op)(a, FXP(float(block.b[i]), block.fb), opmode=block.opmode, sat=block.sat, round=block.round)
+    elif(op == 'neg'):
+        return -a
+    elif(op == 'abs'):
+        return abs(a)
+    elif(op == 'shl'):
+        return a << block.shift
+    elif(op == 'shr'):
+        return a >> block.shift
+    elif(op == 'copy'):
+        return a.copy(block.fb)
+    return a
+
+
+class Driver:
+    '''
+    C++ engine of the harness
+    the driver program is generated once, compiled against fixedpointlib.cpp by fixedpointcpp.build() and evaluates
+    all blocks of a batch in one process, cases and results are exchanged through float64 files
+    '''
+    def __init__(self):
+        self.path    = build(_DRIVER)
+        self.seconds = 0.0
+        self.wall    = 0.0
+
+    def __call__(self, blocks):
+        '''
+        public method
+        evaluates the blocks and returns a list of (format, raw words) pairs, one pair per block
+        '''
+        words = []
+        for block in blocks:
+            words.append(numpy.array(block.header(), dtype=numpy.float64))
+            words.append(block.a)
+            words.append(block.b)
+        start = time.perf_counter()
+        with tempfile.TemporaryDirectory() as tmp:
+            fin  = os.path.join(tmp, 'cases.bin')
+            fout = os.path.join(tmp, 'results.bin')
+            numpy.concatenate(words).tofile(fin)
+            run = subprocess.run([self.path, fin, fout], stdout=subprocess.PIPE, check=True, universal_newlines=True)
+            out = numpy.fromfile(fout, dtype=numpy.float64)
+        self.wall    += time.perf_counter() - start
+        self.seconds += float(run.stdout)
+        results = []
+        p = 0
+        for block in blocks:
+            h = out[p:p+6]
+            fmt = Format(int(h[0]), int(h[1]), _TYPES[int(h[2])], _MODES[int(h[3])], bool(h[4]), bool(h[5]))
+            results.append((fmt, out[p+6:p+6+len(block.a)]))
+            p += 6 + len(block.a)
+        return results
+
+
+def _same_format(fp, fc):
+    # private function, compares a python format and a C++ format, python MANUAL results have no opmode
+    return tuple(fp)[:3] + tuple(fp)[4:] == tuple(fc)[:3] + tuple(fc)[4:] and (fp.opmode or modes.MANUAL) == fc.opmode
+
+
+def _rule(block):
+    # private function, returns the output format of fixedpointlib.cpp for add, sub and mul, see fixedpointcpp.cpp_format
+    f = cpp_format(block.op, block.fa, block.fb, block.opmode, block.sat, block.round)
+    return Format(*f)
+
+
+def compare(block, result):
+    '''
+    public function
+    compares the python and C++ results of a block and returns (kind, mismatching case indices, python raw words)
+    kind is 'format' when the output formats differ, 'value' when raw words differ, 'rule' when the formats differ by the
+    documented C++ format rules of add, sub and mul (differences of unsigned operands and MANUAL mode) and the raw words
+    agree in the C++ format, None when both agree
+    '''
+    fc, raw = result
+    fp = python_format(block)
+    kind = 'value'
+    if(not _same_format(fp, fc)):
+        if(block.op in _BINARY and tuple(_rule(block)) == tuple(fc)):
+            kind = 'rule'
+            y = python_array(block, fc)
+        else:
+            return 'format', numpy.arange(len(raw)), None
+    else:
+        y = python_array(block)
+    ref = y._val.astype(numpy.float64)
+    bad = numpy.flatnonzero(ref != raw)
+    if(len(bad)):
+        return 'value', bad, ref
+    return (kind if kind == 'rule' else None), bad, ref
+
+
+def _fails(blocks, driver):
+    # private function, returns True for the single case blocks which still mismatch
+    results = driver(blocks)
+    return [compare(b, r)[0] in ('value', 'format') for b, r in zip(blocks, results)]
+
+
+def _shrink_format(fmt, index, value):
+    # private function, returns the format with one parameter replaced, None for invalid formats
+    if(value is not False and value < 0):
+        return None
+    fmt = fmt._with(index, value)
+    if(not fmt.signed and fmt.intg + fmt.frac < 1):
+        return None
+    return fmt
+
+
+def _simpler(x):
+    # private function, returns simpler operand values of x: zero, integer part, one fractional bit less, half
+    out = [0.0, float(numpy.trunc(x)), x/2]
+    if(numpy.isinf(x)):
+        return [0.0]
+    k = 0
+    while(k < 60 and x*2.0**k != numpy.floor(x*2.0**k)):
+        k += 1
+    if(k > 0):
+        out.append(float(numpy.floor(x*2.0**(k-1))/2.0**(k-1)))
+    return [v for v in out if v != x]
+
+
+def candidates(case):
+    '''
+    public function
+    returns the single case blocks which are one step simpler than case: narrower operand formats, truncation and wrap
+    around instead of rounding and saturation, FULL mode, smaller shifts and simpler operand values
+    '''
+    out = []
+    c = case
+    for v in _simpler(float(c.a[0])):
+        out.append(Block(c.op, c.fa, c.fb, c.opmode, c.sat, c.round, c.shift, numpy.array([v]), c.b))
+    if(c.op in _BINARY):
+        for v in _simpler(float(c.b[0])):
+            out.append(Block(c.op, c.fa, c.fb, c.opmode, c.sat, c.round, c.shift, c.a, numpy.array([v])))
+    names = ('fa', 'fb') if (c.op in _BINARY or c.op == 'copy') else ('fa',)
+    for name in names:
+        fmt = getattr(c, name)
+        if(fmt.type == dtype.float):
+            continue
+        for index, value in ((0, fmt.intg - 1), (1, fmt.frac - 1), (4, False), (5, False)):
+            f = _shrink_format(fmt, index, value)
+            if(f is not None and f != fmt):
+                fa, fb = (f, c.fb) if name == 'fa' else (c.fa, f)
+                out.append(Block(c.op, fa, fb, c.opmode, c.sat, c.round, c.shift, c.a, c.b))
+    if(c.op in _BINARY):
+        if(c.opmode != modes.FULL):
+            out.append(Block(c.op, c.fa, c.fb, modes.FULL, c.sat, c.round, c.shift, c.a, c.b))
+        if(c.sat):
+            out.append(Block(c.op, c.fa, c.fb, c.opmode, False, c.round, c.shift, c.a, c.b))
+        if(c.round):
+            out.append(Block(c.op, c.fa, c.fb, c.opmode, c.sat, False, c.shift, c.a, c.b))
+    if(c.op in ('shl', 'shr') and c.shift > 1):
+        out.append(Block(c.op, c.fa, c.fb, c.opmode, c.sat, c.round, c.shift - 1, c.a, c.b))
+    return out
+
+
+def minimize(case, driver, rounds=200):
+    '''
+    public function
+    shrinks a mismatching single case block greedily: every round evaluates all simpler candidates in one batch of the
+    C++ driver and keeps the first one which still mismatches, until no candidate mismatches
+    '''
+    for k in range(rounds):
+        cands = candidates(case)
+        if(not cands):
+            break
+        fails = _fails(cands, driver)
+        if(not any(fails)):
+            break
+        case = cands[fails.index(True)]
+    return case
+
+
+def describe(case, driver):
+    # public function, returns the report line of a mismatching single case block with the results of both libraries
+    fc, raw = driver([case])[0]
+    fp = python_format(case)
+    s = '    %s\n' % case
+    try:
+        y = python_array(case)
+        s += '        python: raw %d %s\n' % (int(y._val[0]), tuple(fp))
+    except Exception as e:
+        s += '        python: %s\n' % e
+    s += '        C++   : raw %d %s' % (int(raw[0]), tuple(fc))
+    return s
+
+
+def traced(rng, n=50, programs=2, size=4096):
+    '''
+    public function
+    checks the product width limit of traced programs (fixedpointcpp.trace): n random mul models with products wider than
+    52 bits must be rejected, models with products of exactly 52 bits are compiled and must be bit-exact to simulate()
+    returns a dictionary of the counters
+    '''
+    fixed = [dtype.int, dtype.uint, dtype.fxp, dtype.ufxp]
+    result = {'wide': n, 'rejected': 0, 'programs': programs, 'mismatches': 0}
+    for k in range(n + programs):
+        fa = _format(rng, fixed[rng.integers(4)], _BITS - 1)
+        wide = k < n
+        # wide products have 53 to 2*52 bits, the others exactly 52 bits
+        bits = int(rng.integers(_BITS + 1 - fa.intg - fa.frac, _BITS + 1)) if wide else _BITS - fa.intg - fa.frac
+        tb = fixed[rng.integers(4)]
+        frac = 0 if tb in (dtype.int, dtype.uint) else int(rng.integers(0, bits + 1))
+        fb = Format(bits - frac, frac, tb, fa.opmode, fa.sat, fa.round)
+        try:
+            prog = trace(lambda a, b: a*b, [fa, fb])
+        except Exception:
+            result['rejected'] += int(wide)
+            continue
+        if(not wide):
+            a, b = _values(rng, fa, size), _values(rng, fb, size)
+            result['mismatches'] += int(not numpy.array_equal(prog.run(a, b)._val, prog.simulate(a, b)._val))
+    return result
+
+
+def run(n, seed=0, size=4096, batch=100, scalar=20000, ops=OPS, minimize_count=10, log=sys.stdout):
+    '''
+    public function
+    generates n random cases in blocks of size cases, evaluates them with fixedpointlib.py (FXPArray objects, and FXP
+    objects for the first scalar cases) and with fixedpointlib.cpp (batch blocks per driver run), compares the output
+    formats and raw words and minimizes the first mismatch of every (operation, kind) group, the product width limit of
+    traced programs is checked by traced()
+    returns a dictionary of the counters, throughputs and minimized cases
+    '''
+    rng    = numpy.random.default_rng(seed)
+    driver = Driver()
+    counts = {}
+    groups = {}
+    total  = 0
+    tarray = 0.0
+    tscal  = 0.0
+    nscal  = 0
+    scalar_mismatches = 0
+    remaining = n
+    while(remaining > 0):
+        blocks = generate(rng, min(remaining, size*batch), size, ops)
+        remaining -= sum(len(b.a) for b in blocks)
+        results = driver(blocks)
+        for block, result in zip(blocks, results):
+            start = time.perf_counter()
+            kind, bad, ref = compare(block, result)
+            tarray += time.perf_counter() - start
+            total += len(block.a)
+            key = (block.op, kind)
+            if(kind is not None):
+                counts[key] = counts.get(key, 0) + (len(bad) if kind != 'rule' else len(block.a))
+            if(kind in ('value', 'format') and key not in groups):
+                groups[key] = block.case(int(bad[0]))
+            # scalar FXP objects are checked against the FXPArray result of the same format
+            m = min(len(block.a), scalar - nscal)
+            if(m > 0 and ref is not None and kind != 'rule'):
+                start = time.perf_counter()
+                y = [python_scalar(block, i)._val for i in range(m)]
+                tscal += time.perf_counter() - start
+                nscal += m
+                scalar_mismatches += int(numpy.count_nonzero(numpy.array(y, dtype=numpy.float64) != ref[:m]))
+        log.write('\r%d cases' % total)
+        log.flush()
+    log.write('\n')
+
+    cases = []
+    for key in sorted(groups)[:minimize_count]:
+        cases.append(describe(minimize(groups[key], driver), driver))
+    return {'cases':    total,
+            'seed':     seed,
+            'mismatches': dict(('%s/%s' % k, v) for k, v in counts.items() if k[1] != 'rule'),
+            'rules':    dict(('%s/%s' % k, v) for k, v in counts.items() if k[1] == 'rule'),
+            'scalar':   {'cases': nscal, 'mismatches': scalar_mismatches},
+            'minimized': cases,
+            'traced':   traced(rng, programs=2, size=min(size, 1024)),
+            'throughput': {'FXP':                  nscal/tscal if tscal else None,
+                           'FXPArray':             total/tarray,
+                           'C++':                  total/driver.seconds if driver.seconds else None,
+                           'C++ with file I/O':    total/driver.wall}}
+
+
+def report(result, log=sys.stdout):
+    # public function, prints the result of run()
+    log.write('\n%d cases, seed %d\n' % (result['cases'], result['seed']))
+    log.write('\nthroughput (cases/sec)\n')
+    for name, value in result['throughput'].items():
+        log.write('  %-18s: %s\n' % (name, '-' if value is None else '%12.0f' % value))
+    log.write('\nformat rule differences of fixedpointlib.cpp (results agree in the C++ format)\n')
+    for key, value in sorted(result['rules'].items()):
+        log.write('  %-18s: %d\n' % (key, value))
+    log.write('\nFXP vs FXPArray: %d cases checked, %d mismatches\n' % (result['scalar']['cases'], result['scalar']['mismatches']))
+    t = result['traced']
+    log.write('\ntraced products wider than 52 bits: %d of %d rejected\n' % (t['rejected'], t['wide']))
+    log.write('traced 52-bit products: %d programs checked, %d mismatches\n' % (t['programs'], t['mismatches']))
+    log.write('\npython vs C++ mismatches\n')
+    if(not result['mismatches']):
+        log.write('  none\n')
+    for key, value in sorted(result['mismatches'].items()):
+        log.write('  %-18s: %d\n' % (key, value))
+    if(result['minimized']):
+        log.write('\nminimized mismatches\n')
+        for s in result['minimized']:
+            log.write(s + '\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='randomized differential test of fixedpointlib.py and fixedpointlib.cpp')
+    parser.add_argument('--cases', type=int, default=1000000, help='number of test cases')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random generator')
+    parser.add_argument('--block', type=int, default=4096, help='cases per block (one operation and one set of formats)')
+    parser.add_argument('--scalar', type=int, default=20000, help='number of cases which are also checked with FXP objects')
+    parser.add_argument('--ops', default=','.join(OPS), help='comma separated list of operations')
+    parser.add_argument('--minimize', type=int, default=10, help='number of mismatch groups to minimize')
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args(argv)
+
+    result = run(args.cases, args.seed, args.block, scalar=args.scalar, ops=args.ops.split(','), minimize_count=args.minimize)
+    report(result)
+    if(args.json is not None):
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=1)
+    t = result['traced']
+    return 1 if (result['mismatches'] or result['scalar']['mismatches'] or t['mismatches'] or t['rejected'] != t['wide']) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,443 @@
+#   Copyright:
+#       Copyright 2017 Ahmad RezazadehReyhani
+#
+#       Licensed under the Apache License, Version 2.0 (the "License");
+#       you may not use this file except in compliance with the License.
+#       You may obtain a copy of the License at
+#
+#          http://www.apache.org/licenses/LICENSE-2.0
+#
+#       Unless required by applicable law or agreed to in writing, software
+#       distributed under the License is distributed on an "AS IS" BASIS,
+#       WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#       See the License for the specific language governing permissions and
+#       limitations under the License.
+#
+#   Acknowledgment:
+#       Grateful appreciation to the Farhang Wireless Inc. for their support and generously funding the implementation of this library.
+#       http://farhangwireless.com/
+
+
+import hashlib
+import os
+import subprocess
+import tempfile
+import numpy
+from contextlib import contextmanager
+from fixedpointlib import FXP, FXPArray, Format, dtype, modes
+from fixedpointexpr import Expr, _order
+
+
+# directory of fixedpointlib.cpp
+_SRC   = os.path.dirname(os.path.abspath(__file__))
+# compiler command, same flags as src/Makefile, debug checks of fixedpointlib.cpp are disabled
+CXX    = ['g++', '-O3', '-Wall', '-std=c++03', '-march=native', '-DNDEBUG']
+# C++ names of the types and modes
+_TYPES = {dtype.int: 'd_INT', dtype.uint: 'd_UINT', dtype.fxp: 'd_FXP', dtype.ufxp: 'd_UFXP', dtype.float: 'd_FLOAT'}
+_MODES = {modes.FULL: 'FULL', modes.FIXEDFRAC: 'FIXEDFRAC', modes.FIXEDWIDTH: 'FIXEDWIDTH', modes.MANUAL: 'MANUAL', None: 'MANUAL'}
+
+
+def cpp_format(op, a, b, opmode, sat, round):
+    '''
+    public function
+    returns the output format of _add, _sub or _mul of fixedpointlib.cpp on operands with formats a and b
+    the C++ rules differ from FXP._infer_format in the type of differences of unsigned operands and in MANUAL mode
+    '''
+    temp = (a.type, b.type)
+    if(temp == (dtype.float, dtype.float)):
+        type = dtype.float
+    elif(temp == (dtype.uint, dtype.uint)):
+        type = dtype.int if op == 'sub' else dtype.uint
+    elif(temp == (dtype.uint, dtype.int) or temp == (dtype.int, dtype.uint)):
+        type = dtype.int
+    elif(temp == (dtype.uint, dtype.ufxp) or temp == (dtype.ufxp, dtype.uint)):
+        type = dtype.fxp if op == 'sub' else dtype.ufxp
+    else:
+        type = dtype.fxp
+    if((a.type == dtype.uint or a.type == dtype.int) and (b.type == dtype.ufxp or b.type == dtype.fxp)):
+        frac = b.frac
+    elif((b.type == dtype.uint or b.type == dtype.int) and (a.type == dtype.ufxp or a.type == dtype.fxp)):
+        frac = a.frac
+    else:
+        frac = min(a.frac, b.frac)
+    intg = 0
+    if(opmode == modes.FULL):
+        intg = a.intg + b.intg if op == 'mul' else max(a.intg, b.intg) + 1
+        frac = a.frac + b.frac if op == 'mul' else max(a.frac, b.frac)
+    elif(opmode == modes.FIXEDFRAC):
+        intg = a.intg + b.intg if op == 'mul' else max(a.intg, b.intg) + 1
+    elif(opmode == modes.FIXEDWIDTH):
+        intg = max(a.intg, b.intg)
+    else:
+        frac = 0
+    return (intg, frac, type, opmode, sat, round)
+
+
+def _number(v):
+    # private function, returns the C++ literal of a float value or an integer raw word
+    if(v == numpy.inf):
+        return 'inf'
+    elif(v == -numpy.inf):
+        return '-inf'
+    return repr(float(v))
+
+
+# operations of FXP objects with Expr operands during tracing, same formats as the FXP operations
+_TRACED = {'__add__':  lambda a, b: Expr._binary('add', Expr(a), b),
+           '__sub__':  lambda a, b: Expr._binary('sub', Expr(a), b),
+           '__mul__':  lambda a, b: Expr._binary('mul', Expr(a), b),
+           '__iadd__': lambda a, b: Expr._inplace('add', Expr(a), b),
+           '__isub__': lambda a, b: Expr._inplace('sub', Expr(a), b),
+           '__imul__': lambda a, b: Expr._inplace('mul', Expr(a), b),
+           'add':      Expr.add,
+           'sub':      Expr.sub,
+           'mul':      Expr.mul}
+
+
+@contextmanager
+def _tracing():
+    '''
+    private function
+    FXP operators and FXP.add/sub/mul return Expr nodes inside the with block when one of the operands is an Expr object,
+    so models which combine their inputs with FXP objects (coefficients, accumulators, acc += x*h) are traced.
+    the methods are swapped in the same way as FXP.shadow() and restored at the end of the block.
+    '''
+    plain = dict((name, FXP.__dict__[name]) for name in _TRACED)
+
+    def traced(name):
+        def method(a, b, *args, **kwargs):
+            if(isinstance(a, Expr) or isinstance(b, Expr)):
+                return _TRACED[name](a, b, *args, **kwargs)
+            return plain[name](a, b, *args, **kwargs)
+        return method
+    for name in _TRACED:
+        setattr(FXP, name, traced(name))
+    try:
+        yield
+    finally:
+        for name in _TRACED:
+            setattr(FXP, name, plain[name])
+
+
+class Program:
+    '''
+    Traced fixedpoint model compiled to C++
+    The model is a python function of FXP objects which computes one sample, it is called once on Expr leaves (see
+    fixedpointexpr.py) and the recorded graph of operations is emitted as a C++ translation unit which uses the FXP class,
+    tuple and _add/_sub/_mul of fixedpointlib.cpp. Every operation of the C++ program has the output format of the
+    traced operation: _add/_sub/_mul are called with the opmode, sat and round of the operation, or with the output tuple
+    where the C++ format rules differ (differences of unsigned operands, MANUAL mode, custom output parameters, in place
+    operators), right shifts are converted to the output tuple. Values follow the arithmetic of fixedpointlib.cpp (double
+    raw words, up to 52 bits), see bench_fixedpointlib.py --cpp for a comparison of both libraries. Models with products
+    (sum of the operand widths) or aligned sums wider than 52 bits are rejected, they would be rounded in double before
+    requantization.
+
+    Parameters:
+    - model     : function model(*inputs, *state) which returns an output or a tuple of outputs followed by the next
+                  values of the state registers. Models use the operators of FXP objects (+, -, *, +=, -=, *=, unary -,
+                  abs, <<, >>), copy(template) and FXP.add/sub/mul with output parameters. FXP objects which are not
+                  inputs (coefficients) are compiled as constants.
+    - inputs    : list of templates of the inputs, one value per sample
+    - state     : list of FXP objects, initial values of the registers which are carried from one sample to the next,
+                  the next values are converted to the formats of the registers
+
+    compile() builds the program with the local g++ (flags of src/Makefile), programs are cached per user by their source code.
+    run() streams numpy input buffers (FXPArray objects or values) through the program via raw word files and returns
+    the outputs as FXPArray objects. simulate() runs the same model sample by sample with FXP objects.
+
+    Example:
+        h = [FXP(c, templ) for c in (0.25, 0.5, 0.25)]
+        def fir3(x, d1, d2):
+            y = x*h[0] + d1*h[1] + d2*h[2]
+            return y.copy(templ), x, d1
+        prog = Program(fir3, [templ], state=[FXP(0, templ), FXP(0, templ)])
+        print(prog.source())
+        y = prog.run(numpy.sin(0.1*numpy.arange(1000000)))
+    '''
+    def __init__(self, model, inputs, state=()):
+        self.model   = model
+        self.inputs  = [Format.of(t) for t in inputs]
+        self.state   = [s.copy() for s in state]
+        self.path    = None
+        self._source = None
+        self._trace()
+
+    def _trace(self):
+        '''
+        private method
+        calls the model on leaves of placeholder objects and records the output, state update and constant nodes, see _tracing
+        '''
+        self._leaves = [Expr(FXP(0, fmt)) for fmt in self.inputs]
+        self._regs   = [Expr(s) for s in self.state]
+        with _tracing():
+            result = self.model(*(self._leaves + self._regs))
+        if(not isinstance(result, tuple)):
+            result = (result,)
+        if(len(result) <= len(self.state)):
+            raise Exception("model must return its outputs followed by the next state values")
+        result = [r if isinstance(r, Expr) else Expr(r) for r in result]
+        k = len(result) - len(self.state)
+        self.outputs = result[:k]
+        self._next   = [r if r.fmt is s.fmt else r.copy(s.fmt) for r, s in zip(result[k:], self.state)]
+        self.formats = [r.fmt for r in self.outputs]
+        order, index = _order(self.outputs + self._next)
+        for node in order:
+            if(node.op == 'leaf' and isinstance(node.obj, FXPArray)):
+                raise Exception("FXPArray objects are not supported in traced models, use one FXP object per sample")
+            if(node.fmt.type != dtype.float and node.fmt.intg + node.fmt.frac > 52):
+                raise Exception("fixedpointlib.cpp supports up to 52-bit fixedpoint variables")
+            if(node.op in ('add', 'sub', 'mul') and node.fmt.type != dtype.float):
+                # exact products and aligned sums are computed in double before they are requantized
+                fa, fb = node.args[0].fmt, node.args[1].fmt
+                if(node.op == 'mul'):
+                    bits = fa.intg + fa.frac + fb.intg + fb.frac
+                else:
+                    bits = max(fa.intg, fb.intg) + max(fa.frac, fb.frac) + 1
+                if(bits > 52):
+                    raise Exception("fixedpointlib.cpp computes exact results of up to 52 bits, %s of the traced model needs %d bits" % (node.op, bits))
+        self._order, self._index = order, index
+
+    def source(self):
+        # public method, returns the C++ translation unit of the traced model
+        if(self._source is None):
+            self._source = self._emit()
+        return self._source
+
+    def _tuple(self, fmt):
+        # private method, returns the C++ expression of the tuple of format fmt
+        return 'tuple(%d, %d, %s, %s, %s, %s)' % (fmt.intg, fmt.frac, _TYPES[fmt.type], _MODES[fmt.opmode],
+                                                  'true' if fmt.sat else 'false', 'true' if fmt.round else 'false')
+
+    def _statement(self, node, names, formats):
+        # private method, returns the C++ expression of a node from the names of its operands
+        op   = node.op
+        args = [names[id(a)] for a in node.args]
+        fmt  = node.fmt
+        T    = formats[fmt]
+        if(op in ('add', 'sub', 'mul')):
+            fa, fb = node.args[0].fmt, node.args[1].fmt
+            if(cpp_format(op, fa, fb, fmt.opmode, fmt.sat, fmt.round) == tuple(fmt) and fmt.opmode is not None):
+                return '_%s(%s, %s, %s, %s, %s)' % (op, args[0], args[1], _MODES[fmt.opmode], 'true' if fmt.sat else 'false', 'true' if fmt.round else 'false')
+            return '_%s(%s, %s, %s)' % (op, args[0], args[1], T)
+        elif(op == 'neg'):
+            return '-' + args[0]
+        elif(op == 'abs'):
+            return 'abs(%s)' % args[0]
+        elif(op == 'shl'):
+            return '%s << %d' % (args[0], node.shift)
+        elif(op == 'shr'):
+            return 'FXP(%s.val() / double(((int64_t)1) << %d), %s)' % (args[0], node.shift, T)
+        elif(op == 'zero'):
+            return 'FXP(0, %s)' % T
+        return '%s.copy(%s)' % (args[0], T)
+
+    def _emit(self):
+        # private method, generates the C++ translation unit, see source()
+        order   = self._order
+        inputs  = dict((id(leaf), k) for k, leaf in enumerate(self._leaves))
+        regs    = dict((id(leaf), k) for k, leaf in enumerate(self._regs))
+        formats = {}
+        for node in order:
+            if(node.fmt not in formats):
+                formats[node.fmt] = 'T%d' % len(formats)
+        names = {}
+        lines = ['// generated by fixedpointcpp.py from model ' + getattr(self.model, '__name__', 'model'),
+                 '// usage: program inputs.bin outputs.bin samples',
+                 '//     inputs.bin holds the raw words (values for float type) of every input as float64, one input after the other',
+                 '//     outputs.bin receives the raw words of every output in the same layout',
+                 '',
+                 '#include <cstdio>',
+                 '#include <cstdlib>',
+                 '#include <vector>',
+                 '#include "fixedpointlib.cpp"',
+                 '']
+        for fmt, name in formats.items():
+            lines.append('tuple %s = %s;' % (name, self._tuple(fmt)))
+        lines += ['',
+                  '// returns an object of the given template with raw word raw',
+                  'FXP _raw(double raw, tuple templ)',
+                  '{',
+                  '    FXP a;',
+                  '    a._read_template(templ);',
+                  '    a._set_bounds();',
+                  '    a._val = raw;',
+                  '    return a;',
+                  '}',
+                  '',
+                  'int main(int argc, char** argv)',
+                  '{',
+                  '    if(argc != 4)',
+                  '    {',
+                  '        cerr << "usage: " << argv[0] << " inputs.bin outputs.bin samples\\n";',
+                  '        return 1;',
+                  '    }',
+                  '    long n = atol(argv[3]);',
+                  '    vector<double> in(%d*n + 1), out(%d*n + 1);' % (len(self.inputs), len(self.outputs)),
+                  '    FILE* f = fopen(argv[1], "rb");',
+                  '    if((f == NULL) || (fread(&in[0], sizeof(double), %d*n, f) != (size_t)(%d*n)))' % (len(self.inputs), len(self.inputs)),
+                  '    {',
+                  '        cerr << "can not read " << argv[1] << "\\n";',
+                  '        return 1;',
+                  '    }',
+                  '    fclose(f);',
+                  '']
+        # constants and registers are set once, before the loop
+        for i, node in enumerate(order):
+            if(node.op != 'leaf' or id(node) in inputs):
+                continue
+            name = ('s%d' % regs[id(node)]) if id(node) in regs else ('c%d' % i)
+            names[id(node)] = name
+            lines.append('    FXP %s = _raw(%s, %s);' % (name, _number(node.obj._val), formats[node.fmt]))
+        lines += ['',
+                  '    for(long i = 0; i < n; i++)',
+                  '    {']
+        for i, node in enumerate(order):
+            if(id(node) in names):
+                continue
+            names[id(node)] = 'n%d' % i
+            if(node.op == 'leaf'):
+                expr = '_raw(in[%d*n + i], %s)' % (inputs[id(node)], formats[node.fmt])
+            else:
+                expr = self._statement(node, names, formats)
+            lines.append('        FXP n%d = %s;' % (i, expr))
+        for k, node in enumerate(self.outputs):
+            lines.append('        out[%d*n + i] = %s._val;' % (k, names[id(node)]))
+        # registers are updated at the end of the sample, all at once
+        for k, node in enumerate(self._next):
+            lines.append('        FXP r%d = %s;' % (k, names[id(node)]))
+        for k in range(len(self._next)):
+            lines.append('        s%d = r%d;' % (k, k))
+        lines += ['    }',
+                  '',
+                  '    f = fopen(argv[2], "wb");',
+                  '    if((f == NULL) || (fwrite(&out[0], sizeof(double), %d*n, f) != (size_t)(%d*n)))' % (len(self.outputs), len(self.outputs)),
+                  '    {',
+                  '        cerr << "can not write " << argv[2] << "\\n";',
+                  '        return 1;',
+                  '    }',
+                  '    fclose(f);',
+                  '    return 0;',
+                  '}',
+                  '']
+        return '\n'.join(lines)
+
+    def compile(self, path=None):
+        '''
+        public method
+        compiles the translation unit with g++ and returns the path of the program, see build()
+        '''
+        self.path = build(self.source(), path)
+        return self.path
+
+    def _samples(self, inputs):
+        # private method, returns the input arrays as FXPArray objects in the formats of the inputs and the number of samples
+        if(len(inputs) != len(self.inputs)):
+            raise Exception("model has %d inputs" % len(self.inputs))
+        arrays = []
+        for x, fmt in zip(inputs, self.inputs):
+            if(isinstance(x, FXPArray)):
+                assert(x.fmt is fmt) or not FXP._DBG, 'inputs must have the formats of the traced model'
+            else:
+                x = FXPArray(numpy.ravel(x), fmt)
+            arrays.append(x)
+        n = len(arrays[0]) if arrays else 0
+        assert all(len(x) == n for x in arrays) or not FXP._DBG, 'inputs must have the same length'
+        return arrays, n
+
+    def _outputs(self, raw):
+        # private method, returns the outputs as FXPArray objects, one object for one output
+        out = []
+        for y, fmt in zip(raw, self.formats):
+            out.append(FXPArray.from_raw(y if fmt.type == dtype.float else y.astype(numpy.int64), fmt))
+        return out[0] if len(out) == 1 else tuple(out)
+
+    def run(self, *inputs):
+        '''
+        public method
+        runs the compiled program on the samples of the inputs (FXPArray objects or arrays of values which are quantized
+        to the input formats), returns the outputs as FXPArray objects, a tuple for more than one output
+        every call starts from the initial state
+        '''
+        if(self.path is None):
+            self.compile()
+        arrays, n = self._samples(inputs)
+        buf = numpy.empty((len(arrays), n), dtype=numpy.float64)
+        for k, x in enumerate(arrays):
+            buf[k] = x._val
+        with tempfile.TemporaryDirectory() as tmp:
+            fin  = os.path.join(tmp, 'inputs.bin')
+            fout = os.path.join(tmp, 'outputs.bin')
+            buf.tofile(fin)
+            subprocess.run([self.path, fin, fout, str(n)], check=True)
+            raw = numpy.fromfile(fout, dtype=numpy.float64).reshape(len(self.outputs), n)
+        return self._outputs(raw)
+
+    def simulate(self, *inputs):
+        '''
+        public method
+        runs the model sample by sample with FXP objects, returns the outputs in the same way as run()
+        '''
+        arrays, n = self._samples(inputs)
+        state = [s.copy() for s in self.state]
+        raw   = numpy.zeros((len(self.outputs), n), dtype=numpy.float64)
+        k     = len(self.outputs)
+        for i in range(n):
+            result = self.model(*([x[i] for x in arrays] + state))
+            if(not isinstance(result, tuple)):
+                result = (result,)
+            for j in range(k):
+                raw[j, i] = result[j]._val
+            state = [r if r.fmt is s.fmt else r.copy(s) for r, s in zip(result[k:], state)]
+        return self._outputs(raw)
+
+
+def _cache():
+    '''
+    private function
+    returns the per user directory of compiled programs ($XDG_CACHE_HOME/fixedpointcpp or ~/.cache/fixedpointcpp)
+    the directory is created with mode 0700, programs are only run from a directory owned by the user and not writable by others
+    '''
+    root = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    cache = os.path.join(root, 'fixedpointcpp')
+    os.makedirs(cache, mode=0o700, exist_ok=True)
+    st = os.stat(cache)
+    if(st.st_uid != os.getuid() or st.st_mode & 0o022):
+        raise Exception("program cache " + cache + " must be owned by the user and not writable by others")
+    return cache
+
+
+def build(src, path=None):
+    '''
+    public function
+    compiles the C++ translation unit src (which includes fixedpointlib.cpp) with g++ and returns the path of the program
+    without path, programs are cached in the per user cache directory (see _cache) by the hash of their source code, flags
+    and fixedpointlib.cpp. Programs are compiled under a temporary name and moved into place, so concurrent builds never
+    run a partially written program.
+    '''
+    if(path is None):
+        cache = _cache()
+        with open(os.path.join(_SRC, 'fixedpointlib.cpp')) as f:
+            key = hashlib.sha1((src + ' '.join(CXX) + f.read()).encode()).hexdigest()[:16]
+        path = os.path.join(cache, key + '.out')
+        if(os.path.isfile(path)):
+            return path
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(path))) as tmp:
+        cpp = os.path.join(tmp, 'program.cpp')
+        out = os.path.join(tmp, 'program.out')
+        with open(cpp, 'w') as f:
+            f.write(src)
+        result = subprocess.run(CXX + ['-I', _SRC, '-o', out, cpp], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+        if(result.returncode != 0):
+            raise Exception("compilation of " + os.path.basename(path) + " failed\n" + result.stdout)
+        os.replace(out, path)
+    return path
+
+
+def trace(model, inputs, state=()):
+    '''
+    public function
+    traces the model and returns the Program object, see Program
+        prog = trace(lambda x, y: x*y + x, [templ, templ])
+        z    = prog.run(x, y)
+    '''
+    return Program(model, inputs, state)
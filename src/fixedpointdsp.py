@@ -0,0 +1,317 @@
+#   Copyright:
+#       Copyright 2017 Ahmad RezazadehReyhani
+#
+#       Licensed under the Apache License, Version 2.0 (the "License");
+#       you may not use this file except in compliance with the License.
+#       You may obtain a copy of the License at
+#
+#          http://www.apache.org/licenses/LICENSE-2.0
+#
+#       Unless required by applicable law or agreed to in writing, software
+#       distributed under the License is distributed on an "AS IS" BASIS,
+#       WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#       See the License for the specific language governing permissions and
+#       limitations under the License.
+#
+#   Acknowledgment:
+#       Grateful appreciation to the Farhang Wireless Inc. for their support and generously funding the implementation of this library.
+#       http://farhangwireless.com/
+
+
+import numpy
+from fixedpointlib import FXP, FXPArray, Format, dtype, modes, quantize
+
+
+def _to_array(x):
+    # private function, converts a list of FXP objects to a FXPArray object with the format of the first element
+    if(isinstance(x, FXPArray)):
+        return x
+    elif(isinstance(x, (list, tuple)) and len(x) > 0 and isinstance(x[0], FXP)):
+        return FXPArray([v.val() for v in x], x[0])
+    else:
+        raise Exception("unsupported type")
+
+
+class FIR:
+    '''
+    Bit-accurate FIR filter
+    y[n] = sum(taps[k] * samples[n-k]) is computed on the raw words in integer domain:
+    products are exact, they are summed exactly in the accumulator and the result is requantized once to the output format.
+
+    Parameters:
+    - taps          : FXPArray object or list of FXP objects with the same format
+    - acc_format    : accumulator template (tuple, Format, FXP or FXPArray). products are requantized to the accumulator
+                      fractional width when it is smaller than the product fractional width, the sum is saturated/wrapped
+                      around to the accumulator width at the end.
+                      default is the FULL mode product format with enough guard bits to keep the sum exact, so the output
+                      values are bit-exact to the FULL mode scalar loop
+                          acc = samples[n]*taps[0]
+                          acc = acc + samples[n-k]*taps[k]    for k = 1, ..., len(taps)-1
+    - out_format    : output template, default is the accumulator format
+
+    FIR object keeps the last len(taps)-1 input samples (delay line) between calls, so a long signal can be filtered in chunks
+    and the output is identical to filtering the whole signal at once. Use reset() to clear the delay line.
+
+    Example:
+        f  = FIR(taps, acc_format=(9,20,dtype.fxp,modes.FULL,False,False), out_format=(1,14,dtype.fxp,modes.FULL,True,True))
+        y1 = f(x[:1000])
+        y2 = f(x[1000:])
+    '''
+    def __init__(self, taps, acc_format=None, out_format=None):
+        self.taps       = _to_array(taps)
+        self.acc_format = None if acc_format is None else Format.of(acc_format)
+        self.out_format = None if out_format is None else Format.of(out_format)
+        self._in_format = None
+        self._state     = None
+
+    def reset(self):
+        # public method, clears the delay line
+        self._state = None
+
+    def _formats(self, fs):
+        # private method, infers the product, accumulator and output formats for samples with format fs
+        self._prod = FXP._infer_format('mul', fs, self.taps.fmt, 0, 0, None, modes.FULL, None, None)
+        if(self.acc_format is None):
+            prod = self._prod
+            self.acc_format = Format(prod.intg + (len(self.taps)-1).bit_length(), prod.frac, prod.type, modes.FULL, prod.sat, prod.round)
+        if(self.out_format is None):
+            self.out_format = self.acc_format
+        self._in_format = fs
+
+    def __call__(self, samples):
+        '''
+        public method
+        filters the samples (FXPArray object or list of FXP objects) and returns the output samples as a FXPArray object
+        '''
+        samples = _to_array(samples)
+        fs, ft = samples.fmt, self.taps.fmt
+        if(self._in_format is None):
+            self._formats(fs)
+        assert(fs == self._in_format) or not FXP._DBG, 'samples must have the same format in all calls'
+        m = len(self.taps)
+        n = len(samples)
+        # raw words are widened to int64 for the products and sums
+        x = samples._val if fs.type == dtype.float else samples._val.astype(numpy.int64)
+        h = self.taps._val if ft.type == dtype.float else self.taps._val.astype(numpy.int64)
+        if(self._state is None):
+            self._state = numpy.zeros(m-1, dtype=x.dtype)
+        if(n == 0):
+            return FXPArray.from_raw(numpy.zeros(0, dtype=x.dtype), self.out_format)
+        xx = numpy.concatenate((self._state, x))
+        self._state = xx[len(xx)-(m-1):].copy()
+
+        acc  = self.acc_format
+        prod = self._prod
+        if(fs.type == dtype.float and ft.type == dtype.float):
+            return FXPArray(numpy.convolve(xx, h, 'valid'), self.out_format)
+
+        FXPArray._check_width(acc.width)
+        pfrac = prod.frac
+        if(prod.width + (m-1).bit_length() + max(acc.frac - pfrac, 0) > 63):
+            # python integers for sums wider than int64
+            xx = xx.astype(object)
+            h  = h.astype(object)
+        if(acc.frac >= pfrac):
+            y = numpy.convolve(xx, h, 'valid') << (acc.frac - pfrac)
+            if(fs.signed and ft.signed):
+                # the only product out of the product format range is lowest*lowest, it is saturated/wrapped around
+                delta = ((prod.hi if prod.sat else prod.lo) - prod.half) << (acc.frac - pfrac)
+                for k in numpy.flatnonzero(h == ft.lo):
+                    y = y + (xx[m-1-k:m-1-k+n] == fs.lo) * delta
+        else:
+            # products lose their extra fractional bits before accumulation
+            y = 0
+            for k in range(m):
+                p = FXPArray._from_int(h[k] * xx[m-1-k:m-1-k+n], pfrac, prod)._val.astype(numpy.int64)
+                y = y + FXPArray._round_shift(p, pfrac - acc.frac, acc.round)
+        y = FXPArray._from_int(y, acc.frac, acc)
+        return FXPArray._from_int(y._val, acc.frac, self.out_format)
+
+
+def fir(samples, taps, acc_format=None, out_format=None):
+    '''
+    public function
+    filters samples with taps in one call, see FIR for the parameters
+        y = fir(x, taps, out_format=(1,14,dtype.fxp,modes.FULL,True,True))
+    '''
+    return FIR(taps, acc_format, out_format)(samples)
+
+
+class FFT:
+    '''
+    Bit-accurate fixedpoint FFT/IFFT
+    Radix 2 or radix 4 decimation in time transform on the raw words in integer domain, vectorized over all butterflies
+    of a stage and over a batch of transforms.
+
+    Parameters:
+    - n             : transform size, power of 2 for radix 2 and power of 4 for radix 4
+    - twiddle_format: twiddle factor template (tuple, Format, FXP or FXPArray), twiddle factors are quantized by quantize()
+    - shifts        : per stage right shift schedule, a list with one number of bits per stage
+                      or 'block' for block floating point, then every transform of a batch is shifted by the smallest number
+                      of bits which avoids overflow at each stage, and the total shift is stored in exponent. Outputs of all
+                      stages but the last keep one bit of headroom for the growth of the twiddle products of the next stage
+                      (a complex rotation grows the real and imaginary parts by up to sqrt(2)). Full scale inputs can still
+                      round up to overflow in the first stage if the twiddle format has fewer fractional bits than the data.
+                      default is 1 bit per stage for radix 2 and 2 bits per stage for radix 4, so the output is scaled by 1/n
+    - inverse       : if set to True, the inverse transform is computed (conjugated twiddle factors, no extra scaling)
+    - radix         : 2 or 4
+
+    Butterfly arithmetic follows the FIXEDWIDTH rules of the library:
+    - products of inputs and twiddle factors are computed exactly and each complex product is requantized to the
+      FIXEDWIDTH product format of the data and twiddle formats (rounding/truncation and saturation/wrap around of the data)
+    - butterfly sums are exact, they are right shifted by the stage shift and requantized to the FIXEDWIDTH sum format
+      of the data and product formats, which is the data format of the next stage
+    For float data, the transform is computed by numpy.fft with the same scaling.
+
+    overflows[k] counts the saturation/wrap around events of stage k (products and outputs) since creation or reset().
+
+    Example:
+        f = FFT(64, (1,14,dtype.fxp, modes.FIXEDWIDTH,True,True))
+        yr, yi = f(xr, xi)      # xr, xi are FXPArray objects of shape (64,) or (symbols, 64)
+    '''
+    def __init__(self, n, twiddle_format, shifts=None, inverse=False, radix=2):
+        if(radix not in (2, 4)):
+            raise Exception("radix must be 2 or 4")
+        self.stages = 0
+        while(radix**self.stages < n):
+            self.stages += 1
+        if(radix**self.stages != n):
+            raise Exception("transform size must be a power of the radix")
+        self.n              = n
+        self.radix          = radix
+        self.inverse        = inverse
+        self.twiddle_format = Format.of(twiddle_format)
+        if(shifts is None):
+            shifts = [radix.bit_length()-1]*self.stages
+        if(shifts != 'block' and len(shifts) != self.stages):
+            raise Exception("shift schedule must have one entry per stage")
+        self.shifts    = shifts
+        self.exponent  = None
+        self.overflows = numpy.zeros(self.stages, dtype=numpy.int64)
+
+        # digit reversed input order
+        index = numpy.arange(n)
+        rev = numpy.zeros(n, dtype=numpy.int64)
+        for s in range(self.stages):
+            rev = rev*radix + index % radix
+            index = index // radix
+        self._order = rev
+
+        # twiddle factors of each stage, _twiddles[k][p] holds W_L^(p*j) for j = 0, ..., L/radix-1
+        sign = 1.0 if inverse else -1.0
+        self._twiddles = []
+        for k in range(self.stages):
+            L = radix**(k+1)
+            j = numpy.arange(L//radix)
+            tw = []
+            for p in range(radix):
+                w = numpy.exp(sign*2j*numpy.pi*p*j/L)
+                tw.append((quantize(w.real, self.twiddle_format, raw=True), quantize(w.imag, self.twiddle_format, raw=True)))
+            self._twiddles.append(tw)
+
+    def reset(self):
+        # public method, clears the overflow counters
+        self.overflows[:] = 0
+
+    def _requantize(self, raw, frac, fmt, stage):
+        # private method, requantizes exact integer values to fmt and counts the saturated/wrapped around values
+        if(frac > fmt.frac):
+            raw = FXPArray._round_shift(raw, frac - fmt.frac, fmt.round)
+        elif(frac < fmt.frac):
+            raw = raw << (fmt.frac - frac)
+        self.overflows[stage] += numpy.count_nonzero((raw > fmt.hi) | (raw < fmt.lo))
+        return FXPArray._from_int(raw, fmt.frac, fmt)._val.astype(numpy.int64)
+
+    def __call__(self, re, im=None):
+        '''
+        public method
+        transforms the FXPArray objects re and im (real and imaginary parts, im can be None) along their last axis
+        returns the real and imaginary parts of the result as FXPArray objects
+        '''
+        if(im is None):
+            im = FXPArray.from_raw(numpy.zeros(re.shape, dtype=re._val.dtype), re)
+        fmt = re.fmt
+        assert(im.fmt == fmt) or not FXP._DBG, 'real and imaginary parts must have the same format'
+        assert(re.shape[-1] == self.n) or not FXP._DBG, 'last axis must have the transform size'
+        batch = re.shape[:-1]
+
+        if(fmt.type == dtype.float):
+            y = numpy.fft.ifft(re._val + 1j*im._val)*self.n if self.inverse else numpy.fft.fft(re._val + 1j*im._val)
+            if(self.shifts != 'block'):
+                y = y / float(int(1)<<sum(self.shifts))
+            self.exponent = numpy.zeros(batch, dtype=numpy.int64)
+            return FXPArray(y.real, fmt), FXPArray(y.imag, fmt)
+
+        tf = self.twiddle_format
+        FXPArray._check_width(fmt.width + tf.width + self.radix.bit_length())
+        xr = re._val[..., self._order].astype(numpy.int64)
+        xi = im._val[..., self._order].astype(numpy.int64)
+        self.exponent = numpy.zeros(batch, dtype=numpy.int64)
+        for k in range(self.stages):
+            xr, xi, fmt = self._stage(xr, xi, fmt, k)
+        return FXPArray.from_raw(xr, fmt), FXPArray.from_raw(xi, fmt)
+
+    def _stage(self, xr, xi, fmt, k):
+        # private method, computes the butterflies of stage k on raw words of format fmt
+        r     = self.radix
+        L     = r**(k+1)
+        batch = xr.shape[:-1]
+        xr    = xr.reshape(batch + (self.n//L, r, L//r))
+        xi    = xi.reshape(batch + (self.n//L, r, L//r))
+        tf    = self.twiddle_format
+        pf    = FXP._infer_format('mul', fmt, tf, 0, 0, None, modes.FIXEDWIDTH, None, None)
+        of    = FXP._infer_format('add', fmt, pf, 0, 0, None, modes.FIXEDWIDTH, None, None)
+
+        # twiddle products, requantized to the product format
+        ar = [self._requantize(xr[..., 0, :], fmt.frac, pf, k)]
+        ai = [self._requantize(xi[..., 0, :], fmt.frac, pf, k)]
+        for p in range(1, r):
+            wr, wi = self._twiddles[k][p]
+            ar.append(self._requantize(xr[..., p, :]*wr - xi[..., p, :]*wi, fmt.frac + tf.frac, pf, k))
+            ai.append(self._requantize(xr[..., p, :]*wi + xi[..., p, :]*wr, fmt.frac + tf.frac, pf, k))
+
+        # exact butterfly sums
+        if(r == 2):
+            yr = [ar[0] + ar[1], ar[0] - ar[1]]
+            yi = [ai[0] + ai[1], ai[0] - ai[1]]
+        else:
+            s = -1 if self.inverse else 1
+            yr = [ar[0] + ar[1] + ar[2] + ar[3],
+                  ar[0] + s*ai[1] - ar[2] - s*ai[3],
+                  ar[0] - ar[1] + ar[2] - ar[3],
+                  ar[0] - s*ai[1] - ar[2] + s*ai[3]]
+            yi = [ai[0] + ai[1] + ai[2] + ai[3],
+                  ai[0] - s*ar[1] - ai[2] + s*ar[3],
+                  ai[0] - ai[1] + ai[2] - ai[3],
+                  ai[0] + s*ar[1] - ai[2] - s*ar[3]]
+        yr = numpy.stack(yr, axis=-2)
+        yi = numpy.stack(yi, axis=-2)
+
+        # stage scaling and requantization to the output format
+        if(self.shifts == 'block'):
+            shift = self._block_shift(yr, yi, pf.frac, of, 1 if k < self.stages-1 else 0)
+            self.exponent += shift
+            shift = shift.reshape(batch + (1, 1, 1))
+            qr = yr
+            qi = yi
+            for s in range(r.bit_length() + 1):
+                yr = numpy.where(shift == s, FXPArray._round_shift(qr, s, of.round) if s > 0 else qr, yr)
+                yi = numpy.where(shift == s, FXPArray._round_shift(qi, s, of.round) if s > 0 else qi, yi)
+        elif(self.shifts[k] > 0):
+            yr = FXPArray._round_shift(yr, self.shifts[k], of.round)
+            yi = FXPArray._round_shift(yi, self.shifts[k], of.round)
+        yr = self._requantize(yr, pf.frac, of, k)
+        yi = self._requantize(yi, pf.frac, of, k)
+        return yr.reshape(batch + (self.n,)), yi.reshape(batch + (self.n,)), of
+
+    def _block_shift(self, yr, yi, frac, fmt, headroom):
+        # private method, returns the smallest right shift of each transform which keeps the butterfly sums in range of fmt with headroom bits left
+        axes  = tuple(range(yr.ndim - 3, yr.ndim))
+        hi    = numpy.maximum(yr.max(axis=axes), yi.max(axis=axes))
+        lo    = numpy.minimum(yr.min(axis=axes), yi.min(axis=axes))
+        shift = numpy.full(hi.shape, self.radix.bit_length(), dtype=numpy.int64)
+        for s in range(self.radix.bit_length()-1, -1, -1):
+            qhi = FXPArray._round_shift(hi, s + frac - fmt.frac, fmt.round) if s + frac - fmt.frac > 0 else hi << (fmt.frac - frac - s)
+            qlo = FXPArray._round_shift(lo, s + frac - fmt.frac, fmt.round) if s + frac - fmt.frac > 0 else lo << (fmt.frac - frac - s)
+            shift = numpy.where((qhi <= fmt.hi >> headroom) & (qlo >= fmt.lo >> headroom), s, shift)
+        return shift
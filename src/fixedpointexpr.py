@@ -0,0 +1,502 @@
+#   Copyright:
+#       Copyright 2017 Ahmad RezazadehReyhani
+#
+#       Licensed under the Apache License, Version 2.0 (the "License");
+#       you may not use this file except in compliance with the License.
+#       You may obtain a copy of the License at
+#
+#          http://www.apache.org/licenses/LICENSE-2.0
+#
+#       Unless required by applicable law or agreed to in writing, software
+#       distributed under the License is distributed on an "AS IS" BASIS,
+#       WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#       See the License for the specific language governing permissions and
+#       limitations under the License.
+#
+#   Acknowledgment:
+#       Grateful appreciation to the Farhang Wireless Inc. for their support and generously funding the implementation of this library.
+#       http://farhangwireless.com/
+
+
+import numpy
+from fixedpointlib import FXP, FXPArray, Format, dtype
+
+
+def _width(v):
+    # private function, returns the bit width of integer value v in two's complement (sign bit included)
+    return (v if v >= 0 else ~v).bit_length() + 1
+
+
+def _scale(lo, hi, shift, round):
+    # private function, returns the range [lo, hi] of raw values moved to shift more fractional bits (rounded/truncated when shift < 0)
+    if(shift < 0):
+        return FXPArray._round_shift(lo, -shift, round), FXPArray._round_shift(hi, -shift, round)
+    return lo << shift, hi << shift
+
+
+def _order(roots):
+    # private function, returns the nodes of the graphs of the given root nodes in evaluation order, operands first and shared nodes once
+    order, index = [], {}
+    stack = list(reversed(roots))
+    while(stack):
+        node = stack[-1]
+        if(id(node) in index):
+            stack.pop()
+            continue
+        pending = [a for a in node.args if id(a) not in index]
+        if(pending):
+            stack.extend(reversed(pending))
+            continue
+        stack.pop()
+        index[id(node)] = len(order)
+        order.append(node)
+    return order, index
+
+
+def lazy(*objs):
+    '''
+    public function
+    wraps FXP/FXPArray objects in leaf expressions, returns one Expr object for one argument, otherwise a tuple
+        a, b, c, d, e = lazy(a, b, c, d, e)
+        y = ((a*b) + (c*d)) - e
+    '''
+    leaves = tuple(Expr(obj) for obj in objs)
+    return leaves[0] if len(leaves) == 1 else leaves
+
+
+class Expr:
+    '''
+    Deferred fixedpoint expression
+    Expr object is a node of an expression graph (DAG) of FXP/FXPArray operations. Operators on Expr objects compute
+    nothing, they return a new node whose output format is resolved immediately by the rules of FXP (opmode, sat, round),
+    so the formats and the bit growth of a datapath can be inspected before running it, see table().
+    evaluate() runs the whole graph as one kernel on the raw words in integer domain:
+    - the range of the exact results of every node is derived from the ranges of its operands
+    - a node is requantized (rounding/truncation and saturation/wrap around) only when its output format can not hold all
+      of its exact results, otherwise the exact values are kept and no intermediate object is created
+    - raw words are computed in one container which holds every exact intermediate result, intermediate results which are
+      used once are overwritten in place
+    Results are bit-exact to the same operations on the FXP/FXPArray objects.
+
+    Nodes have the following properties:
+    - op        : 'leaf', 'add', 'sub', 'mul', 'neg', 'abs', 'shl', 'shr', 'zero' or 'copy'
+    - args      : operand nodes
+    - fmt       : output format
+    - frac      : fractional width of the exact results, None for float
+    - exact     : (lowest, highest) exact raw result before requantization
+    - lo, hi    : lowest/highest raw output words
+    - requant   : True if the node is requantized
+
+    Leaf nodes reference their objects and read the raw words at every evaluate(), so a graph is built once and evaluated
+    again after the objects are updated in place (+=, out= buffers, item assignment). Formats of the leaf objects must not
+    change. The result is a FXPArray object if one of the leaves is a FXPArray object, otherwise a FXP object.
+
+    Example:
+        a, b, c, d, e = lazy(a, b, c, d, e)
+        y = ((a*b) + (c*d)) - e
+        print(y.table())
+        z = y.evaluate()
+    '''
+    __slots__ = ('op', 'args', 'shift', 'obj', 'fmt', 'frac', 'exact', 'lo', 'hi', 'requant', 'bits', '_plan')
+
+    def __init__(self, obj):
+        '''
+        public method
+        Class constructor
+        returns a leaf node of the FXP/FXPArray object obj
+        '''
+        if(not isinstance(obj, (FXP, FXPArray))):
+            raise Exception("unsupported type")
+        fmt = obj.fmt
+        self._set(fmt, (), fmt.frac if fmt.type != dtype.float else None, fmt.lo, fmt.hi)
+        self.op  = 'leaf'
+        self.obj = obj
+
+    def _node(op, args, fmt, frac=None, lo=None, hi=None, shift=0):
+        # private method, returns a node of operation op with exact results in [lo, hi] of given fractional width
+        node = Expr.__new__(Expr)
+        node._set(fmt, args, frac, lo, hi)
+        node.op    = op
+        node.shift = shift
+        return node
+
+    def _set(self, fmt, args, frac, lo, hi):
+        '''
+        private method
+        sets the format of the node and resolves its requantization from the range of its exact results
+        the node is not requantized if the exact results fit in the format without removing fractional bits, then the
+        output words are the exact results left shifted to the fractional width of the format
+        '''
+        self.args, self.fmt, self.frac, self.exact = args, fmt, frac, (lo, hi)
+        self.shift, self.obj, self._plan = 0, None, None
+        self.bits = 0
+        if(fmt.type == dtype.float):
+            self.requant, self.lo, self.hi = False, None, None
+            return
+        if(frac is None):
+            # float operand converted to fixedpoint
+            self.requant, self.lo, self.hi = True, fmt.lo, fmt.hi
+            self.bits = max(_width(fmt.lo), _width(fmt.hi))
+            return
+        s = fmt.frac - frac
+        if(s >= 0 and (lo << s) >= fmt.lo and (hi << s) <= fmt.hi):
+            self.requant, self.lo, self.hi = False, lo << s, hi << s
+        else:
+            self.requant = True
+            lo, hi = _scale(lo, hi, s, fmt.round)
+            if(fmt.sat):
+                lo, hi = min(max(lo, fmt.lo), fmt.hi), max(min(hi, fmt.hi), fmt.lo)
+            elif(lo < fmt.lo or hi > fmt.hi):
+                lo, hi = fmt.lo, fmt.hi
+            self.lo, self.hi = int(lo), int(hi)
+        self.bits = max(_width(self.exact[0]), _width(self.exact[1]), _width(self.lo), _width(self.hi))
+
+    def _operand(b):
+        # private method, returns the node of operand b (Expr, FXP or FXPArray object)
+        if(isinstance(b, Expr)):
+            return b
+        return Expr(b)
+
+    def _binary(op, a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None, fmt=None):
+        '''
+        private method
+        returns the node of operation op ('add', 'sub' or 'mul') on nodes a and b, see FXP._add
+        the output format is inferred by FXP._infer_format, given parameters override the inferred ones
+        fmt overrides the output format of in place operations
+        '''
+        fa, fb = a.fmt, b.fmt
+        if(fmt is None):
+            if(FXP._DBG):
+                FXP._check_operands(fa, fb, opmode, sat, round)
+            fmt = FXP._infer_format(op, fa, fb, intg, frac, type, opmode, sat, round)
+        if(fa.type == dtype.float or fb.type == dtype.float):
+            if(fa.type != fb.type):
+                raise Exception("Float - fixedpoint operation is not allowed")
+            return Expr._node(op, (a, b), fmt)
+        if(op == 'mul'):
+            p = (a.lo*b.lo, a.lo*b.hi, a.hi*b.lo, a.hi*b.hi)
+            node = Expr._node(op, (a, b), fmt, fa.frac + fb.frac, min(p), max(p))
+            node.bits = max(node.bits, a.bits, b.bits)
+            return node
+        frac = max(fa.frac, fb.frac)
+        alo, ahi = a.lo << (frac - fa.frac), a.hi << (frac - fa.frac)
+        blo, bhi = b.lo << (frac - fb.frac), b.hi << (frac - fb.frac)
+        if(op == 'add'):
+            node = Expr._node(op, (a, b), fmt, frac, alo + blo, ahi + bhi)
+        else:
+            node = Expr._node(op, (a, b), fmt, frac, alo - bhi, ahi - blo)
+        # aligned operands
+        node.bits = max(node.bits, _width(alo), _width(ahi), _width(blo), _width(bhi))
+        return node
+
+    def _unary(op, a, shift=0):
+        # private method, returns the node of the unary operation op ('neg', 'abs', 'shl', 'shr' or 'zero') on node a
+        fmt = a.fmt
+        if(op == 'shl'):
+            fmt = Format.of((fmt.intg+shift, max(fmt.frac-shift, 0), fmt.type, fmt.opmode, fmt.sat, fmt.round))
+        elif(op == 'shr'):
+            fmt = Format.of((max(fmt.intg-shift, 0), fmt.frac+shift, fmt.type, fmt.opmode, fmt.sat, fmt.round))
+        if(fmt.type == dtype.float):
+            return Expr._node(op, (a,), fmt, shift=shift)
+        lo, hi, frac = a.lo, a.hi, a.fmt.frac
+        if(op == 'neg'):
+            lo, hi = -hi, -lo
+        elif(op == 'abs'):
+            lo, hi = (lo, hi) if lo >= 0 else ((-hi, -lo) if hi <= 0 else (0, max(-lo, hi)))
+        elif(op == 'shl'):
+            frac = frac - shift
+        elif(op == 'shr'):
+            frac = frac + shift
+        elif(op == 'zero'):
+            lo, hi = 0, 0
+        return Expr._node(op, (a,), fmt, frac, lo, hi, shift)
+
+    def _dispatch(op, a, b):
+        '''
+        private method
+        returns the node of a + b, a - b or a * b, integer number b is converted to a node in the same way as the FXP
+        dispatch methods, so the formats are identical to the formats of the same operations on FXP objects
+        '''
+        if(isinstance(b, (Expr, FXP, FXPArray))):
+            return Expr._binary(op, a, Expr._operand(b))
+        elif(not isinstance(b, (int, numpy.integer))):
+            raise Exception("unsupported type")
+        b = int(b)
+        if(op == 'mul'):
+            if(b == 0):
+                return Expr._unary('zero', a)
+            elif(b > 0 and b & (b-1) == 0):
+                return Expr._unary('shl', a, b.bit_length()-1)
+            elif(b < 0 and (-b) & (-b-1) == 0):
+                return Expr._unary('neg', Expr._unary('shl', a, (-b).bit_length()-1))
+        elif(b == 0):
+            return a
+        return Expr._binary(op, a, Expr(FXPArray._int_operand(a.fmt, b)))
+
+    def _inplace(op, a, b):
+        '''
+        private method
+        returns the node of a += b, a -= b or a *= b, the exact result is rounded/truncated and saturated/wrapped around to
+        the format of a, same as FXP._inplace. a is not changed, the name of a is bound to the new node.
+        '''
+        if(isinstance(b, (int, numpy.integer))):
+            b = Expr(FXPArray._int_operand(a.fmt, int(b)))
+        elif(not isinstance(b, (Expr, FXP, FXPArray))):
+            raise Exception("unsupported type")
+        return Expr._binary(op, a, Expr._operand(b), fmt=a.fmt)
+
+    def __add__(self, b):
+        # magic function of a + b
+        return Expr._dispatch('add', self, b)
+
+    def __radd__(self, b):
+        # magic function of b + a
+        return Expr._dispatch('add', self, b)
+
+    def __sub__(self, b):
+        # magic function of a - b
+        return Expr._dispatch('sub', self, b)
+
+    def __rsub__(self, b):
+        # magic function of b - a, same as FXP it is -(a - b)
+        return -Expr._dispatch('sub', self, b)
+
+    def __mul__(self, b):
+        # magic function of a * b
+        return Expr._dispatch('mul', self, b)
+
+    def __rmul__(self, b):
+        # magic function of b * a
+        return Expr._dispatch('mul', self, b)
+
+    def __iadd__(self, b):
+        # magic function of a += b, the result keeps the format of a
+        return Expr._inplace('add', self, b)
+
+    def __isub__(self, b):
+        # magic function of a -= b, the result keeps the format of a
+        return Expr._inplace('sub', self, b)
+
+    def __imul__(self, b):
+        # magic function of a *= b, the result keeps the format of a
+        return Expr._inplace('mul', self, b)
+
+    def __neg__(self):
+        return Expr._unary('neg', self)
+
+    def __abs__(self):
+        return Expr._unary('abs', self)
+
+    def __lshift__(self, other):
+        return Expr._unary('shl', self, other)
+
+    def __rshift__(self, other):
+        return Expr._unary('shr', self, other)
+
+    def add(a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None):
+        # adds two nodes (or FXP/FXPArray objects) a and b and input parameters will be used to set the output parameters, same as FXP.add
+        return Expr._binary('add', Expr._operand(a), Expr._operand(b), intg, frac, type, opmode, sat, round)
+
+    def sub(a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None):
+        # subtracts two nodes (or FXP/FXPArray objects) a and b and input parameters will be used to set the output parameters, same as FXP.sub
+        return Expr._binary('sub', Expr._operand(a), Expr._operand(b), intg, frac, type, opmode, sat, round)
+
+    def mul(a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None):
+        # multiplies two nodes (or FXP/FXPArray objects) a and b and input parameters will be used to set the output parameters, same as FXP.mul
+        return Expr._binary('mul', Expr._operand(a), Expr._operand(b), intg, frac, type, opmode, sat, round)
+
+    def copy(self, template):
+        # public method, returns a node which converts the results to the format of template, same as FXP.copy(template)
+        fmt = Format.of(template)
+        if(fmt.type == dtype.float or self.fmt.type == dtype.float):
+            return Expr._node('copy', (self,), fmt, None if self.fmt.type == dtype.float else self.fmt.frac)
+        return Expr._node('copy', (self,), fmt, self.fmt.frac, self.lo, self.hi)
+
+    def __repr__(self):
+        return 'Expr(' + self.op + ', ' + repr(self.fmt) + ')'
+
+    def _compile(self):
+        '''
+        private method
+        returns the evaluation plan of the graph: the nodes in evaluation order (operands first, shared nodes once),
+        the operand indexes and the number of uses of every node, the widest intermediate result and whether a leaf is an array
+        '''
+        order, index = _order([self])
+        args = [tuple(index[id(a)] for a in node.args) for node in order]
+        uses = [0]*len(order)
+        for a in args:
+            for i in a:
+                uses[i] += 1
+        array = any(node.op == 'leaf' and isinstance(node.obj, FXPArray) for node in order)
+        return order, args, uses, max(node.bits for node in order), array
+
+    def table(self):
+        # public method, returns the nodes of the graph with their formats, exact result widths and requantizations as a printable table
+        order, args, uses, bits, array = self._plan if self._plan is not None else self._compile()
+        lines = ['%-6s %-20s %-45s %8s %6s  %s' % ('node', 'operation', 'format', 'exact', 'width', 'requantize')]
+        for i, node in enumerate(order):
+            operation = node.op
+            if(node.op != 'leaf'):
+                operands = ['n%d' % k for k in args[i]] + (['%d' % node.shift] if node.op in ('shl', 'shr') else [])
+                operation = node.op + '(' + ', '.join(operands) + ')'
+            fmt = node.fmt
+            if(fmt.type == dtype.float):
+                lines.append('%-6s %-20s %-45s %8s %6s  %s' % ('n%d' % i, operation, tuple(fmt), '-', '-', '-'))
+                continue
+            exact = '-'
+            if(node.frac is not None):
+                exact = '%d/%d' % (max(_width(node.exact[0]), _width(node.exact[1])), node.frac)
+            steps = []
+            if(node.requant):
+                if(node.frac is None):
+                    steps.append('quantize')
+                elif(node.frac > fmt.frac):
+                    steps.append('round' if fmt.round else 'truncate')
+                if(node.frac is not None):
+                    lo, hi = _scale(node.exact[0], node.exact[1], fmt.frac - node.frac, fmt.round)
+                    if(lo < fmt.lo or hi > fmt.hi):
+                        steps.append('saturate' if fmt.sat else 'wrap')
+            lines.append('%-6s %-20s %-45s %8s %6d  %s' % ('n%d' % i, operation, tuple(fmt), exact, fmt.width, ', '.join(steps) if steps else '-'))
+        return '\n'.join(lines)
+
+    def evaluate(self, out=None):
+        '''
+        public method
+        computes the expression on the current raw words of the leaf objects, returns a FXP or FXPArray object
+        if out (FXPArray object of the result shape) is given, the result is stored in its raw words and out is returned,
+        out takes the format of the result, same as FXPArray.add
+        '''
+        if(self._plan is None):
+            self._plan = self._compile()
+        order, args, uses, bits, array = self._plan
+        if(array):
+            FXPArray._check_width(bits)
+        regs  = [None]*len(order)
+        owned = [False]*len(order)
+        last  = len(order) - 1
+        for i, node in enumerate(order):
+            if(node.op == 'leaf'):
+                if(node.obj.fmt is not node.fmt):
+                    raise Exception("format of a leaf object has changed, the expression must be built again")
+                regs[i] = node.obj._val
+                continue
+            x = [regs[k] for k in args[i]]
+            if(node.fmt.type == dtype.float or node.frac is None):
+                v = Expr._float_op(node, x)
+                mine = isinstance(v, numpy.ndarray) and not any(v is y for y in x)
+            else:
+                # operands are widened to the container of the exact results of the node, the first operand is
+                # overwritten if it is a widened copy or an intermediate result which is not used by another node
+                k = args[i][0]
+                x = [FXPArray._words(y, node.bits) if isinstance(y, numpy.ndarray) else y for y in x]
+                inplace = isinstance(x[0], numpy.ndarray) and (x[0] is not regs[k] or (owned[k] and uses[k] == 1))
+                v, mine = Expr._int_op(node, x, inplace)
+            if(i == last):
+                return Expr._result(node, v, mine, out)
+            if(node.requant):
+                v, mine = Expr._requantize(node, v), True
+            elif(node.frac is not None and node.fmt.frac > node.frac):
+                v = Expr._shl(v, node.fmt.frac - node.frac, mine)
+                mine = mine or isinstance(v, numpy.ndarray)
+            regs[i], owned[i] = v, mine
+        return Expr._result(self, regs[last], owned[last], out)
+
+    def _shl(v, shift, inplace):
+        # private method, returns the integer values v left shifted by shift bits, in place if inplace is True
+        if(shift == 0):
+            return v
+        if(inplace):
+            return numpy.left_shift(v, shift, out=v)
+        return v << shift
+
+    def _int_op(node, x, inplace):
+        '''
+        private method
+        returns the exact results of the node from the raw words of its operands x and whether the results are owned by
+        the kernel, the first operand is overwritten when inplace is True
+        '''
+        op = node.op
+        if(op in ('add', 'sub', 'mul')):
+            a, b = x
+            inplace = inplace and (numpy.ndim(b) == 0 or b.shape == a.shape) and numpy.result_type(a, b) == a.dtype
+            if(op == 'mul'):
+                return (numpy.multiply(a, b, out=a) if inplace else a * b), True
+            fa, fb = node.args[0].fmt, node.args[1].fmt
+            a = Expr._shl(a, node.frac - fa.frac, inplace)
+            b = Expr._shl(b, node.frac - fb.frac, False)
+            if(op == 'add'):
+                return (numpy.add(a, b, out=a) if inplace else a + b), True
+            return (numpy.subtract(a, b, out=a) if inplace else a - b), True
+        a = x[0]
+        if(op == 'neg'):
+            return (numpy.negative(a, out=a) if inplace else -a), True
+        elif(op == 'abs'):
+            return (numpy.abs(a, out=a) if inplace else abs(a)), True
+        elif(op == 'zero'):
+            return a*0, True
+        # shl, shr and copy keep the raw words, only the fractional width of the exact results changes
+        return a, inplace
+
+    def _float_op(node, x):
+        # private method, returns the results of a float node (or a conversion of a float node) from the values of its operands x
+        op = node.op
+        if(op == 'add'):
+            return x[0] + x[1]
+        elif(op == 'sub'):
+            return x[0] - x[1]
+        elif(op == 'mul'):
+            return x[0] * x[1]
+        elif(op == 'neg'):
+            return -x[0]
+        elif(op == 'abs'):
+            return abs(x[0])
+        elif(op == 'shl'):
+            return x[0]*(int(1)<<node.shift)
+        elif(op == 'shr'):
+            return x[0]/(int(1)<<node.shift)
+        elif(op == 'zero'):
+            return x[0]*0
+        elif(node.frac is not None):
+            # fixedpoint to float copy
+            return x[0]/(int(1)<<node.frac)
+        return x[0]
+
+    def _requantize(node, v):
+        # private method, returns the raw words of the node from its exact results v (or float values), rounding/truncation and saturation/wrap around are applied by FXP/FXPArray
+        fmt = node.fmt
+        if(isinstance(v, numpy.ndarray)):
+            if(node.frac is None):
+                return FXPArray._quantize(v, fmt)[0]
+            return FXPArray._from_int(v, node.frac, fmt)._val
+        if(node.frac is None):
+            return FXP(v, fmt)._val
+        return FXP._from_int(v, node.frac, fmt)._val
+
+    def _result(node, v, owned, out):
+        # private method, returns the FXP/FXPArray object of the results v of the last node, see evaluate
+        fmt = node.fmt
+        if(not isinstance(v, numpy.ndarray) and out is None):
+            if(fmt.type == dtype.float):
+                return FXP(v, fmt)
+            elif(node.requant):
+                return FXP(v, fmt) if node.frac is None else FXP._from_int(v, node.frac, fmt)
+            obj = FXP.__new__(FXP)
+            obj._read_template(fmt)
+            obj._val = v << (fmt.frac - node.frac)
+            return obj
+        if(fmt.type == dtype.float):
+            return FXPArray._float_result(v, fmt, out)
+        elif(node.requant and node.frac is not None):
+            return FXPArray._from_int(v, node.frac, fmt, out)
+        elif(node.requant):
+            v, owned = FXPArray._quantize(v, fmt)[0], True
+        else:
+            v = Expr._shl(v, fmt.frac - node.frac, owned)
+            owned = owned or fmt.frac > node.frac
+        obj = out if out is not None else FXPArray.__new__(FXPArray)
+        obj._read_template(fmt)
+        if(out is None and not owned):
+            # the words of a leaf object are not shared with the result
+            v = numpy.array(v, dtype=FXPArray._container(fmt))
+        obj._store(v, None if out is None else out._val)
+        return obj
@@ -0,0 +1,330 @@
+#   Copyright:
+#       Copyright 2017 Ahmad RezazadehReyhani
+#
+#       Licensed under the Apache License, Version 2.0 (the 'License');
+#       you may not use this file except in compliance with the License.
+#       You may obtain a copy of the License at
+#
+#          http://www.apache.org/licenses/LICENSE-2.0
+#
+#       Unless required by applicable law or agreed to in writing, software
+#       distributed under the License is distributed on an 'AS IS' BASIS,
+#       WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#       See the License for the specific language governing permissions and
+#       limitations under the License.
+#
+#   Acknowledgment:
+#       Grateful appreciation to the Farhang Wireless Inc. for their support and generously funding the implementation of this library.
+#       http://farhangwireless.com/
+
+
+import os
+import numpy
+from fixedpointlib import FXPArray, Format, dtype, modes
+
+
+def _format(template):
+    # private function, returns the format of a template, (intg, frac, type) tuples are completed with (FULL, False, False)
+    if(isinstance(template, tuple) and not isinstance(template, Format) and len(template) == 3):
+        template = template + (modes.FULL, False, False)
+    fmt = Format.of(template)
+    if(fmt.type == dtype.float):
+        raise Exception("raw files must have a fixedpoint format")
+    return fmt
+
+
+def _unpack(data, bitoffset, n, width, bitorder):
+    # private function, unpacks n bit-packed words of width bits starting at bitoffset of the byte array data to uint64 values
+    if(width <= 56):
+        # words 8*m+j start every width bytes, so each of them is read by a strided 8 byte view of the data
+        m    = (n + 7) // 8
+        data = numpy.concatenate((numpy.asarray(data), numpy.zeros(width + 8, dtype=numpy.uint8)))
+        out  = numpy.empty(8*m, dtype=numpy.uint64)
+        mask = numpy.uint64((1<<width) - 1)
+        for j in range(8):
+            pos  = bitoffset + j*width
+            view = numpy.ndarray((m,), dtype='<u8' if bitorder == 'little' else '>u8', buffer=data, offset=pos >> 3, strides=(width,))
+            if(bitorder == 'little'):
+                out[j::8] = (view >> numpy.uint64(pos & 7)) & mask
+            else:
+                out[j::8] = (view >> numpy.uint64(64 - width - (pos & 7))) & mask
+        return out[:n]
+    bits = numpy.unpackbits(data, bitorder=bitorder)[bitoffset:bitoffset + n*width].reshape(n, width)
+    if(bitorder == 'big'):
+        bits = bits[:, ::-1]
+    bits = numpy.concatenate((bits, numpy.zeros((n, 64 - width), dtype=numpy.uint8)), axis=1)
+    return numpy.packbits(bits, axis=1, bitorder='little').view('<u8').reshape(n)
+
+
+def _pack(words, bitoffset, width, bitorder):
+    # private function, returns the bytes of the words (width bits each, masked) packed starting at bitoffset (0 to 7) of the first byte
+    n = len(words)
+    nbytes = (bitoffset + n*width + 7) // 8
+    if(n == 0):
+        return numpy.zeros(0, dtype=numpy.uint8)
+    if(width <= 56):
+        # words 8*m+j start every width bytes, each of their 8 byte windows is ORed into the output by strided views
+        m     = (n + 7) // 8
+        out   = numpy.zeros(m*width + 16, dtype=numpy.uint8)
+        words = numpy.concatenate((numpy.asarray(words, dtype=numpy.uint64), numpy.zeros(8*m - n, dtype=numpy.uint64)))
+        for j in range(8):
+            pos = bitoffset + j*width
+            if(bitorder == 'little'):
+                v = (words[j::8] << numpy.uint64(pos & 7)).astype('<u8')
+            else:
+                v = (words[j::8] << numpy.uint64(64 - width - (pos & 7))).astype('>u8')
+            v = v.view(numpy.uint8).reshape(m, 8)
+            for i in range(8):
+                view = numpy.ndarray((m,), dtype=numpy.uint8, buffer=out, offset=(pos >> 3) + i, strides=(width,))
+                view |= v[:, i]
+        return out[:nbytes]
+    bits = numpy.unpackbits(numpy.asarray(words, dtype='<u8').view(numpy.uint8).reshape(-1, 8), axis=1, bitorder='little')[:, :width]
+    if(bitorder == 'big'):
+        bits = bits[:, ::-1]
+    bits = numpy.concatenate((numpy.zeros(bitoffset, dtype=numpy.uint8), bits.reshape(-1)))
+    return numpy.packbits(bits, bitorder=bitorder)
+
+
+class RawReader:
+    '''
+    Memory-mapped reader of raw binary files of two's complement words (e.g. test vectors of RTL testbenches)
+    The file is memory-mapped with numpy, samples are only read and sign-extended/unpacked for the requested range,
+    so captures larger than the memory can be processed in chunks.
+
+    Parameters:
+    - path      : file name
+    - template  : format of the words, (intg, frac, type) tuple or any template (tuple, Format, FXP or FXPArray)
+    - container : numpy dtype of the containers of the words e.g. numpy.int16 or '>i2' for big-endian files,
+                  the words are in the lowest bits of the containers and the upper bits are ignored
+    - packed    : if set to True, the words are tightly bit-packed without containers
+    - bitorder  : bit order of packed words, 'little' (LSB of the first word is the LSB of the first byte) or 'big'
+    - offset    : number of header bytes to skip
+    - n         : number of samples (default: all complete words of the file)
+
+    The padding bits of the last byte of a packed file are read as one more zero word when they are at least the word width,
+    e.g. 3 words of 3 bits leave 7 padding bits. Without n, packed files of words narrower than 8 bits are ambiguous,
+    give the number of written samples to read them back exactly.
+
+    words is the zero-copy numpy.memmap of the containers (or bytes of packed files).
+    Samples are read without copying (read only raw words of the memmap) when the words of a signed format fill the containers
+    and the container is the native byte order container of the format (see FXPArray.compact), e.g. (0,15,dtype.fxp) in
+    numpy.int16. Otherwise reads copy the words once for the sign extension and the conversion to the container of the format.
+
+    Example:
+        r = RawReader('adc.bin', (0,11,dtype.fxp), numpy.int16)
+        x = r[1000:2000]                # FXPArray object
+        for x in r.chunks(65536):       # chunks can be passed to fixedpointstream.Pipeline.run
+            ...
+    '''
+    def __init__(self, path, template, container=numpy.int16, packed=False, bitorder='little', offset=0, n=None):
+        self.fmt      = _format(template)
+        self.packed   = packed
+        self.bitorder = bitorder
+        # numpy.memmap does not map empty files
+        empty = os.path.getsize(path) <= offset
+        if(packed):
+            FXPArray._check_width(self.fmt.width)
+            self.words = numpy.zeros(0, dtype=numpy.uint8) if empty else numpy.memmap(path, dtype=numpy.uint8, mode='r', offset=offset)
+            self._len  = (len(self.words)*8) // self.fmt.width
+        else:
+            self.container = numpy.dtype(container)
+            if(self.fmt.width > 8*self.container.itemsize):
+                raise Exception("words are wider than the container")
+            self.words = numpy.zeros(0, dtype=self.container) if empty else numpy.memmap(path, dtype=self.container, mode='r', offset=offset)
+            self._len  = len(self.words)
+            self._same = self.container == FXPArray._container(self.fmt)
+            self._full = self._same and self.fmt.signed and self.fmt.width == 8*self.container.itemsize
+        if(n is not None):
+            if(n > self._len):
+                raise Exception("the file has less than n samples")
+            self._len = n
+
+    def __len__(self):
+        return self._len
+
+    def _raw(self, start, stop):
+        # private method, returns the sign-extended raw words of samples start to stop, in the container of the format when possible
+        fmt = self.fmt
+        if(not self.packed and self._full):
+            # every container value is a word of the format, the memmap is not copied
+            return self.words[start:stop]
+        if(not self.packed and self._same):
+            # sign extension in the container of the format, one copy
+            return numpy.asarray(((self.words[start:stop] + fmt.half) & fmt.mask) - fmt.half)
+        if(self.packed):
+            # only the bytes of the requested words are read, the first word can start inside a byte
+            first = (start*fmt.width) // 8
+            last  = (stop*fmt.width + 7) // 8
+            words = _unpack(self.words[first:last], start*fmt.width - first*8, stop-start, fmt.width, self.bitorder).astype(numpy.int64)
+        else:
+            words = numpy.asarray(self.words[start:stop]).astype(numpy.int64)
+        # sign extension of the lowest width bits
+        return ((words + fmt.half) & fmt.mask) - fmt.half
+
+    def __getitem__(self, index):
+        '''
+        returns the samples of a slice (step 1) as a FXPArray object
+        '''
+        if(isinstance(index, slice) and index.step in (None, 1)):
+            start, stop, step = index.indices(self._len)
+            return FXPArray.from_raw(self._raw(start, max(start, stop)), self.fmt)
+        raise Exception("only slices with step 1 are supported")
+
+    def chunks(self, chunk_size=65536):
+        # generator of FXPArray objects of chunk_size samples (the last chunk can be shorter)
+        for start in range(0, self._len, chunk_size):
+            yield self[start:start+chunk_size]
+
+
+class RawWriter:
+    '''
+    Writer of raw binary files of two's complement words, the counterpart of RawReader
+    Chunks are appended to the file, bit-packed files keep the incomplete last byte until the next write or close(),
+    so the file is identical for any chunk size.
+
+    Parameters are the same as RawReader, words are written to the lowest bits of the containers and sign-extended
+    to the container width for signed formats.
+
+    Example:
+        with RawWriter('dac.bin', (0,11,dtype.fxp), packed=True) as w:
+            for x in p.run(source):
+                w.write(x)
+    '''
+    def __init__(self, path, template, container=numpy.int16, packed=False, bitorder='little', append=False):
+        self.fmt      = _format(template)
+        self.packed   = packed
+        self.bitorder = bitorder
+        self._tail    = 0
+        self._nbits   = 0
+        if(not packed):
+            self.container = numpy.dtype(container)
+            if(self.fmt.width > 8*self.container.itemsize):
+                raise Exception("words are wider than the container")
+        self._file = open(path, 'ab' if append else 'wb')
+
+    def write(self, x):
+        '''
+        public method
+        appends the samples of a FXPArray object (converted to the writer format if needed) or an array of raw words
+        '''
+        fmt = self.fmt
+        if(isinstance(x, FXPArray)):
+            if(x.fmt != fmt):
+                x = x.copy(fmt)
+            raw = x._val.astype(numpy.int64)
+        else:
+            raw = numpy.asarray(x, dtype=numpy.int64)
+        if(self.packed):
+            if(len(raw) == 0):
+                return
+            data = _pack(raw & fmt.mask, self._nbits, fmt.width, self.bitorder)
+            data[0] |= self._tail
+            self._nbits = (self._nbits + len(raw)*fmt.width) % 8
+            self._tail  = 0
+            if(self._nbits > 0):
+                # incomplete last byte is kept until the next write
+                self._tail = int(data[-1])
+                data = data[:-1]
+            self._file.write(data.tobytes())
+        else:
+            self._file.write(raw.astype(self.container).tobytes())
+
+    def close(self):
+        # public method, writes the remaining bits (padded with zeros to a byte) and closes the file
+        if(self._nbits > 0):
+            self._file.write(bytes([self._tail]))
+            self._nbits = 0
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def load_raw(path, template, container=numpy.int16, packed=False, bitorder='little', offset=0, n=None):
+    '''
+    public function
+    returns all samples (or the first n samples) of a raw binary file as a FXPArray object, see RawReader for the parameters
+    and for packed files of words narrower than 8 bits. use RawReader for files larger than the memory
+    '''
+    r = RawReader(path, template, container, packed, bitorder, offset, n)
+    return r[0:len(r)]
+
+
+def save_raw(path, x, template=None, container=numpy.int16, packed=False, bitorder='little'):
+    '''
+    public function
+    writes the samples of FXPArray object x to a raw binary file, see RawWriter for the parameters
+    template defaults to the format of x
+    '''
+    with RawWriter(path, x if template is None else template, container, packed, bitorder) as w:
+        w.write(x)
+
+
+def pack(x, bitorder='little'):
+    '''
+    public function
+    returns the raw words of all elements of FXPArray object x tightly bit-packed (width bits per word) as a numpy uint8
+    array, in the same layout as packed raw files. it is the densest form for archiving large captures, e.g. in npz files.
+
+    Example:
+        data = pack(x)
+        y = unpack(data, x, len(x))
+    '''
+    fmt = _format(x)
+    raw = x._val.reshape(-1).astype(numpy.int64)
+    return _pack(raw & fmt.mask, 0, fmt.width, bitorder)
+
+
+def unpack(data, template, n=None, bitorder='little'):
+    '''
+    public function
+    returns the first n words (default: all complete words) of bit-packed data (bytes or numpy uint8 array) as a FXPArray
+    object of the given template, see pack
+    without n, padding bits of the last byte are read as one more zero word when they are at least the word width (words
+    narrower than 8 bits), see RawReader
+    '''
+    fmt = _format(template)
+    FXPArray._check_width(fmt.width)
+    data = numpy.frombuffer(data, dtype=numpy.uint8) if isinstance(data, bytes) else numpy.asarray(data, dtype=numpy.uint8)
+    if(n is None):
+        n = (len(data)*8) // fmt.width
+    elif(n*fmt.width > len(data)*8):
+        raise Exception("data has less than n words")
+    words = _unpack(data, 0, n, fmt.width, bitorder).astype(numpy.int64)
+    # sign extension of the lowest width bits
+    return FXPArray.from_raw(((words + fmt.half) & fmt.mask) - fmt.half, fmt)
+
+
+def _save_text(path, x, kind, prefix, chunk_size):
+    # private function, writes one hex/binary line per sample of x (FXPArray or RawReader object) in chunks
+    source = x.chunks(chunk_size) if isinstance(x, RawReader) else (x[i:i+chunk_size] for i in range(0, len(x), chunk_size))
+    with open(path, 'wb') as f:
+        for chunk in source:
+            chars = chunk._chars(kind, prefix)
+            newline = numpy.full((len(chars), 1), ord('\n'), dtype=numpy.uint8)
+            f.write(numpy.concatenate((chars, newline), axis=1).tobytes())
+
+
+def save_hex(path, x, prefix=True, chunk_size=65536):
+    '''
+    public function
+    writes the hex representation of the samples of x (FXPArray or RawReader object) to a text file, one sample per line
+    lines are identical to FXP.to_hex, e.g. 'fxp:CD', the width is padded to a multiple of 4 bits by sign extension
+    - prefix        : if set to False, the type prefix is not written e.g. for $readmemh files
+    - chunk_size    : number of samples formatted and written at once
+    '''
+    _save_text(path, x, 'hex', prefix, chunk_size)
+
+
+def save_binary(path, x, prefix=True, chunk_size=65536):
+    '''
+    public function
+    writes the binary representation of the samples of x (FXPArray or RawReader object) to a text file, one sample per line
+    lines are identical to FXP.to_binary, e.g. 'fxp:10011.01'
+    - prefix        : if set to False, the type prefix is not written
+    - chunk_size    : number of samples formatted and written at once
+    '''
+    _save_text(path, x, 'bin', prefix, chunk_size)
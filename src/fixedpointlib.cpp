@@ -23,7 +23,10 @@
 #include <cassert>
 #include <cmath>
 
+// debug checks, disabled by -DNDEBUG (release builds of generated models, see fixedpointcpp.py)
+#ifndef NDEBUG
 #define _DEBUG
+#endif
 
 #define fastfloor(x) ((double)(int64_t)x - (x < (double)(int64_t)x))
 #define fastceil(x)  ((double)(int64_t)x + (x > (double)(int64_t)x))
@@ -208,7 +211,7 @@ public:
         }
         else
         {
-            if( (this->intg < 31) & (this->frac < 31))
+            if((this->intg + this->frac) < 63)
             {
                 this->pinf =  ((double)( (((int64_t)1) << (this->intg+this->frac) ) - 1 )) / this->shift;
                 this->ninf = ((this->type == d_UINT) | (this->type == d_UFXP)) ? 0 : -((double)(((int64_t)1) << (this->intg+this->frac) )) / this->shift;
@@ -305,9 +308,10 @@ public:
     //# private method, converts a floating point number to an signed integer value of given width
     void _to_signed(double val)
     {
-        double  temp = val * this->shift;
+        // exact for the power of two modulus, keeps the values in int64 range of the cast, floor and rounding are not changed
+        double  temp = fmod(val * this->shift, (double)this->full);
         if(this->rounding)
-            temp = round(temp);
+            temp = rint(temp);      // half to even, same as fixedpointlib.py
         else
             temp = fastfloor(temp);
         int64_t tempint = (((int64_t)temp + this->half) % this->full);
@@ -319,9 +323,10 @@ public:
     // private method, converts a floating point number to an unsigned integer value of given width
     void _to_unsigned(double val)
     {
-        double  temp = val * this->shift;
+        // exact for the power of two modulus, keeps the values in int64 range of the cast, floor and rounding are not changed
+        double  temp = fmod(val * this->shift, (double)this->full);
         if(this->rounding)
-            temp = round(temp);
+            temp = rint(temp);      // half to even, same as fixedpointlib.py
         else
             temp = fastfloor(temp);
         int64_t tempint = (int64_t)temp  % this->full;
@@ -501,7 +506,7 @@ bool operator!=(FXP a, TYPE b)
 // -----------------------------------
 FXP operator>>(FXP a, int b)
 {
-    return FXP(a.val()/(1<<b), tuple((int)fastmin(a.intg-b, 0), a.frac+b, a.type, a.opmode, a.sat, a.rounding));
+    return FXP(a.val()/(1<<b), tuple((int)fastmax(a.intg-b, 0), a.frac+b, a.type, a.opmode, a.sat, a.rounding));
 }
 // -----------------------------------
 FXP operator<<(FXP a, int b)
@@ -605,6 +610,14 @@ FXP _add(FXP a, FXP b)
     #endif
     return _add(a, b, a.opmode, a.sat, a.rounding);
 }
+/*
+adds two objects and requantizes the exact sum to the given template, custom output parameter selection
+same as FXP.add(a, b, intg, frac, type, opmode, sat, round) of fixedpointlib.py
+*/
+FXP _add(FXP a, FXP b, tuple templ)
+{
+    return _add(a, b, FULL, templ.sat, templ.rounding).copy(templ);
+}
 // -----------------------------------
 FXP _sub(FXP a, FXP b, modes opmode, bool sat, bool rounding)
 {
@@ -676,6 +689,14 @@ FXP _sub(FXP a, FXP b)
     #endif
     return _sub(a, b, a.opmode, a.sat, a.rounding);
 }
+/*
+subtracts two objects and requantizes the exact difference to the given template, custom output parameter selection
+same as FXP.sub(a, b, intg, frac, type, opmode, sat, round) of fixedpointlib.py
+*/
+FXP _sub(FXP a, FXP b, tuple templ)
+{
+    return _sub(a, b, FULL, templ.sat, templ.rounding).copy(templ);
+}
 // -----------------------------------
 /*
 returns product of two object or and object and an integer number (integer number will be converted to same type object with zero fractional width)
@@ -745,6 +766,14 @@ FXP _mul(FXP a, FXP b)
     #endif
     return _mul(a, b, a.opmode, a.sat, a.rounding);
 }
+/*
+multiplies two objects and requantizes the exact product to the given template, custom output parameter selection
+same as FXP.mul(a, b, intg, frac, type, opmode, sat, round) of fixedpointlib.py
+*/
+FXP _mul(FXP a, FXP b, tuple templ)
+{
+    return _mul(a, b, FULL, templ.sat, templ.rounding).copy(templ);
+}
 // -----------------------------------
 FXP operator+(FXP a, FXP b)
 {
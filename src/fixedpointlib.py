@@ -18,7 +18,13 @@
 #       http://farhangwireless.com/
 
 
-from numpy import abs, log2, floor, round, inf
+import ctypes
+import os
+import numpy
+from contextlib import contextmanager
+from functools import lru_cache
+from math import floor
+from numpy import inf
 from bitstring import Bits
 
 
@@ -52,11 +58,93 @@ class modes:
     MANUAL      = 'MANUAL'
 
 
+class Format(tuple):
+    '''
+    Fixedpoint format class
+    Format object is an immutable template tuple (intg, frac, type, opmode, sat, round) which holds the precomputed
+    parameters of the format. Format objects are interned, so equal formats are the same object.
+    Format object can be used anywhere a template tuple is accepted, and FXP/FXPArray objects reference their format.
+    Following parameters are precomputed:
+    - intg, frac, type, opmode, sat, round : template parameters
+    - signed    : True for int, fxp and float types
+    - width     : bit width of the raw words (sign bit is not counted for uint and ufxp)
+    - scale     : 2**frac, raw value = value * scale
+    - lo, hi    : lowest/highest raw values
+    - half      : offset of the signed wrap around, zero for uint and ufxp
+    - mask      : bit mask of raw words, wrap around is (((raw + half) & mask) - half)
+    - pinf, ninf: highest/lowest values, see FXP.pinf and FXP.ninf
+
+    Example:
+        f = Format(9,5,dtype.fxp, modes.FIXEDFRAC,False,False)
+        a = FXP(-11.9341, f)
+        g = Format.of(a)
+    '''
+    _cache = {}
+
+    def __new__(cls, intg, frac, type, opmode, sat, round):
+        key = (intg, frac, type, opmode, sat, round)
+        fmt = Format._cache.get(key)
+        if(fmt is None):
+            fmt = tuple.__new__(cls, key)
+            fmt._set_bounds()
+            Format._cache[key] = fmt
+        return fmt
+
+    def _set_bounds(self):
+        # private method, precomputes the format parameters
+        intg, frac, type = self[0], self[1], self[2]
+        attrs = dict(intg=intg, frac=frac, type=type, opmode=self[3], sat=self[4], round=self[5])
+        attrs['signed'] = not (type == dtype.uint or type == dtype.ufxp)
+        attrs['scale']  = int(1)<<frac
+        attrs['pinf']   = FXP._pinf(intg, frac, type)
+        attrs['ninf']   = FXP._ninf(intg, frac, type)
+        if(type == dtype.float):
+            attrs.update(width=64, lo=None, hi=None, half=None, mask=None)
+        elif(attrs['signed']):
+            half = int(1)<<(intg + frac)
+            attrs.update(width=intg+frac+1, lo=-half, hi=half-1, half=half, mask=2*half-1)
+        else:
+            full = int(1)<<(intg + frac)
+            attrs.update(width=intg+frac, lo=0, hi=full-1, half=0, mask=full-1)
+        self.__dict__.update(attrs)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Format object is immutable")
+
+    def __reduce__(self):
+        return (Format, tuple(self))
+
+    def __repr__(self):
+        return 'Format' + tuple.__repr__(self)
+
+    def of(template):
+        '''
+        public method
+        returns the interned format of the given template (tuple, Format, FXP or FXPArray object)
+        '''
+        if(isinstance(template, Format)):
+            return template
+        elif(isinstance(template, tuple)):
+            fmt = Format._cache.get(template)
+            if(fmt is None):
+                fmt = Format(*template)
+            return fmt
+        elif(isinstance(template, (FXP, FXPArray))):
+            return template.fmt
+        else:
+            raise Exception("wrong input format")
+
+    def _with(self, index, value):
+        # private method, returns the format with the parameter of given index replaced by value
+        return Format(*(self[:index] + (value,) + self[index+1:]))
+
+
 class FXP:
     '''
     Fixedpoint variable class
     Fixedpoint object has following properties:
     - _val      : the value stored in the object
+    - fmt       : the interned Format object which holds the following parameters, shared between objects with the same parameters
     - intg      : integer width of the object
     - frac      : fractional width of the object
     - type      : type of the object e.g. int or fxp. will be chosen from dtype class
@@ -69,6 +157,8 @@ class FXP:
             a = FXP(-11.9341, (9,5,dtype.fxp, modes.FIXEDFRAC,False,False))
         - pass a value and another object as template to constructor
             a = FXP(4.23974, another_FXP_object)
+        - pass a value and a Format object, it avoids the template lookup of tuples
+            a = FXP(-11.9341, Format(9,5,dtype.fxp, modes.FIXEDFRAC,False,False))
 
     If you need to assign object a to object b then use copy() method to assign an independent copy of a to b otherwise both objects will point to same point
         b = a.copy()
@@ -79,6 +169,11 @@ class FXP:
         b.convert(template=templ)
         if both template and individual parameters are provided, individual parameters will be used and remaining parameters will be copied from template
 
+    In place operators +=, -= and *= change the value of the object in place and keep its format, the exact result is
+    rounded/truncated and saturated/wrapped around to the format of the object. b = a; a += c changes b too.
+        acc = FXP(0, (8,12,dtype.fxp, modes.FIXEDWIDTH,True,True))
+        acc += x * h
+
         def debug(enable=None):
         if(isinstance(enable,bool)):
             FXP._DBG = enable
@@ -113,14 +208,23 @@ class FXP:
         y = 2 - a
         z = a * b
     '''
+    __slots__ = ('_val', 'fmt', '_shadow')
     _DBG      = False
+    # saturation/wrap around event counters, see count()
+    _COUNT    = False
+    _signal   = None
+    _events   = {}
+    # float shadow mode, see shadow()
+    _SHADOW   = False
+    _plain    = {}
+    _errors   = {}
 
     def __init__(self, val, template):
         '''
         public method
         Class constructor
         val is a floating point value
-        template is a tuple or another FXP object
+        template is a tuple or another FXP/FXPArray object
         '''
         self._read_template(template)
         self._set_val(val)
@@ -130,86 +234,162 @@ class FXP:
         private method
         Extracts object parameters from the given template
         '''
-        if(isinstance(template, tuple)):
-            self.intg   = template[0]
-            self.frac   = template[1]
-            self.type   = template[2]  # uint, int, fxp, ufxp, float
-            self.opmode = template[3]  # FULL, FIXEDFRAC, FIXEDWIDTH
-            self.sat    = template[4]  # False, True
-            self.round  = template[5]  # False, True
-        elif(isinstance(template, FXP)):
-            self.intg   = template.intg
-            self.frac   = template.frac
-            self.type   = template.type
-            self.opmode = template.opmode
-            self.sat    = template.sat
-            self.round  = template.round
+        if(isinstance(template, Format)):
+            self.fmt = template
+        elif(isinstance(template, tuple)):
+            fmt = Format._cache.get(template)
+            self.fmt = fmt if fmt is not None else Format.of(template)
+        elif(isinstance(template, (FXP, FXPArray))):
+            self.fmt = template.fmt
         else:
             raise Exception("wrong input format")
 
+    @property
+    def intg(self):
+        # integer width of the object
+        return self.fmt.intg
+
+    @intg.setter
+    def intg(self, value):
+        self.fmt = self.fmt._with(0, value)
+
+    @property
+    def frac(self):
+        # fractional width of the object
+        return self.fmt.frac
+
+    @frac.setter
+    def frac(self, value):
+        self.fmt = self.fmt._with(1, value)
+
+    @property
+    def type(self):
+        # type of the object, uint, int, fxp, ufxp, float
+        return self.fmt.type
+
+    @type.setter
+    def type(self, value):
+        self.fmt = self.fmt._with(2, value)
+
+    @property
+    def opmode(self):
+        # operation mode of the object, FULL, FIXEDFRAC, FIXEDWIDTH, MANUAL
+        return self.fmt.opmode
+
+    @opmode.setter
+    def opmode(self, value):
+        self.fmt = self.fmt._with(3, value)
+
+    @property
+    def sat(self):
+        # saturation mode of the object, False, True
+        return self.fmt.sat
+
+    @sat.setter
+    def sat(self, value):
+        self.fmt = self.fmt._with(4, value)
+
+    @property
+    def round(self):
+        # rounding mode of the object, False, True
+        return self.fmt.round
+
+    @round.setter
+    def round(self, value):
+        self.fmt = self.fmt._with(5, value)
+
+    def _from_int(raw, frac, template):
+        '''
+        private method
+        returns an object with the given template from exact integer value raw with given fractional width
+        rounding/truncation and saturation/wrap around are applied in integer domain without floating point conversion
+        '''
+        obj = FXP.__new__(FXP)
+        obj._read_template(template)
+        obj._requantize(raw, frac)
+        return obj
+
+    def _constant(b, template):
+        '''
+        private method
+        returns an object of integer number b of the operator dispatch
+        the constant is exact, it is not constructed by __init__ and so it is not tracked in shadow mode
+        '''
+        obj = FXP.__new__(FXP)
+        obj._read_template(template)
+        obj._set_val(b)
+        return obj
+
     def _set_val(self, val):
         '''
         private method
         sets the internal value of the object based on the given parameters
         saturation/rounding/with set/change is applied in this method
         '''
-        pinf = FXP._pinf(self.intg, self.frac, self.type)
-        ninf = FXP._ninf(self.intg, self.frac, self.type)
+        fmt = self.fmt
+        if(fmt.type == dtype.float):
+            # special inputs
+            if(val == 'inf'):
+                val = inf
+            if(val == '-inf'):
+                val = -inf
+            self._val = val
+            return
+        assert (fmt.frac == 0) or (fmt.type != dtype.int and fmt.type != dtype.uint) or not FXP._DBG, 'fractional width must be zero'
         # special inputs
-        if(val == 'inf' or val == float('inf')):
-            val = pinf
-        if(val == '-inf' or val == -float('inf')):
-            val = ninf
-        # saturation
-        if(self.sat):
-            if(val > pinf):
-                # if(FXP._DBG):
-                    # print(Fore.YELLOW + 'saturation !' + Style.RESET_ALL, self.intg, self.frac, pinf, val)
-                val = pinf
-            if(val < ninf):
-                # if(FXP._DBG):
-                    # print(Fore.YELLOW + 'saturation !' + Style.RESET_ALL, self.intg, self.frac, pinf, val)
-                val = ninf
+        if(val == 'inf' or val == inf):
+            self._val = fmt.hi
+        elif(val == '-inf' or val == -inf):
+            self._val = fmt.lo
         else:
-            if(val > pinf):
+            assert (val >= 0) or fmt.signed or not FXP._DBG, 'unsigned number must be non-negative'
+            self._set_raw(round(val*fmt.scale) if fmt.round else floor(val*fmt.scale))
+
+    def _requantize(self, raw, frac):
+        '''
+        private method
+        sets the internal value of the object from exact integer value raw with given fractional width
+        removed fractional bits are rounded (half to even, same as rounding of floating point values) or truncated
+        '''
+        fmt = self.fmt
+        if(fmt.type == dtype.float):
+            self._val = raw/(int(1)<<frac)
+            return
+        shift = frac - fmt.frac
+        if(shift > 0):
+            if(fmt.round):
+                temp = raw >> shift
+                rem  = raw & ((int(1)<<shift) - 1)
+                half = int(1)<<(shift - 1)
+                raw  = temp + (rem > half or (rem == half and (temp & 1) == 1))
+            else:
+                raw = raw >> shift
+        elif(shift < 0):
+            raw = raw << (-shift)
+        self._set_raw(raw)
+
+    def _set_raw(self, raw):
+        # private method, saturates or wraps around an integer value to the signed/unsigned integer value of given width
+        fmt = self.fmt
+        if(fmt.sat):
+            if(raw > fmt.hi):
                 # if(FXP._DBG):
-                    # print(Fore.RED + 'overflow !' + Style.RESET_ALL, self.intg, self.frac, pinf, val)
-                pass
-            if(val < ninf):
+                    # print(Fore.YELLOW + 'saturation !' + Style.RESET_ALL, fmt.intg, fmt.frac, raw)
+                raw = fmt.hi
+            elif(raw < fmt.lo):
                 # if(FXP._DBG):
-                    # print(Fore.RED + 'overflow !' + Style.RESET_ALL, self.intg, self.frac, pinf, val)
-                pass
-        if(self.type == dtype.float):
-            self._val = val
-        elif(self.type == dtype.int):
-            assert (self.frac == 0) or not FXP._DBG, 'fractional width must be zero'
-            self._to_signed(val)
-        elif(self.type == dtype.uint):
-            assert (self.frac == 0) or not FXP._DBG, 'fractional width must be zero'
-            assert (val >= 0) or not FXP._DBG, 'unsigned number must be non-negative'
-            self._to_unsigned(val)
-        elif(self.type == dtype.fxp):
-            self._to_signed(val)
-        elif(self.type == dtype.ufxp):
-            assert (val >= 0) or not FXP._DBG, 'unsigned number must be non-negative'
-            self._to_unsigned(val)
-
-    def _to_signed(self, val):
-        # private method, converts a floating point number to an signed integer value of given width
-        half = int(1)<<(self.intg + self.frac)
-        full = int(1)<<(self.intg + self.frac + 1)
-        if(self.round):
-            self._val = ((int(round(val*int(int(1)<<self.frac)))+half)%int(full))-half
-        else:
-            self._val = ((int(floor(val*int(int(1)<<self.frac)))+half)%int(full))-half
-
-    def _to_unsigned(self, val):
-        # private method, converts a floating point number to an unsigned integer value of given width
-        full = (int(1)<<(self.intg + self.frac))
-        if(self.round):
-            self._val = ((int(round(val*int(int(1)<<self.frac))))%int(full))
-        else:
-            self._val = ((int(floor(val*int(int(1)<<self.frac))))%int(full))
+                    # print(Fore.YELLOW + 'saturation !' + Style.RESET_ALL, fmt.intg, fmt.frac, raw)
+                raw = fmt.lo
+        self._val = ((raw + fmt.half) & fmt.mask) - fmt.half
+
+    _set_raw_plain = _set_raw
+
+    def _set_raw_counted(self, raw):
+        # private method, _set_raw which counts the saturation/wrap around events, it replaces _set_raw when counting is enabled
+        fmt = self.fmt
+        if(raw > fmt.hi or raw < fmt.lo):
+            FXP._event(fmt, 1)
+        FXP._set_raw_plain(self, raw)
 
     def convert(self, intg=None, frac=None, type=None, opmode=None, sat=None, round=None, template=None):
         '''
@@ -217,7 +397,8 @@ class FXP:
         based on the given parameters, changes the object parameters and recalculates the internal value
         can change the internal value because of saturation/overflow, ... .
         '''
-        tempval = self.val()
+        oldtype = self.type
+        oldfrac = self.frac
         if(template is not None):
             self._read_template(template)
         if(intg is not None):
@@ -233,7 +414,10 @@ class FXP:
         if(round is not None):
             self.round = round
 
-        self._set_val(tempval)
+        if(oldtype == dtype.float):
+            self._set_val(self._val)
+        else:
+            self._requantize(self._val, oldfrac)
 
     def pinf(temp_tuple):
         '''
@@ -258,10 +442,7 @@ class FXP:
         if(type == dtype.float):
             return inf
         else:
-            if(intg < 31 and frac < 31):
-                return ((int(1)<<(intg+frac))-1)/int(int(1)<<frac)
-            else:
-                return ((int(1)<<intg)-1)
+            return ((int(1)<<(intg+frac))-1)/(int(1)<<frac)
 
     def _ninf(intg, frac, type):
         '''
@@ -274,17 +455,14 @@ class FXP:
         elif(type == dtype.uint or type == dtype.ufxp):
             return 0
         else:
-            if(intg < 31 and frac < 31):
-                return -((int(1)<<(intg+frac)))/int(int(1)<<frac)
-            else:
-                return -((int(1)<<intg))
+            return -(int(1)<<(intg+frac))/(int(1)<<frac)
 
     def val(self):
         # returns the floating point representation of the object
         if(self.type == dtype.float):
             return self._val
         else:
-            return int(self._val)/(int(1)<<self.frac)
+            return self._val/self.fmt.scale
 
     def copy(self,template=None):
         '''
@@ -292,9 +470,11 @@ class FXP:
         if template is given, its parameters will be used to create new object
         '''
         if(template is None):
-            return FXP(self.val(), self)
+            template = self
+        if(self.type == dtype.float):
+            return FXP(self._val, template)
         else:
-            return FXP(self.val(), template)
+            return FXP._from_int(self._val, self.frac, template)
 
     def to_binary(self):
         '''
@@ -338,7 +518,9 @@ class FXP:
 
     def __neg__(self):
         # returns an object with negative of the value of the object
-        return FXP(-self.val(), self)
+        if(self.type == dtype.float):
+            return FXP(-self._val, self)
+        return FXP._from_int(-self._val, self.frac, self)
 
     def __lt__(self,other):
         # compares an object against another object or number (this obj < other object), (this obj < number)
@@ -396,7 +578,9 @@ class FXP:
 
     def __abs__(self):
         # returns an object with absolute value of the value of the object
-        return FXP(abs(self.val()), self)
+        if(self.type == dtype.float):
+            return FXP(abs(self._val), self)
+        return FXP._from_int(abs(self._val), self.frac, self)
 
     def __add__(self, b):
         # magic function of a + b
@@ -407,8 +591,8 @@ class FXP:
         return FXP._add_dispatch(self, b)
 
     def __iadd__(self, b):
-        # magic function of a += b
-        return FXP._add_dispatch(self, b)
+        # magic function of a += b, the result is stored in place in the format of a
+        return FXP._inplace(self, b, FXP._iadd)
 
     def __sub__(self, b):
         # magic function of a - b
@@ -419,8 +603,8 @@ class FXP:
         return -FXP._sub_dispatch(self, b)
 
     def __isub__(self, b):
-        # magic function of a -= b
-        return FXP._sub_dispatch(self, b)
+        # magic function of a -= b, the result is stored in place in the format of a
+        return FXP._inplace(self, b, FXP._isub)
 
     def __mul__(self, b):
         # magic function of a * b
@@ -431,20 +615,24 @@ class FXP:
         return FXP._mul_dispatch(self, b)
 
     def __imul__(self, b):
-        # magic function of a *= b
-        return FXP._mul_dispatch(self, b)
+        # magic function of a *= b, the result is stored in place in the format of a
+        return FXP._inplace(self, b, FXP._imul)
 
     def __lshift__(self, other):
         # returns an object with its value is left shifted version of the object
         # c = obj << 3
-        return FXP(self.val()*(int(1)<<other), (self.intg+other, max(self.frac-other, 0), self.type, self.opmode, self.sat, self.round))
-        # return FXP(self.val()*(int(1)<<other), self)
+        templ = (self.intg+other, max(self.frac-other, 0), self.type, self.opmode, self.sat, self.round)
+        if(self.type == dtype.float):
+            return FXP(self._val*(int(1)<<other), templ)
+        return FXP._from_int(self._val, self.frac-other, templ)
 
     def __rshift__(self, other):
         # returns an object with its value is right shifted version of the object (sign bit will fill new bits)
         # c = obj >> 3
-        return FXP(self.val()/(int(1)<<other), (min(self.int-other, 0), self.frac+other, self.type, self.opmode, self.sat, self.round))
-        # return FXP(self.val()/(int(1)<<other), self)
+        templ = (max(self.intg-other, 0), self.frac+other, self.type, self.opmode, self.sat, self.round)
+        if(self.type == dtype.float):
+            return FXP(self._val/(int(1)<<other), templ)
+        return FXP._from_int(self._val, self.frac+other, templ)
 
     def add(a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None):
         # adds two object a and b and input parameters will be used to set the output parameters, custom output parameter selection
@@ -458,25 +646,133 @@ class FXP:
         # multiplies two object a and b and input parameters will be used to set the output parameters, custom output parameter selection
         return FXP._mul(a, b, intg, frac, type, opmode, sat, round)
 
+    def _acc_format(fmt, n, guard=None):
+        '''
+        private method
+        returns the accumulator format of n terms of format fmt, the accumulator has guard extra integer bits
+        default guard bits make the accumulator exact for any n terms, fewer guard bits make it wrap around
+        '''
+        if(guard is None):
+            guard = (max(n, 1) - 1).bit_length()
+        return Format(fmt.intg + guard, fmt.frac, fmt.type, fmt.opmode, fmt.sat, fmt.round)
+
+    def _acc_result(acc, fmt, template, cls):
+        '''
+        private method
+        returns an object of class cls (FXP or FXPArray) from the accumulated raw value(s) acc of accumulator format fmt
+        acc is wrapped around to the accumulator width like a hardware accumulator, then it is converted to template
+        (rounding/truncation and saturation/wrap around once at the end) or returned in the accumulator format
+        '''
+        if(fmt.type == dtype.float):
+            return cls(acc, fmt if template is None else template)
+        acc = ((acc + fmt.half) & fmt.mask) - fmt.half
+        return cls._from_int(acc, fmt.frac, fmt if template is None else template)
+
+    def mac(acc, a, b):
+        '''
+        public method
+        multiply-accumulate in place, acc += a * b, and returns acc
+        the exact product is rounded/truncated to the fractional width of acc and added to its raw value, then the sum is
+        saturated or wrapped around to the format of acc. no intermediate object is created.
+        for a hardware accumulator use a wrap around acc with guard bits and convert it at the end.
+        acc, a and b can be FXP objects, or FXPArray objects of the same shape (a or b can be a FXP object)
+
+        Example:
+            acc = FXP(0, (8,24,dtype.fxp, modes.FIXEDWIDTH,False,False))
+            for i in range(len(x)):
+                FXP.mac(acc, x[i], h[i])
+        '''
+        if(isinstance(acc, FXPArray)):
+            return FXPArray.mac(acc, a, b)
+        fa, fb = a.fmt, b.fmt
+        if(acc.type == dtype.float):
+            acc._val = acc._val + a.val() * b.val()
+            return acc
+        assert (fa.type != dtype.float and fb.type != dtype.float) or not FXP._DBG, 'Float - fixedpoint operation is not allowed'
+        shift = fa.frac + fb.frac - acc.frac
+        prod = a._val * b._val
+        if(shift > 0):
+            prod = FXPArray._round_shift(prod, shift, acc.round)
+        elif(shift < 0):
+            prod = prod << (-shift)
+        acc._set_raw(acc._val + prod)
+        return acc
+
+    def dot(a, b, template=None, guard=None):
+        '''
+        public method
+        returns the dot product sum(a[i] * b[i]) of two sequences of FXP objects, computed on raw integer values
+        the exact products (FULL mode format of the first pair) are added in an accumulator with guard extra integer bits,
+        default guard bits (bit length of n-1) make the accumulator exact, with fewer guard bits it wraps around like a
+        hardware accumulator. the accumulator is converted to template once at the end (its rounding and saturation
+        or wrap around), without template the result has the accumulator format.
+        FXPArray objects are reduced along their last axis, see FXPArray.dot
+
+        Example:
+            y = FXP.dot(x, h, template=(3,12,dtype.fxp, modes.FIXEDWIDTH,True,True))
+        '''
+        if(isinstance(a, FXPArray) or isinstance(b, FXPArray)):
+            return FXPArray.dot(a, b, template, guard)
+        if(len(a) != len(b)):
+            raise Exception("sequences must have the same length")
+        if(len(a) == 0):
+            raise Exception("empty sequence")
+        fp = FXP._infer_format('mul', a[0].fmt, b[0].fmt, 0, 0, None, modes.FULL, None, None)
+        intg = max([x.intg + y.intg for x, y in zip(a, b)])
+        frac = max([x.frac + y.frac for x, y in zip(a, b)])
+        fmt = FXP._acc_format(Format(intg, frac, fp.type, a[0].opmode, fp.sat, fp.round), len(a), guard)
+        if(fmt.type == dtype.float):
+            return FXP._acc_result(sum([x._val * y._val for x, y in zip(a, b)]), fmt, template, FXP)
+        acc = 0
+        for x, y in zip(a, b):
+            acc += (x._val * y._val) << (frac - x.frac - y.frac)
+        return FXP._acc_result(acc, fmt, template, FXP)
+
+    def sum(a, template=None, guard=None):
+        '''
+        public method
+        returns the sum of a sequence of FXP objects, computed on raw integer values
+        the terms are added in an accumulator of the format of the first term with guard extra integer bits, see dot
+        FXPArray objects are reduced over all elements, see FXPArray.sum
+
+        Example:
+            s = FXP.sum(x, guard=4)
+        '''
+        if(isinstance(a, FXPArray)):
+            return FXPArray.sum(a, template, guard)
+        if(len(a) == 0):
+            raise Exception("empty sequence")
+        intg = max([x.intg for x in a])
+        frac = max([x.frac for x in a])
+        fmt = FXP._acc_format(a[0].fmt._with(0, intg)._with(1, frac), len(a), guard)
+        if(fmt.type == dtype.float):
+            return FXP._acc_result(sum([x._val for x in a]), fmt, template, FXP)
+        acc = 0
+        for x in a:
+            acc += x._val << (frac - x.frac)
+        return FXP._acc_result(acc, fmt, template, FXP)
+
     def _add_dispatch(a, b):
         # returns sum of two object or and object and an integer number (integer number will be converted to same type object with zero fractional width)
         # c = obj + other object
         # c = obj + 3
         if(isinstance(b, FXP)):
             return FXP._add(a, b)
+        elif(isinstance(b, (FXPArray, CFXP))):
+            return NotImplemented
         elif(isinstance(b, int)):
             if(b == 0):
                 return a.copy()
             elif(b > 0):
                 if(a.type == dtype.float):
-                    return FXP._add(a, FXP(b, (1+int(floor(log2(b))), 0, dtype.float, a.opmode, a.sat, a.round)))
+                    return FXP._add(a, FXP._constant(b, (b.bit_length(), 0, dtype.float, a.opmode, a.sat, a.round)))
                 else:
-                    return FXP._add(a, FXP(b, (1+int(floor(log2(b))), 0, dtype.uint, a.opmode, a.sat, a.round)))
+                    return FXP._add(a, FXP._constant(b, (b.bit_length(), 0, dtype.uint, a.opmode, a.sat, a.round)))
             else:
                 if(a.type == dtype.float):
-                    return FXP._add(a, FXP(b, (1+int(floor(log2(-b))), 0, dtype.float, a.opmode, a.sat, a.round)))
+                    return FXP._add(a, FXP._constant(b, ((-b).bit_length(), 0, dtype.float, a.opmode, a.sat, a.round)))
                 else:
-                    return FXP._add(a, FXP(b, (1+int(floor(log2(-b))), 0, dtype.int, a.opmode, a.sat, a.round)))
+                    return FXP._add(a, FXP._constant(b, ((-b).bit_length(), 0, dtype.int, a.opmode, a.sat, a.round)))
         else:
             raise Exception("unsupported type ")
 
@@ -486,19 +782,21 @@ class FXP:
         # c = obj - 3
         if(isinstance(b, FXP)):
             return FXP._sub(a, b)
+        elif(isinstance(b, (FXPArray, CFXP))):
+            return NotImplemented
         elif(isinstance(b, int)):
             if(b == 0):
                 return a.copy()
             elif(b > 0):
                 if(a.type == dtype.float):
-                    return FXP._sub(a, FXP(b, (1+int(floor(log2(b))), 0, dtype.float, a.opmode, a.sat, a.round)))
+                    return FXP._sub(a, FXP._constant(b, (b.bit_length(), 0, dtype.float, a.opmode, a.sat, a.round)))
                 else:
-                    return FXP._sub(a, FXP(b, (1+int(floor(log2(b))), 0, dtype.uint, a.opmode, a.sat, a.round)))
+                    return FXP._sub(a, FXP._constant(b, (b.bit_length(), 0, dtype.uint, a.opmode, a.sat, a.round)))
             else:
                 if(a.type == dtype.float):
-                    return FXP._sub(a, FXP(b, (1+int(floor(log2(-b))), 0, dtype.float, a.opmode, a.sat, a.round)))
+                    return FXP._sub(a, FXP._constant(b, ((-b).bit_length(), 0, dtype.float, a.opmode, a.sat, a.round)))
                 else:
-                    return FXP._sub(a, FXP(b, (1+int(floor(log2(-b))), 0, dtype.int, a.opmode, a.sat, a.round)))
+                    return FXP._sub(a, FXP._constant(b, ((-b).bit_length(), 0, dtype.int, a.opmode, a.sat, a.round)))
         else:
             raise Exception("unsuppoted type ")
 
@@ -509,202 +807,1479 @@ class FXP:
         # c = obj * 3
         if(isinstance(b, FXP)):
             return FXP._mul(a, b)
+        elif(isinstance(b, (FXPArray, CFXP))):
+            return NotImplemented
         elif(isinstance(b, int)):
             if(b == 0):
                 return FXP(0, a)
             elif(b > 0):
                 if(b & (b-1) == 0):
-                    return a.__lshift__(int(log2(b)))
+                    return a.__lshift__(b.bit_length()-1)
                 else:
                     if(a.type == dtype.float):
-                        return FXP._mul(a, FXP(b, (1+int(floor(log2(b))), 0, dtype.float, a.opmode, a.sat, a.round)))
+                        return FXP._mul(a, FXP._constant(b, (b.bit_length(), 0, dtype.float, a.opmode, a.sat, a.round)))
                     else:
-                        return FXP._mul(a, FXP(b, (1+int(floor(log2(b))), 0, dtype.uint, a.opmode, a.sat, a.round)))
+                        return FXP._mul(a, FXP._constant(b, (b.bit_length(), 0, dtype.uint, a.opmode, a.sat, a.round)))
             else:
                 if((-b) & (-b-1) == 0):
-                    return -a.__lshift__(int(log2(-b)))
+                    return -a.__lshift__((-b).bit_length()-1)
                 else:
                     if(a.type == dtype.float):
-                        return FXP._mul(a, FXP(b, (1+int(floor(log2(-b))), 0, dtype.float, a.opmode, a.sat, a.round)))
+                        return FXP._mul(a, FXP._constant(b, ((-b).bit_length(), 0, dtype.float, a.opmode, a.sat, a.round)))
                     else:
-                        return FXP._mul(a, FXP(b, (1+int(floor(log2(-b))), 0, dtype.int, a.opmode, a.sat, a.round)))
+                        return FXP._mul(a, FXP._constant(b, ((-b).bit_length(), 0, dtype.int, a.opmode, a.sat, a.round)))
         else:
             raise Exception("unsupported type")
 
-    def _add(a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None):
-        # private method, implements the addition operation
+    def _inplace(a, b, op):
+        '''
+        private method
+        applies the in place operation op (_iadd, _isub or _imul) to object a and returns a
+        the exact result is rounded/truncated and saturated/wrapped around to the format of a, so a keeps its format
+        and no object is created. other objects which reference a see the new value.
+        '''
+        if(isinstance(b, (FXPArray, CFXP))):
+            return NotImplemented
+        elif(not isinstance(b, (FXP, int))):
+            raise Exception("unsupported type")
+        op(a, b)
+        return a
+
+    def _operand(b):
+        # private method, returns the raw value, integer and fractional widths of an in place operand (FXP/FXPArray object or integer number)
+        if(isinstance(b, (FXP, FXPArray))):
+            return b._val, b.intg, b.frac
+        return int(b), abs(int(b)).bit_length(), 0
+
+    def _iadd(a, b):
+        # private method, implements a += b in place, b is a FXP object or an integer number
+        raw, intg, frac = FXP._operand(b)
+        if(a.type == dtype.float):
+            a._val = a._val + raw
+            return
+        assert not isinstance(b, FXP) or b.type != dtype.float or not FXP._DBG, 'Float - fixedpoint operation is not allowed'
+        shift = max(a.frac, frac)
+        a._requantize((a._val << (shift - a.frac)) + (raw << (shift - frac)), shift)
+
+    def _isub(a, b):
+        # private method, implements a -= b in place, b is a FXP object or an integer number
+        raw, intg, frac = FXP._operand(b)
+        if(a.type == dtype.float):
+            a._val = a._val - raw
+            return
+        assert not isinstance(b, FXP) or b.type != dtype.float or not FXP._DBG, 'Float - fixedpoint operation is not allowed'
+        shift = max(a.frac, frac)
+        a._requantize((a._val << (shift - a.frac)) - (raw << (shift - frac)), shift)
+
+    def _imul(a, b):
+        # private method, implements a *= b in place, b is a FXP object or an integer number
+        raw, intg, frac = FXP._operand(b)
+        if(a.type == dtype.float):
+            a._val = a._val * raw
+            return
+        assert not isinstance(b, FXP) or b.type != dtype.float or not FXP._DBG, 'Float - fixedpoint operation is not allowed'
+        a._requantize(a._val * raw, a.frac + frac)
+
+    def _check_operands(a, b, opmode=None, sat=None, round=None):
+        # private method, checks the operand formats a and b of an operation in debug mode
+        assert(opmode is not None or a.opmode == b.opmode), 'operands must have the same opmode'
+        assert(sat is not None or a.sat == b.sat), 'operands must have the same saturation mode'
+        assert(round is not None or a.round == b.round), 'operands must have the same rounding mode'
+        assert((a.type == dtype.float and b.type == dtype.float) or (a.type != dtype.float and b.type != dtype.float)), 'Float - fixedpoint operation is not allowed'
+
+    @lru_cache(maxsize=None)
+    def _infer_format(op, a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None):
+        '''
+        private method
+        infers the output format of operation op ('add', 'sub' or 'mul') on operands with formats a and b
+        given parameters override the inferred ones
+        results are memoized by all arguments, the operand formats are identical on every iteration of a simulation loop
+        used by both FXP and FXPArray operations, see cache_info() for statistics
+        '''
         if(opmode is None):
-            assert(a.opmode == b.opmode) or not FXP._DBG, 'operands must have the same opmode'
             opmode = a.opmode
         if(sat is None):
-            assert(a.sat == b.sat) or not FXP._DBG, 'operands must have the same saturation mode'
             sat = a.sat
         if(round is None):
-            assert(a.round == b.round) or not FXP._DBG, 'operands must have the same rounding mode'
             round = a.round
 
-        assert((a.type == dtype.float and b.type == dtype.float) or (a.type != dtype.float and b.type != dtype.float)) or not FXP._DBG, 'Float - fixedpoint operation is not allowed'
         temp = (a.type, b.type)
         if(type is None):
             if(temp == (dtype.float, dtype.float)):
-                type    = dtype.float
-                tempval = a._val + b._val
+                type = dtype.float
+            elif(temp == (dtype.uint, dtype.uint)):
+                type = dtype.uint
+            elif(temp == (dtype.uint, dtype.int) or temp == (dtype.int, dtype.uint)):
+                type = dtype.int
+            elif(temp == (dtype.uint, dtype.ufxp) or temp == (dtype.ufxp, dtype.uint)):
+                type = dtype.ufxp
             else:
-                if(temp == (dtype.uint, dtype.uint)):
-                    type = dtype.uint
-                elif(temp == (dtype.uint, dtype.int) or temp == (dtype.int, dtype.uint)):
-                    type = dtype.int
-                elif(temp == (dtype.uint, dtype.ufxp) or temp == (dtype.ufxp, dtype.uint)):
-                    type = dtype.ufxp
-                else:
-                    type = dtype.fxp
-                if(a.frac >= b.frac):
-                    tempval = a._val + (int(b._val) << (a.frac - b.frac))
-                    tempval = tempval / int(2**a.frac)
-                else:
-                    tempval = b._val + (int(a._val) << (b.frac - a.frac))
-                    tempval = tempval / int(2**b.frac)
+                type = dtype.fxp
 
-        if(opmode == modes.FULL):
-            intg = max(a.intg, b.intg) + 1
-            frac = max(a.frac, b.frac)
-        elif(opmode == modes.FIXEDFRAC):
-            intg = max(a.intg, b.intg) + 1
+        if(opmode == modes.FIXEDFRAC or opmode == modes.FIXEDWIDTH):
             if((a.type == dtype.uint or a.type == dtype.int) and (b.type == dtype.ufxp or b.type == dtype.fxp)):
                 frac = b.frac
             elif((b.type == dtype.uint or b.type == dtype.int) and (a.type == dtype.ufxp or a.type == dtype.fxp)):
                 frac = a.frac
             else:
                 frac = min(a.frac, b.frac)
-        elif(opmode == modes.FIXEDWIDTH):
-            intg = max(a.intg, b.intg)
-            if((a.type == dtype.uint or a.type == dtype.int) and (b.type == dtype.ufxp or b.type == dtype.fxp)):
-                frac = b.frac
-            elif((b.type == dtype.uint or b.type == dtype.int) and (a.type == dtype.ufxp or a.type == dtype.fxp)):
-                frac = a.frac
-            else:
-                frac = min(a.frac, b.frac)
-        elif(opmode == modes.MANUAL):
-            opmode = None
-            pass
-
-        return FXP(tempval,(intg, frac, type, opmode, sat, round))
-
-    def _sub(a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None):
-        # private method, implements the addition operation
-        if(opmode is None):
-            assert(a.opmode == b.opmode) or not FXP._DBG, 'operands must have the same opmode'
-            opmode = a.opmode
-        if(sat is None):
-            assert(a.sat == b.sat) or not FXP._DBG, 'operands must have the same saturation mode'
-            sat = a.sat
-        if(round is None):
-            assert(a.round == b.round) or not FXP._DBG, 'operands must have the same rounding mode'
-            round = a.round
-
-        assert((a.type == dtype.float and b.type == dtype.float) or (a.type != dtype.float and b.type != dtype.float)) or not FXP._DBG, 'Float - fixedpoint operation is not allowed'
-        temp = (a.type, b.type)
-        if(type is None):
-            if(temp == (dtype.float, dtype.float)):
-                type    = dtype.float
-                tempval = a._val - b._val
-            else:
-                if(temp == (dtype.uint, dtype.uint)):
-                    type = dtype.uint
-                elif(temp == (dtype.uint, dtype.int) or temp == (dtype.int, dtype.uint)):
-                    type = dtype.int
-                elif(temp == (dtype.uint, dtype.ufxp) or temp == (dtype.ufxp, dtype.uint)):
-                    type = dtype.ufxp
-                else:
-                    type = dtype.fxp
-                if(a.frac >= b.frac):
-                    tempval = a._val - (int(b._val) << (a.frac - b.frac))
-                    tempval = tempval / int(2**a.frac)
-                else:
-                    tempval = -b._val + (int(a._val) << (b.frac - a.frac))
-                    tempval = tempval / int(2**b.frac)
 
         if(opmode == modes.FULL):
-            intg = max(a.intg, b.intg) + 1
-            frac = max(a.frac, b.frac)
+            if(op == 'mul'):
+                intg = a.intg + b.intg
+                frac = a.frac + b.frac
+            else:
+                intg = max(a.intg, b.intg) + 1
+                frac = max(a.frac, b.frac)
         elif(opmode == modes.FIXEDFRAC):
-            intg = max(a.intg, b.intg) + 1
-            if((a.type == dtype.uint or a.type == dtype.int) and (b.type == dtype.ufxp or b.type == dtype.fxp)):
-                frac = b.frac
-            elif((b.type == dtype.uint or b.type == dtype.int) and (a.type == dtype.ufxp or a.type == dtype.fxp)):
-                frac = a.frac
+            if(op == 'mul'):
+                intg = a.intg + b.intg
             else:
-                frac = min(a.frac, b.frac)
+                intg = max(a.intg, b.intg) + 1
         elif(opmode == modes.FIXEDWIDTH):
             intg = max(a.intg, b.intg)
-            if((a.type == dtype.uint or a.type == dtype.int) and (b.type == dtype.ufxp or b.type == dtype.fxp)):
-                frac = b.frac
-            elif((b.type == dtype.uint or b.type == dtype.int) and (a.type == dtype.ufxp or a.type == dtype.fxp)):
-                frac = a.frac
-            else:
-                frac = min(a.frac, b.frac)
         elif(opmode == modes.MANUAL):
             opmode = None
-            pass
 
-        return FXP(tempval,(intg, frac, type, opmode, sat, round))
+        return Format(intg, frac, type, opmode, sat, round)
+
+    def _add(a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None):
+        # private method, implements the addition operation
+        fa, fb = a.fmt, b.fmt
+        if(FXP._DBG):
+            FXP._check_operands(fa, fb, opmode, sat, round)
+        templ = FXP._infer_format('add', fa, fb, intg, frac, type, opmode, sat, round)
+        if(fa.type == dtype.float and fb.type == dtype.float):
+            return FXP(a._val + b._val, templ)
+        frac = max(fa.frac, fb.frac)
+        return FXP._from_int((a._val << (frac - fa.frac)) + (b._val << (frac - fb.frac)), frac, templ)
+
+    def _sub(a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None):
+        # private method, implements the subtraction operation
+        fa, fb = a.fmt, b.fmt
+        if(FXP._DBG):
+            FXP._check_operands(fa, fb, opmode, sat, round)
+        templ = FXP._infer_format('sub', fa, fb, intg, frac, type, opmode, sat, round)
+        if(fa.type == dtype.float and fb.type == dtype.float):
+            return FXP(a._val - b._val, templ)
+        frac = max(fa.frac, fb.frac)
+        return FXP._from_int((a._val << (frac - fa.frac)) - (b._val << (frac - fb.frac)), frac, templ)
 
     def _mul(a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None):
         # private method, implements the multiplication operation
-        if(opmode is None):
-            assert(a.opmode == b.opmode) or not FXP._DBG, 'operands must have the same opmode'
-            opmode = a.opmode
-        if(sat is None):
-            assert(a.sat == b.sat) or not FXP._DBG, 'operands must have the same saturation mode'
-            sat = a.sat
-        if(round is None):
-            assert(a.round == b.round) or not FXP._DBG, 'operands must have the same rounding mode'
-            round = a.round
+        fa, fb = a.fmt, b.fmt
+        if(FXP._DBG):
+            FXP._check_operands(fa, fb, opmode, sat, round)
+        templ = FXP._infer_format('mul', fa, fb, intg, frac, type, opmode, sat, round)
+        if(fa.type == dtype.float and fb.type == dtype.float):
+            return FXP(a._val * b._val, templ)
+        return FXP._from_int(a._val * b._val, fa.frac + fb.frac, templ)
 
-        assert((a.type == dtype.float and b.type == dtype.float) or (a.type != dtype.float and b.type != dtype.float)) or not FXP._DBG, 'Float - fixedpoint operation is not allowed'
-        temp = (a.type, b.type)
-        if(type is None):
-            if(temp == (dtype.float, dtype.float)):
-                type    = dtype.float
-                tempval = a._val * b._val
-            else:
-                if(temp == (dtype.uint, dtype.uint)):
-                    type = dtype.uint
-                elif(temp == (dtype.uint, dtype.int) or temp == (dtype.int, dtype.uint)):
-                    type = dtype.int
-                elif(temp == (dtype.uint, dtype.ufxp) or temp == (dtype.ufxp, dtype.uint)):
-                    type = dtype.ufxp
+    def debug(enable=None):
+        # enables/disables debug mode. warnings and assertions will be suppressed when debug is False
+        if(isinstance(enable,bool)):
+            FXP._DBG = enable
+
+    def cache_info():
+        '''
+        public method
+        returns hits, misses and size of the output format inference cache of the operations
+            FXP.cache_info() -> CacheInfo(hits=..., misses=..., maxsize=None, currsize=...)
+        '''
+        return FXP._infer_format.cache_info()
+
+    def cache_clear():
+        # public method, clears the output format inference cache and its statistics
+        FXP._infer_format.cache_clear()
+
+    def count(enable=None):
+        '''
+        public method
+        enables/disables counting of saturation and wrap around events of FXP and FXPArray objects, returns the current state
+        when counting is disabled the scalar path is not changed at all, so it costs nothing
+        events are counted per format and per named signal, see signal() and counters()
+        '''
+        if(isinstance(enable, bool)):
+            FXP._COUNT   = enable
+            FXP._set_raw = FXP._set_raw_counted if enable else FXP._set_raw_plain
+        return FXP._COUNT
+
+    @contextmanager
+    def signal(name):
+        '''
+        public method
+        events of the operations inside the with block are counted under the given signal name
+            with FXP.signal('mixer'):
+                y = x * lo
+        '''
+        outer = FXP._signal
+        FXP._signal = name
+        try:
+            yield
+        finally:
+            FXP._signal = outer
+
+    def _event(fmt, n):
+        # private method, adds n saturation (formats with sat) or wrap around events of format fmt to the active signal
+        if(n):
+            key = (FXP._signal, fmt)
+            FXP._events[key] = FXP._events.get(key, 0) + int(n)
+
+    def counters():
+        '''
+        public method
+        returns the event counters as a list of (signal, format, saturations, wraps) rows
+        signal is None for events outside of signal() blocks
+        '''
+        rows = []
+        for (name, fmt), n in FXP._events.items():
+            rows.append((name, fmt, n if fmt.sat else 0, 0 if fmt.sat else n))
+        return sorted(rows, key=lambda row: (str(row[0]), tuple(map(str, row[1]))))
+
+    def counters_table():
+        # public method, returns the event counters as a printable summary table
+        lines = ['%-20s %-45s %12s %12s' % ('signal', 'format', 'saturations', 'wraps')]
+        for name, fmt, sat, wrap in FXP.counters():
+            lines.append('%-20s %-45s %12d %12d' % ('-' if name is None else name, tuple(fmt), sat, wrap))
+        return '\n'.join(lines)
+
+    def counters_clear():
+        # public method, clears the event counters
+        FXP._events.clear()
+
+    def shadow(enable=None):
+        '''
+        public method
+        enables/disables float shadow mode, returns the current state
+        in shadow mode every FXP/FXPArray object carries its ideal floating point value, which is computed by the same
+        operations in float: constructors keep the unquantized input, _add/_sub/_mul, in place operators, neg, abs, shifts and copy compute
+        it from the ideal values of the operands. Objects created by other functions start with their own value.
+        For every operation, the error of the result against its ideal value is accumulated per named signal (see signal())
+        and operation, see errors() and errors_table().
+        The operation methods are swapped when shadow mode is enabled, so the normal path costs nothing.
+        '''
+        if(isinstance(enable, bool) and enable != FXP._SHADOW):
+            for cls in (FXP, FXPArray):
+                if(enable):
+                    wrappers = FXP._shadow_methods(cls)
+                    FXP._plain[cls] = {name: cls.__dict__[name] for name in wrappers}
                 else:
-                    type = dtype.fxp
-                tempval = a._val * b._val
-                tempval = tempval / int(2**(a.frac+b.frac))
+                    wrappers = FXP._plain.pop(cls)
+                for name, method in wrappers.items():
+                    setattr(cls, name, method)
+            FXP._SHADOW = enable
+        return FXP._SHADOW
+
+    def ideal(self):
+        # public method, returns the ideal floating point value of the object in shadow mode, otherwise val()
+        shadow = getattr(self, '_shadow', None)
+        if(FXP._SHADOW and shadow is not None):
+            return shadow
+        return self.val()
+
+    def _shadow_methods(cls):
+        # private method, returns the shadow mode versions of the methods of cls (FXP or FXPArray)
+        plain = dict(cls.__dict__)
+
+        def make_binop(name, op):
+            method = plain[name]
+            def binop(a, b, *args):
+                x, y = FXP.ideal(a), FXP.ideal(b)
+                return FXP._track(method(a, b, *args), name[1:], op(x, y))
+            return binop
+
+        def make_iop(name, op):
+            method = plain[name]
+            def iop(a, b):
+                x = FXP.ideal(a)
+                y = float(b) if isinstance(b, (int, numpy.integer)) else FXP.ideal(b)
+                method(a, b)
+                FXP._track(a, name[2:], op(x, y))
+            return iop
+
+        def make_unop(name, op):
+            method = plain[name]
+            def unop(self, *args, **kwargs):
+                return FXP._track(method(self, *args, **kwargs), name.strip('_'), op(FXP.ideal(self), *args))
+            return unop
+
+        def init(self, val, template):
+            plain['__init__'](self, val, template)
+            try:
+                ideal = numpy.asarray(val, dtype=numpy.float64)
+                ideal = float(ideal) if cls is FXP else ideal
+            except (TypeError, ValueError):
+                # special inputs 'inf' and '-inf'
+                ideal = self.val()
+            FXP._track(self, 'quantize', ideal)
+
+        def getitem(self, index):
+            item = plain['__getitem__'](self, index)
+            item._shadow = FXP.ideal(self)[index]
+            if(isinstance(item, FXP)):
+                item._shadow = float(item._shadow)
+            return item
+
+        wrappers = {'_add'      : make_binop('_add', lambda x, y: x + y),
+                    '_sub'      : make_binop('_sub', lambda x, y: x - y),
+                    '_mul'      : make_binop('_mul', lambda x, y: x * y),
+                    '_iadd'     : make_iop('_iadd', lambda x, y: x + y),
+                    '_isub'     : make_iop('_isub', lambda x, y: x - y),
+                    '_imul'     : make_iop('_imul', lambda x, y: x * y),
+                    '__neg__'   : make_unop('__neg__', lambda x: -x),
+                    '__abs__'   : make_unop('__abs__', lambda x: abs(x)),
+                    '__lshift__': make_unop('__lshift__', lambda x, n: x * float(int(1)<<n)),
+                    '__rshift__': make_unop('__rshift__', lambda x, n: x / float(int(1)<<n)),
+                    'copy'      : make_unop('copy', lambda x, *args: x),
+                    '__init__'  : init}
+        if(cls is FXPArray):
+            wrappers['__getitem__'] = getitem
+        return wrappers
+
+    def _track(obj, op, ideal):
+        # private method, sets the ideal value of obj and accumulates its error statistics under the active signal and op
+        obj._shadow = ideal
+        key = (FXP._signal, op)
+        s = FXP._errors.get(key)
+        if(s is None):
+            # count, sum of squared ideal values, sum of squared errors, sum of errors, max abs error
+            s = FXP._errors[key] = [0, 0.0, 0.0, 0.0, 0.0]
+        if(isinstance(obj, FXP)):
+            err = obj.val() - ideal
+            s[0] += 1
+            s[1] += ideal*ideal
+            s[2] += err*err
+            s[3] += err
+            s[4]  = max(s[4], abs(err))
+        else:
+            ideal = numpy.ravel(ideal)
+            err = numpy.ravel(obj.val()) - ideal
+            if(len(err)):
+                s[0] += len(err)
+                s[1] += float(numpy.dot(ideal, ideal))
+                s[2] += float(numpy.dot(err, err))
+                s[3] += float(err.sum())
+                s[4]  = max(s[4], float(abs(err).max()))
+        return obj
+
+    def errors():
+        '''
+        public method
+        returns the shadow mode error statistics as a list of (signal, op, count, sqnr, max_abs_error, bias) rows
+        sqnr is the ratio of ideal power to error power in dB (inf for exact results), bias is the mean error
+        '''
+        rows = []
+        for (name, op), (n, p, e, b, m) in FXP._errors.items():
+            sqnr = 10*numpy.log10(p / e) if e > 0 else (inf if p > 0 else 0.0)
+            rows.append((name, op, n, sqnr, m, b / max(n, 1)))
+        return sorted(rows, key=lambda row: (str(row[0]), row[1]))
 
-        if(opmode == modes.FULL):
-            intg = a.intg + b.intg
-            frac = a.frac + b.frac
-        elif(opmode == modes.FIXEDFRAC):
-            intg = a.intg + b.intg
-            if((a.type == dtype.uint or a.type == dtype.int) and (b.type == dtype.ufxp or b.type == dtype.fxp)):
-                frac = b.frac
-            elif((b.type == dtype.uint or b.type == dtype.int) and (a.type == dtype.ufxp or a.type == dtype.fxp)):
-                frac = a.frac
-            else:
-                frac = min(a.frac, b.frac)
-        elif(opmode == modes.FIXEDWIDTH):
-            intg = max(a.intg, b.intg)
-            if((a.type == dtype.uint or a.type == dtype.int) and (b.type == dtype.ufxp or b.type == dtype.fxp)):
-                frac = b.frac
-            elif((b.type == dtype.uint or b.type == dtype.int) and (a.type == dtype.ufxp or a.type == dtype.fxp)):
-                frac = a.frac
+    def errors_table():
+        # public method, returns the shadow mode error statistics as a printable summary table
+        lines = ['%-20s %-10s %12s %10s %14s %14s' % ('signal', 'op', 'count', 'sqnr(dB)', 'max abs error', 'bias')]
+        for name, op, n, sqnr, m, b in FXP.errors():
+            lines.append('%-20s %-10s %12d %10.2f %14.6g %14.6g' % ('-' if name is None else name, op, n, sqnr, m, b))
+        return '\n'.join(lines)
+
+    def errors_clear():
+        # public method, clears the shadow mode error statistics
+        FXP._errors.clear()
+
+
+class FXPArray:
+    '''
+    Vectorized fixedpoint array class
+    FXPArray object stores the raw two's complement words of all samples in one numpy integer array and shares
+    a single set of parameters (intg, frac, type, opmode, sat, round) between them, see FXP for their meaning.
+    The array is the smallest of int8, int16, int32 and int64 which holds intg+frac+1 bits, see compact().
+    For float type, the samples are stored in a numpy float64 array.
+
+    FXPArray object can be generated using two methods:
+        - pass an array of values and a template (tuple, FXP or FXPArray object)
+            a = FXPArray([-11.9341, 0.5, 3.25], (9,5,dtype.fxp, modes.FIXEDFRAC,False,False))
+        - pass an array of raw words and a template to from_raw method
+            a = FXPArray.from_raw(raw_words, (9,5,dtype.fxp, modes.FIXEDFRAC,False,False))
+
+    Arithmetic operators (+, -, *), comparisons, abs, shifts, convert and copy follow exactly the rules of FXP,
+    so each element of the result is bit-exact to the result of the same operation on FXP objects.
+    Operands can be FXPArray objects of the same shape, FXP objects or integer numbers.
+    Raw words and intermediate results must fit in 63 bits.
+    In place operators +=, -= and *= write the results to the raw words of the object in its own format, same as FXP,
+    and add, sub and mul accept an out object which reuses its raw words for the result.
+
+    Example:
+        a = FXPArray([-11.123456789, 2.5], (9,5,dtype.fxp, modes.FIXEDFRAC,False,False))
+        b = FXP(39.987654321, (7,1,dtype.fxp, modes.FIXEDFRAC,False,False))
+
+        c = a * b + 3
+        cv = c.val()
+        c0 = c[0]
+    '''
+    # makes numpy operators to defer to FXPArray operators e.g. numpy.int64(3) * a
+    __array_ufunc__ = None
+    # hex digits of to_hex
+    _HEX            = numpy.frombuffer(b'0123456789ABCDEF', dtype=numpy.uint8)
+    # native kernels of libfixedpointnative.so, loaded at the end of the module
+    _lib            = None
+    _NATIVE         = False
+    # width-adaptive containers of raw words, see compact()
+    _COMPACT        = True
+
+    def __init__(self, val, template):
+        '''
+        public method
+        Class constructor
+        val is an array of floating point values
+        template is a tuple or a FXP/FXPArray object
+        '''
+        self._read_template(template)
+        self._set_val(val)
+
+    _read_template = FXP._read_template
+    ideal  = FXP.ideal
+    intg   = FXP.intg
+    frac   = FXP.frac
+    type   = FXP.type
+    opmode = FXP.opmode
+    sat    = FXP.sat
+    round  = FXP.round
+
+    def from_raw(raw, template):
+        '''
+        public method
+        returns an object which wraps the given array of raw words without copying it
+        raw words must be integer values in the range of the given template
+        '''
+        obj = FXPArray.__new__(FXPArray)
+        obj._read_template(template)
+        obj._val = numpy.asarray(raw, dtype=FXPArray._container(obj.fmt))
+        return obj
+
+    def _from_int(raw, frac, template, out=None):
+        '''
+        private method
+        returns an object with the given template from exact integer values raw with given fractional width
+        rounding/truncation and saturation/wrap around are applied in integer domain
+        if out object is given, it takes the template and the results are stored in its raw words
+        '''
+        if(out is None):
+            obj = FXPArray.__new__(FXPArray)
+            obj._read_template(template)
+            obj._requantize(raw, frac)
+            return obj
+        out._read_template(template)
+        out._requantize(raw, frac, out._val)
+        return out
+
+    def _check_width(bits):
+        # private method, checks that values of the given bit width fit in int64 raw words
+        if(bits > 63):
+            raise Exception("bit width exceeds 63 bits")
+
+    def compact(enable=None):
+        '''
+        public method
+        enables/disables width-adaptive containers, returns the current state
+        when enabled (default), raw words are stored in the smallest of int8, int16, int32 and int64 which holds the format
+        (intg+frac+1 bits). operations compute in the smallest container of their exact intermediate results, which is
+        known from the operand formats before computing, and store the results in the container of the output format.
+        when disabled, raw words are stored in int64 arrays, the native kernels are used for int64 operands only.
+        '''
+        if(isinstance(enable, bool)):
+            FXPArray._COMPACT = enable
+        return FXPArray._COMPACT
+
+    def _dtype(bits):
+        # private method, returns the smallest container of signed integer values of given bit width, int64 when compact containers are disabled
+        if(not FXPArray._COMPACT or bits > 32):
+            return numpy.dtype(numpy.int64)
+        elif(bits > 16):
+            return numpy.dtype(numpy.int32)
+        elif(bits > 8):
+            return numpy.dtype(numpy.int16)
+        return numpy.dtype(numpy.int8)
+
+    def _container(fmt):
+        # private method, returns the numpy type of the raw words of format fmt
+        if(fmt.type == dtype.float):
+            return numpy.dtype(numpy.float64)
+        return FXPArray._dtype(fmt.intg + fmt.frac + 1)
+
+    def _words(val, bits):
+        '''
+        private method
+        returns the integer values val (array or integer number) in a container which holds values of given bit width
+        val is returned without copying if its container is wide enough, python integers (object arrays) are kept
+        '''
+        val = numpy.asarray(val)
+        if(val.dtype == object):
+            return val
+        container = FXPArray._dtype(bits)
+        if(val.ndim == 0 or val.dtype.itemsize < container.itemsize):
+            return val.astype(container)
+        return val
+
+    def _set_val(self, val):
+        '''
+        private method
+        sets the internal values of the object from an array of floating point values
+        saturation/rounding/wrap around is applied in this method, in the same way as FXP._set_val
+        '''
+        self._val = FXPArray._quantize(val, self.fmt)[0]
+
+    def _quantize(val, fmt, overflow=False):
+        '''
+        private method
+        converts an array of floating point values (or special inputs 'inf' and '-inf') to raw words of format fmt
+        returns the raw words and, when overflow is True, the bool array of saturated/wrapped around elements (otherwise None)
+        '''
+        val = numpy.asarray(val)
+        if(val.dtype.kind not in 'fiub'):
+            # special inputs 'inf' and '-inf' are parsed by float conversion
+            val = val.astype(numpy.float64)
+        val = numpy.asarray(val, dtype=numpy.float64)
+        if(fmt.type == dtype.float):
+            return val.copy(), (numpy.zeros(val.shape, dtype=bool) if overflow else None)
+        assert (fmt.frac == 0) or (fmt.type != dtype.int and fmt.type != dtype.uint) or not FXP._DBG, 'fractional width must be zero'
+        assert fmt.signed or (val >= 0).all() or not FXP._DBG, 'unsigned number must be non-negative'
+        FXPArray._check_width(fmt.intg + fmt.frac + 1)
+        if(numpy.isnan(val).any()):
+            # same error as FXP(nan, template)
+            raise ValueError("cannot convert float NaN to integer")
+        if(FXPArray._NATIVE):
+            raw, ovf = FXPArray._native_quantize(val, fmt, overflow or FXP._COUNT)
+            if(FXP._COUNT):
+                FXP._event(fmt, numpy.count_nonzero(ovf))
+            return raw.astype(FXPArray._container(fmt), copy=False), (ovf if overflow else None)
+        special = numpy.isinf(val)
+        temp = val * float(fmt.scale)
+        if(fmt.round):
+            temp = numpy.round(temp)
+        else:
+            temp = numpy.floor(temp)
+        # hi+1 and lo are powers of two, exact in float64 unlike hi of formats wider than 53 bits
+        over  = (temp >= float(fmt.hi + 1)) & ~special
+        under = (temp < float(fmt.lo)) & ~special
+        ovf = None
+        if(overflow or FXP._COUNT):
+            ovf = over | under
+            if(FXP._COUNT):
+                FXP._event(fmt, numpy.count_nonzero(ovf))
+        # float modulo is exact for power of two modulus, it brings the values into int64 range before wrapping
+        temp = numpy.where(special, 0.0, temp)
+        raw = numpy.fmod(temp, float(fmt.mask + 1)).astype(numpy.int64)
+        raw = ((raw + fmt.half) & fmt.mask) - fmt.half
+        if(fmt.sat):
+            # saturated values are set in integer words, float64 can not hold hi of wide formats
+            raw = numpy.where(over, fmt.hi, numpy.where(under, fmt.lo, raw))
+        # special inputs
+        raw = numpy.where(val == inf, fmt.hi, raw)
+        raw = numpy.where(val == -inf, fmt.lo, raw)
+        return raw.astype(FXPArray._container(fmt), copy=False), (ovf if overflow else None)
+
+    def _requantize(self, raw, frac, out=None):
+        '''
+        private method
+        sets the internal values of the object from exact integer values raw with given fractional width
+        removed fractional bits are rounded (half to even, same as numpy round) or truncated
+        if out array is given and it is the container of the format, the values are stored in it and it becomes the raw words
+        of the object
+        '''
+        fmt = self.fmt
+        shift = frac - fmt.frac
+        if(FXPArray._NATIVE and not FXP._COUNT and isinstance(raw, numpy.ndarray) and raw.dtype == numpy.int64 and -63 < shift < 63):
+            if(shift < 0):
+                FXPArray._check_width(fmt.intg + fmt.frac + 1)
+            if(out is not None and (out.dtype != numpy.int64 or not out.flags.c_contiguous or out.shape != raw.shape)):
+                self._store(FXPArray._native_requantize(raw, shift, fmt), out)
             else:
-                frac = min(a.frac, b.frac)
-        elif(opmode == modes.MANUAL):
-            opmode = None
-            pass
+                self._store(FXPArray._native_requantize(raw, shift, fmt, out), out)
+            return
+        raw = numpy.asarray(raw)
+        if(shift > 0):
+            raw = FXPArray._round_shift(FXPArray._words(raw, shift + 2), shift, fmt.round)
+        elif(shift < 0):
+            FXPArray._check_width(fmt.intg + fmt.frac + 1)
+            raw = FXPArray._words(raw, raw.dtype.itemsize*8 - shift)
+            if(fmt.sat):
+                # values out of range are clipped before the shift, so their shifted words stay out of range instead of overflowing
+                raw = numpy.clip(FXPArray._words(raw, 64), (fmt.lo >> -shift) - 1, (fmt.hi >> -shift) + 1)
+            raw = raw << (-shift)
+        raw = FXPArray._words(raw, fmt.intg + fmt.frac + 1)
+        if(FXP._COUNT):
+            FXP._event(fmt, numpy.count_nonzero((raw > fmt.hi) | (raw < fmt.lo)))
+        if(fmt.sat):
+            raw = numpy.clip(raw, fmt.lo, fmt.hi, out=out if out is not None and out.dtype == raw.dtype and out.shape == raw.shape else None)
+        self._wrap(raw, out)
+
+    def native(enable=None):
+        '''
+        public method
+        enables/disables the native kernels of libfixedpointnative.so (build with "make native" in the src directory)
+        returns True if the native kernels are used, the pure Python path is used when the library is not built
+        the kernels take int64 raw words, FXPArray.compact(False) stores all raw words in int64 containers for them
+        '''
+        if(isinstance(enable, bool)):
+            FXPArray._NATIVE = enable and FXPArray._lib is not None
+        return FXPArray._NATIVE
+
+    def _native_args(fmt):
+        # private method, returns the bound arguments of the native kernels for format fmt
+        return (fmt.lo, fmt.hi, fmt.half, fmt.mask, int(fmt.sat), int(fmt.round))
+
+    def _native_quantize(val, fmt, overflow):
+        # private method, native version of _quantize for non-float formats
+        val = numpy.asarray(val, dtype=numpy.float64, order='C')
+        raw = numpy.empty(val.shape, dtype=numpy.int64)
+        ovf = numpy.empty(val.shape, dtype=bool) if overflow else None
+        FXPArray._lib.fxp_quantize(val.ctypes.data, val.size, float(fmt.scale), *FXPArray._native_args(fmt),
+                                   raw.ctypes.data, ovf.ctypes.data if overflow else None)
+        return raw, ovf
+
+    def _native_requantize(raw, shift, fmt, out=None):
+        # private method, native version of _requantize, shift is the number of removed fractional bits, out is a C contiguous int64 array
+        raw = numpy.asarray(raw, order='C')
+        if(out is None):
+            out = numpy.empty(raw.shape, dtype=numpy.int64)
+        FXPArray._lib.fxp_requantize(raw.ctypes.data, raw.size, shift, *FXPArray._native_args(fmt), out.ctypes.data)
+        return out
+
+    def _native_binop(op, a, b, ashift, bshift, frac, templ, out=None):
+        '''
+        private method
+        computes an add (op 0), sub (op 1) or mul (op 2) of the raw words of a and b with the native kernel
+        and requantizes the exact results with fractional width frac to templ, in the raw words of out object if given
+        returns None when the operands, the output format or the out object are not supported by the kernel
+        '''
+        shift = frac - templ.frac
+        if(templ.type == dtype.float or not -63 < shift < 63):
+            return None
+        if(shift < 0):
+            FXPArray._check_width(templ.intg + templ.frac + 1)
+        va = numpy.asarray(a._val, order='C')
+        vb = numpy.asarray(b._val, order='C')
+        if(va.dtype != numpy.int64 or vb.dtype != numpy.int64 or (va.size != 1 and vb.size != 1 and va.shape != vb.shape)):
+            return None
+        shape = numpy.broadcast_shapes(va.shape, vb.shape)
+        if(out is None):
+            buf = numpy.empty(shape, dtype=numpy.int64)
+        else:
+            buf = FXPArray._buffer(out, numpy.int64)
+            if(buf is None or buf.shape != shape or not buf.flags.c_contiguous or FXPArray._container(templ) != numpy.int64):
+                return None
+        FXPArray._lib.fxp_binop(op, va.ctypes.data, int(va.size != 1), ashift, vb.ctypes.data, int(vb.size != 1), bshift,
+                                buf.size, shift, *FXPArray._native_args(templ), buf.ctypes.data)
+        if(out is None):
+            return FXPArray.from_raw(buf, templ)
+        out._read_template(templ)
+        out._val = buf
+        return out
+
+    def _round_shift(raw, shift, round):
+        '''
+        private method
+        removes shift fractional bits of integer values raw (shift > 0)
+        values are rounded (half to even, same as numpy round) when round is True, otherwise truncated
+        '''
+        if(round):
+            temp = raw >> shift
+            rem  = raw & ((int(1)<<shift) - 1)
+            half = int(1)<<(shift - 1)
+            return temp + ((rem > half) | ((rem == half) & ((temp & 1) == 1)))
+        else:
+            return raw >> shift
 
-        return FXP(tempval,(intg, frac, type, opmode, sat, round))
+    def _wrap(self, raw, out=None):
+        '''
+        private method
+        wraps around the integer values to the bit width of the object and stores them, in out array if given, see _store
+        raw must be in a container of at least the width of the format
+        '''
+        fmt = self.fmt
+        if(fmt.signed and raw.dtype.itemsize*8 == fmt.intg + fmt.frac + 1):
+            # every value of the container is in the range of the format, raw can be the raw words of another object
+            self._store(raw if out is not None else raw.copy(), out)
+            return
+        self._store(((raw + fmt.half) & fmt.mask) - fmt.half, out)
+
+    def _store(self, raw, out=None):
+        # private method, stores the integer values (in the range of the format) as the raw words of the object, in out array if it is the container of the format
+        container = FXPArray._container(self.fmt)
+        if(out is not None and out.dtype == container):
+            if(raw is not out):
+                numpy.copyto(out, raw, casting='unsafe')
+            self._val = out
+        else:
+            self._val = numpy.asarray(raw, dtype=container)
 
-    def debug(enable=None):
-        # enables/disables debug mode. warnings and assertions will be suppressed when debug is False
-        if(isinstance(enable,bool)):
-            FXP._DBG = enable
+    def convert(self, intg=None, frac=None, type=None, opmode=None, sat=None, round=None, template=None):
+        '''
+        Public method
+        based on the given parameters, changes the object parameters and recalculates the internal values
+        can change the internal values because of saturation/overflow, ... .
+        '''
+        oldtype = self.type
+        oldfrac = self.frac
+        if(template is not None):
+            self._read_template(template)
+        if(intg is not None):
+            self.intg = intg
+        if(frac is not None):
+            self.frac = frac
+        if(type is not None):
+            self.type = type
+        if(opmode is not None):
+            self.opmode = opmode
+        if(sat is not None):
+            self.sat = sat
+        if(round is not None):
+            self.round = round
+
+        if(oldtype == dtype.float):
+            self._set_val(self._val)
+        elif(self.type == dtype.float):
+            self._val = self._val / float(int(1)<<oldfrac)
+        else:
+            self._requantize(self._val, oldfrac)
+
+    def val(self):
+        # returns the floating point representation of the object as numpy float64 array
+        if(self.type == dtype.float):
+            return self._val
+        else:
+            return self._val / float(self.fmt.scale)
+
+    def copy(self, template=None):
+        '''
+        return a copy of the object when an independent copy of the object is needed. Must be used instead of usual b=a numeric assignment
+        if template is given, its parameters will be used to create new object
+        '''
+        obj = FXPArray.from_raw(self._val.copy(), self)
+        if(template is not None):
+            obj.convert(template=template)
+        return obj
+
+    @property
+    def shape(self):
+        # shape of the array
+        return self._val.shape
+
+    def __len__(self):
+        return len(self._val)
+
+    def __getitem__(self, index):
+        # returns a FXP object for a single element, otherwise a FXPArray object sharing the raw words (e.g. a row of a 2D array)
+        val = self._val[index]
+        if(numpy.ndim(val) == 0):
+            if(self.type == dtype.float):
+                return FXP(float(val), self)
+            return FXP._from_int(int(val), self.fmt.frac, self)
+        else:
+            return FXPArray.from_raw(val, self)
+
+    def __setitem__(self, index, value):
+        # sets the selected elements from FXP/FXPArray objects or numbers, values are converted to the object parameters
+        if(isinstance(value, (FXP, FXPArray))):
+            value = value.val()
+        self._val[index] = FXPArray(value, self)._val
+
+    def __iter__(self):
+        for i in range(len(self._val)):
+            yield self[i]
+
+    def __pos__(self):
+        # returns a copy of the object
+        return self.copy()
+
+    def __neg__(self):
+        # returns an object with negative of the values of the object
+        if(self.type == dtype.float):
+            return FXPArray(-self._val, self)
+        return FXPArray._from_int(-FXPArray._words(self._val, self.intg + self.frac + 2), self.frac, self)
+
+    def __abs__(self):
+        # returns an object with absolute values of the values of the object
+        if(self.type == dtype.float):
+            return FXPArray(abs(self._val), self)
+        return FXPArray._from_int(abs(FXPArray._words(self._val, self.intg + self.frac + 2)), self.frac, self)
+
+    def _other_val(other):
+        # private method, returns the floating point value of the other operand of comparisons
+        if(isinstance(other, (FXP, FXPArray))):
+            return other.val()
+        return other
+
+    def __lt__(self, other):
+        # elementwise comparison, returns a numpy bool array
+        return self.val() < FXPArray._other_val(other)
+
+    def __le__(self, other):
+        return self.val() <= FXPArray._other_val(other)
+
+    def __gt__(self, other):
+        return self.val() > FXPArray._other_val(other)
+
+    def __ge__(self, other):
+        return self.val() >= FXPArray._other_val(other)
+
+    def __eq__(self, other):
+        return self.val() == FXPArray._other_val(other)
+
+    def __ne__(self, other):
+        return self.val() != FXPArray._other_val(other)
+
+    def _chars(self, kind, prefix=True):
+        '''
+        private method
+        returns the characters of the hex (kind 'hex') or binary (kind 'bin') representation of all elements as a numpy
+        uint8 array with one row per element, rows are identical to FXP.to_hex and FXP.to_binary
+        the type prefix (e.g. 'fxp:') is removed when prefix is False
+        '''
+        fmt = self.fmt
+        raw = self._val.reshape(-1)
+        if(fmt.type == dtype.float):
+            return numpy.tile(numpy.frombuffer(b'float', dtype=numpy.uint8), (len(raw), 1))
+        # two's complement bits of the raw words, bits above the width are the sign extension
+        u = raw.astype(numpy.uint64)[:, None]
+        width = fmt.intg + fmt.frac + 1
+        if(kind == 'hex'):
+            shifts = numpy.arange((width+3)//4 - 1, -1, -1, dtype=numpy.uint64) * numpy.uint64(4)
+            body   = FXPArray._HEX[(u >> shifts) & numpy.uint64(0xF)]
+        else:
+            shifts = numpy.arange(width - 1, -1, -1, dtype=numpy.uint64)
+            bits   = ((u >> shifts) & numpy.uint64(1)).astype(numpy.uint8) + ord('0')
+            point  = numpy.full((len(raw), 1), ord('.'), dtype=numpy.uint8)
+            body   = numpy.concatenate((bits[:, 0 if fmt.signed else 1:fmt.intg+1], point, bits[:, fmt.intg+1:]), axis=1)
+        if(prefix):
+            head = numpy.frombuffer((fmt.type + ':').encode(), dtype=numpy.uint8)
+            body = numpy.concatenate((numpy.tile(head, (len(raw), 1)), body), axis=1)
+        return body
+
+    def to_hex(self, prefix=True):
+        '''
+        public method
+        returns the list of hex representations of all elements, same as FXP.to_hex of each element (see fixedpointio.save_hex)
+        '''
+        return FXPArray._lines(self._chars('hex', prefix))
+
+    def to_binary(self, prefix=True):
+        '''
+        public method
+        returns the list of binary representations of all elements, same as FXP.to_binary of each element (see fixedpointio.save_binary)
+        '''
+        return FXPArray._lines(self._chars('bin', prefix))
+
+    def _lines(chars):
+        # private method, converts a character array with one row per element to a list of strings
+        if(len(chars) == 0):
+            return []
+        newline = numpy.full((len(chars), 1), ord('\n'), dtype=numpy.uint8)
+        return numpy.concatenate((chars, newline), axis=1).tobytes().decode()[:-1].split('\n')
+
+    __hash__ = None
+
+    def __str__(self):
+        # returns the string format of floating point representation of the object
+        if(FXP._DBG):
+            return '[' + str(self.intg) + ', ' + str(self.frac) + ', ' + self.type + ', ' + str(self.opmode) + ', ' + str(self.sat) + ', ' + str(self.round) + '] = ' + str(self.val())
+        else:
+            return str(self.val())
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __add__(self, b):
+        # magic function of a + b
+        return FXPArray._add_dispatch(self, b)
+
+    def __radd__(self, b):
+        # magic function of b + a
+        if(isinstance(b, FXP)):
+            return FXPArray._add(b, self)
+        return FXPArray._add_dispatch(self, b)
+
+    def __iadd__(self, b):
+        # magic function of a += b, the result is stored in place in the format and raw words of a
+        return FXPArray._inplace(self, b, FXPArray._iadd)
+
+    def __sub__(self, b):
+        # magic function of a - b
+        return FXPArray._sub_dispatch(self, b)
+
+    def __rsub__(self, b):
+        # magic function of b - a
+        if(isinstance(b, FXP)):
+            return FXPArray._sub(b, self)
+        return -FXPArray._sub_dispatch(self, b)
+
+    def __isub__(self, b):
+        # magic function of a -= b, the result is stored in place in the format and raw words of a
+        return FXPArray._inplace(self, b, FXPArray._isub)
+
+    def __mul__(self, b):
+        # magic function of a * b
+        return FXPArray._mul_dispatch(self, b)
+
+    def __rmul__(self, b):
+        # magic function of b * a
+        if(isinstance(b, FXP)):
+            return FXPArray._mul(b, self)
+        return FXPArray._mul_dispatch(self, b)
+
+    def __imul__(self, b):
+        # magic function of a *= b, the result is stored in place in the format and raw words of a
+        return FXPArray._inplace(self, b, FXPArray._imul)
+
+    def __lshift__(self, other):
+        # returns an object with its values are left shifted version of the values of the object, same as FXP
+        templ = (self.intg+other, max(self.frac-other, 0), self.type, self.opmode, self.sat, self.round)
+        if(self.type == dtype.float):
+            return FXPArray(self._val*(int(1)<<other), templ)
+        return FXPArray._from_int(self._val, self.frac-other, templ)
+
+    def __rshift__(self, other):
+        # returns an object with its values are right shifted version of the values of the object, same as FXP
+        templ = (max(self.intg-other, 0), self.frac+other, self.type, self.opmode, self.sat, self.round)
+        if(self.type == dtype.float):
+            return FXPArray(self._val/(int(1)<<other), templ)
+        return FXPArray._from_int(self._val, self.frac+other, templ)
+
+    def add(a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None, out=None):
+        '''
+        adds two object a and b and input parameters will be used to set the output parameters, custom output parameter selection
+        if out (FXPArray object of the result shape) is given, the result is stored in its raw words and out is returned,
+        out takes the format of the result. out can be one of the operands.
+
+        Example:
+            state = FXPArray(numpy.zeros(n), templ)
+            for x in frames:
+                FXPArray.add(state, x, out=state)
+        '''
+        return FXPArray._add(a, b, intg, frac, type, opmode, sat, round, out)
+
+    def sub(a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None, out=None):
+        # subtracts two object a and b and input parameters will be used to set the output parameters, custom output parameter selection, see add for out
+        return FXPArray._sub(a, b, intg, frac, type, opmode, sat, round, out)
+
+    def mul(a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None, out=None):
+        # multiplies two object a and b and input parameters will be used to set the output parameters, custom output parameter selection, see add for out
+        return FXPArray._mul(a, b, intg, frac, type, opmode, sat, round, out)
+
+    def _inplace(a, b, op):
+        # private method, applies the in place operation op (_iadd, _isub or _imul) to object a and returns a, see FXP._inplace
+        if(isinstance(b, CFXP)):
+            return NotImplemented
+        elif(not isinstance(b, (FXP, FXPArray, int, numpy.integer))):
+            raise Exception("unsupported type")
+        op(a, b)
+        return a
+
+    def _iadd(a, b):
+        # private method, implements a += b in place, b is a FXP/FXPArray object or an integer number
+        raw, intg, frac = FXP._operand(b)
+        if(a.type == dtype.float):
+            a._val += raw
+            return
+        shift = max(a.frac, frac)
+        bits = max(a.intg, intg) + shift + 2
+        FXPArray._check_width(bits)
+        va, vb = FXPArray._words(a._val, bits), FXPArray._words(raw, bits)
+        temp = numpy.add(FXPArray._shl(va, shift - a.frac), FXPArray._shl(vb, shift - frac), out=a._val if va is a._val and shift == a.frac else None)
+        a._requantize(temp, shift, a._val)
+
+    def _isub(a, b):
+        # private method, implements a -= b in place, b is a FXP/FXPArray object or an integer number
+        raw, intg, frac = FXP._operand(b)
+        if(a.type == dtype.float):
+            a._val -= raw
+            return
+        shift = max(a.frac, frac)
+        bits = max(a.intg, intg) + shift + 2
+        FXPArray._check_width(bits)
+        va, vb = FXPArray._words(a._val, bits), FXPArray._words(raw, bits)
+        temp = numpy.subtract(FXPArray._shl(va, shift - a.frac), FXPArray._shl(vb, shift - frac), out=a._val if va is a._val and shift == a.frac else None)
+        a._requantize(temp, shift, a._val)
+
+    def _imul(a, b):
+        # private method, implements a *= b in place, b is a FXP/FXPArray object or an integer number
+        raw, intg, frac = FXP._operand(b)
+        if(a.type == dtype.float):
+            a._val *= raw
+            return
+        bits = a.intg + a.frac + intg + frac + 2
+        FXPArray._check_width(bits)
+        va, vb = FXPArray._words(a._val, bits), FXPArray._words(raw, bits)
+        a._requantize(numpy.multiply(va, vb, out=a._val if va is a._val else None), a.frac + frac, a._val)
+
+    def _shl(raw, shift):
+        # private method, returns the raw values left shifted by shift bits, the values themselves for zero shift
+        return raw << shift if shift else raw
+
+    def _buffer(out, container):
+        # private method, returns the value array of out object of an operation if it is the given container, otherwise None
+        if(out is None or out._val.dtype != container):
+            return None
+        return out._val
+
+    def _float_result(val, template, out=None):
+        # private method, returns a float type object with the given values, stored in the value array of out if given
+        if(out is None):
+            return FXPArray(val, template)
+        buf = FXPArray._buffer(out, numpy.float64)
+        if(buf is None):
+            out._val = numpy.array(val, dtype=numpy.float64)
+        else:
+            buf[...] = val
+        out._read_template(template)
+        return out
+
+    def mac(acc, a, b):
+        '''
+        public method
+        element-wise multiply-accumulate in place, acc += a * b, and returns acc, same rules as FXP.mac
+        '''
+        fa, fb = a.fmt, b.fmt
+        if(acc.type == dtype.float):
+            acc._val += a.val() * b.val()
+            return acc
+        assert (fa.type != dtype.float and fb.type != dtype.float) or not FXP._DBG, 'Float - fixedpoint operation is not allowed'
+        FXPArray._check_width(fa.intg + fa.frac + fb.intg + fb.frac + 2)
+        shift = fa.frac + fb.frac - acc.frac
+        prod = numpy.multiply(a._val, b._val, dtype=numpy.int64)
+        if(shift > 0):
+            prod = FXPArray._round_shift(prod, shift, acc.round)
+        elif(shift < 0):
+            FXPArray._check_width(fa.intg + fb.intg + acc.frac + 2)
+            prod = prod << (-shift)
+        acc._requantize(acc._val + prod, acc.frac, acc._val)
+        return acc
+
+    def dot(a, b, template=None, guard=None, axis=-1):
+        '''
+        public method
+        returns the dot product of a and b along the given axis, computed on raw integer values, same rules as FXP.dot
+        a and b are FXPArray objects of broadcastable shapes (one of them can be a FXP object)
+        the result is a FXP object when all axes are reduced, otherwise a FXPArray object
+        the accumulator must fit in 63 bits, int64 sums wrap around modulo 2**64 so the accumulator wrap around is exact
+
+        Example:
+            y = FXPArray.dot(frames, h, template=(3,12,dtype.fxp, modes.FIXEDWIDTH,True,True), axis=1)
+        '''
+        fa, fb = a.fmt, b.fmt
+        fp = FXP._infer_format('mul', fa, fb, 0, 0, None, modes.FULL, None, None)
+        if(fp.type == dtype.float):
+            val = numpy.sum(a._val * b._val, axis=axis)
+            fmt = FXP._acc_format(fp, 1, guard)._with(3, fa.opmode)
+            return FXPArray._acc_result(val, fmt, template)
+        FXPArray._check_width(fa.intg + fa.frac + fb.intg + fb.frac + 2)
+        prod = numpy.multiply(a._val, b._val, dtype=numpy.int64)
+        fmt = FXP._acc_format(fp, FXPArray._terms(prod, axis), guard)._with(3, fa.opmode)
+        FXPArray._check_width(fmt.intg + fmt.frac + 1)
+        return FXPArray._acc_result(numpy.sum(prod, axis=axis), fmt, template)
+
+    def sum(a, template=None, guard=None, axis=None):
+        '''
+        public method
+        returns the sum of the elements of a along the given axis (all elements if axis is None), see FXPArray.dot
+        '''
+        fmt = FXP._acc_format(a.fmt, FXPArray._terms(a._val, axis), guard)
+        if(fmt.type == dtype.float):
+            return FXPArray._acc_result(numpy.sum(a._val, axis=axis), fmt, template)
+        FXPArray._check_width(fmt.intg + fmt.frac + 1)
+        return FXPArray._acc_result(numpy.sum(a._val, axis=axis, dtype=numpy.int64), fmt, template)
+
+    def _terms(val, axis):
+        # private method, returns the number of terms of a reduction of array val along axis
+        val = numpy.asarray(val)
+        if(axis is None):
+            return val.size
+        return int(numpy.prod([val.shape[i] for i in numpy.atleast_1d(axis)]))
+
+    def _acc_result(acc, fmt, template):
+        # private method, returns a FXP object for a fully reduced accumulator, otherwise a FXPArray object, see FXP._acc_result
+        if(numpy.ndim(acc) == 0):
+            acc = float(acc) if fmt.type == dtype.float else int(acc)
+            return FXP._acc_result(acc, fmt, template, FXP)
+        return FXP._acc_result(acc, fmt, template, FXPArray)
+
+    def _int_operand(a, b):
+        '''
+        private method
+        converts integer number b to a FXP object with zero fractional width, same as FXP dispatch methods
+        '''
+        if(b > 0):
+            templ = (b.bit_length(), 0, dtype.uint, a.opmode, a.sat, a.round)
+        else:
+            templ = ((-b).bit_length(), 0, dtype.int, a.opmode, a.sat, a.round)
+        if(a.type == dtype.float):
+            templ = templ[:2] + (dtype.float,) + templ[3:]
+        return FXP._constant(b, templ)
+
+    def _add_dispatch(a, b):
+        # returns sum of an array and another array, a FXP object or an integer number
+        if(isinstance(b, (FXP, FXPArray))):
+            return FXPArray._add(a, b)
+        elif(isinstance(b, CFXP)):
+            return NotImplemented
+        elif(isinstance(b, (int, numpy.integer))):
+            if(b == 0):
+                return a.copy()
+            return FXPArray._add(a, FXPArray._int_operand(a, int(b)))
+        else:
+            raise Exception("unsupported type")
+
+    def _sub_dispatch(a, b):
+        # returns difference of an array and another array, a FXP object or an integer number
+        if(isinstance(b, (FXP, FXPArray))):
+            return FXPArray._sub(a, b)
+        elif(isinstance(b, CFXP)):
+            return NotImplemented
+        elif(isinstance(b, (int, numpy.integer))):
+            if(b == 0):
+                return a.copy()
+            return FXPArray._sub(a, FXPArray._int_operand(a, int(b)))
+        else:
+            raise Exception("unsupported type")
+
+    def _mul_dispatch(a, b):
+        # returns product of an array and another array, a FXP object or an integer number
+        if(isinstance(b, (FXP, FXPArray))):
+            return FXPArray._mul(a, b)
+        elif(isinstance(b, CFXP)):
+            return NotImplemented
+        elif(isinstance(b, (int, numpy.integer))):
+            b = int(b)
+            if(b == 0):
+                return FXPArray(numpy.zeros(a.shape), a)
+            elif(b > 0 and b & (b-1) == 0):
+                return a.__lshift__(b.bit_length()-1)
+            elif(b < 0 and (-b) & (-b-1) == 0):
+                return -a.__lshift__((-b).bit_length()-1)
+            return FXPArray._mul(a, FXPArray._int_operand(a, b))
+        else:
+            raise Exception("unsupported type")
+
+    def _add(a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None, out=None):
+        # private method, implements the addition operation, one of the operands can be a FXP object
+        fa, fb = a.fmt, b.fmt
+        if(FXP._DBG):
+            FXP._check_operands(fa, fb, opmode, sat, round)
+        templ = FXP._infer_format('add', fa, fb, intg, frac, type, opmode, sat, round)
+        if(fa.type == dtype.float and fb.type == dtype.float):
+            return FXPArray._float_result(a._val + b._val, templ, out)
+        frac = max(fa.frac, fb.frac)
+        bits = max(fa.intg, fb.intg) + frac + 2
+        FXPArray._check_width(bits)
+        if(FXPArray._NATIVE and not FXP._COUNT):
+            obj = FXPArray._native_binop(0, a, b, frac - fa.frac, frac - fb.frac, frac, templ, out)
+            if(obj is not None):
+                return obj
+        va, vb = FXPArray._words(a._val, bits), FXPArray._words(b._val, bits)
+        if(out is None):
+            return FXPArray._from_int((va << (frac - fa.frac)) + (vb << (frac - fb.frac)), frac, templ)
+        raw = numpy.add(FXPArray._shl(va, frac - fa.frac), FXPArray._shl(vb, frac - fb.frac), out=FXPArray._buffer(out, numpy.result_type(va, vb)))
+        return FXPArray._from_int(raw, frac, templ, out)
+
+    def _sub(a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None, out=None):
+        # private method, implements the subtraction operation, one of the operands can be a FXP object
+        fa, fb = a.fmt, b.fmt
+        if(FXP._DBG):
+            FXP._check_operands(fa, fb, opmode, sat, round)
+        templ = FXP._infer_format('sub', fa, fb, intg, frac, type, opmode, sat, round)
+        if(fa.type == dtype.float and fb.type == dtype.float):
+            return FXPArray._float_result(a._val - b._val, templ, out)
+        frac = max(fa.frac, fb.frac)
+        bits = max(fa.intg, fb.intg) + frac + 2
+        FXPArray._check_width(bits)
+        if(FXPArray._NATIVE and not FXP._COUNT):
+            obj = FXPArray._native_binop(1, a, b, frac - fa.frac, frac - fb.frac, frac, templ, out)
+            if(obj is not None):
+                return obj
+        va, vb = FXPArray._words(a._val, bits), FXPArray._words(b._val, bits)
+        if(out is None):
+            return FXPArray._from_int((va << (frac - fa.frac)) - (vb << (frac - fb.frac)), frac, templ)
+        raw = numpy.subtract(FXPArray._shl(va, frac - fa.frac), FXPArray._shl(vb, frac - fb.frac), out=FXPArray._buffer(out, numpy.result_type(va, vb)))
+        return FXPArray._from_int(raw, frac, templ, out)
+
+    def _mul(a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None, out=None):
+        # private method, implements the multiplication operation, one of the operands can be a FXP object
+        fa, fb = a.fmt, b.fmt
+        if(FXP._DBG):
+            FXP._check_operands(fa, fb, opmode, sat, round)
+        templ = FXP._infer_format('mul', fa, fb, intg, frac, type, opmode, sat, round)
+        if(fa.type == dtype.float and fb.type == dtype.float):
+            return FXPArray._float_result(a._val * b._val, templ, out)
+        bits = fa.intg + fa.frac + fb.intg + fb.frac + 2
+        FXPArray._check_width(bits)
+        if(FXPArray._NATIVE and not FXP._COUNT):
+            obj = FXPArray._native_binop(2, a, b, 0, 0, fa.frac + fb.frac, templ, out)
+            if(obj is not None):
+                return obj
+        va, vb = FXPArray._words(a._val, bits), FXPArray._words(b._val, bits)
+        if(out is None):
+            return FXPArray._from_int(va * vb, fa.frac + fb.frac, templ)
+        raw = numpy.multiply(va, vb, out=FXPArray._buffer(out, numpy.result_type(va, vb)))
+        return FXPArray._from_int(raw, fa.frac + fb.frac, templ, out)
+
+
+def _load_native():
+    '''
+    private function
+    loads the batched kernels of libfixedpointnative.so (fixedpointnative.cpp, built by "make native") with ctypes
+    returns None when the library is not built
+    '''
+    try:
+        lib = ctypes.CDLL(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'libfixedpointnative.so'))
+    except OSError:
+        return None
+    i64, u64, cint, ptr = ctypes.c_int64, ctypes.c_uint64, ctypes.c_int, ctypes.c_void_p
+    lib.fxp_requantize.argtypes = [ptr, i64, cint, i64, i64, i64, u64, cint, cint, ptr]
+    lib.fxp_binop.argtypes      = [cint, ptr, i64, cint, ptr, i64, cint, i64, cint, i64, i64, i64, u64, cint, cint, ptr]
+    lib.fxp_quantize.argtypes   = [ptr, i64, ctypes.c_double, i64, i64, i64, u64, cint, cint, ptr, ptr]
+    lib.fxp_requantize.restype  = None
+    lib.fxp_binop.restype       = None
+    lib.fxp_quantize.restype    = None
+    return lib
+
+FXPArray._lib    = _load_native()
+FXPArray._NATIVE = FXPArray._lib is not None
+
+
+def quantize(val, template, raw=False, overflow=False):
+    '''
+    public function
+    quantizes an array of floating point values to the given template in one vectorized pass
+    each element is converted in the same way as FXP(x, template), including rounding/truncation, saturation/wrap around
+    and the special inputs 'inf'/float('inf') and '-inf'/-float('inf'), NaN raises ValueError
+    - val       : array of floating point values (numpy array, list, ...)
+    - template  : tuple, Format, FXP or FXPArray object
+    - raw       : if set to True, the numpy array of raw words (container of the template, see FXPArray.compact) is returned
+                  instead of a FXPArray object
+    - overflow  : if set to True, a numpy bool array which marks the elements out of range of the template (saturated or
+                  wrapped around) is returned as second output
+
+    Example:
+        a       = quantize(x, (9,5,dtype.fxp, modes.FIXEDFRAC,True,True))
+        w, ovf  = quantize(x, (9,5,dtype.fxp, modes.FIXEDFRAC,False,False), raw=True, overflow=True)
+    '''
+    fmt = Format.of(template)
+    words, ovf = FXPArray._quantize(val, fmt, overflow)
+    out = words if raw else FXPArray.from_raw(words, fmt)
+    if(overflow):
+        return out, ovf
+    return out
+
+
+class CFXP:
+    '''
+    Complex fixedpoint variable class
+    CFXP object holds the in-phase and quadrature parts as two FXP objects re and im, each part follows the rules of FXP.
+
+    CFXP object can be generated using two methods:
+        - pass a complex value and a template (tuple, Format, FXP object), both parts use the template
+            a = CFXP(0.5-0.25j, (1,14,dtype.fxp, modes.FIXEDWIDTH,True,True))
+        - pass two FXP objects to from_parts method
+            a = CFXP.from_parts(i, q)
+
+    Operators (+, -, *), neg, conj, mag2, shifts, convert and copy are computed on the parts with the FXP rules.
+    Operands can be CFXP/CFXPArray objects, or real FXP/FXPArray objects and integer numbers.
+    The * operator and mul method model a 4 multiplier complex multiplier:
+        re = ar*br - ai*bi
+        im = ar*bi + ai*br
+    mul3 method models the 3 multiplier (Karatsuba) form with pre-adders on the second operand:
+        k1 = br*(ar + ai), k2 = ar*(bi - br), k3 = ai*(br + bi)
+        re = k1 - k3
+        im = k1 + k2
+    Both forms are bit-exact to each other when no bits are removed (e.g. FULL opmode), otherwise they model the
+    different rounding/overflow behaviour of the two hardware structures.
+    Products are computed with the rules of the operands and the output parameters of the final add/sub can be selected
+    with the intg, frac, type, opmode, sat, round inputs of mul and mul3 (same as FXP.add).
+
+    Example:
+        a = CFXP(0.5-0.25j, (1,14,dtype.fxp, modes.FIXEDWIDTH,True,True))
+        b = CFXP(0.7071+0.7071j, (1,14,dtype.fxp, modes.FIXEDWIDTH,True,True))
+
+        c = a * b.conj()
+        d = a.mul3(b)
+        p = a.mag2()
+        cv = c.val()
+    '''
+    __slots__ = ('re', 'im')
+
+    def __init__(self, val, template):
+        '''
+        public method
+        Class constructor
+        val is a complex value
+        template is a tuple, Format or FXP object
+        '''
+        val = complex(val)
+        self.re = FXP(val.real, template)
+        self.im = FXP(val.imag, template)
+
+    def from_parts(re, im):
+        '''
+        public method
+        returns an object which holds the given FXP (or FXPArray) objects as real and imaginary parts without copying them
+        '''
+        if(isinstance(re, FXPArray) or isinstance(im, FXPArray)):
+            obj = CFXPArray.__new__(CFXPArray)
+        else:
+            obj = CFXP.__new__(CFXP)
+        obj.re = re
+        obj.im = im
+        return obj
+
+    def _part_op(op, a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None):
+        # private method, applies the add/sub/mul operation of FXP or FXPArray (if one of the parts is an array) on two parts
+        if(isinstance(a, FXPArray) or isinstance(b, FXPArray)):
+            return getattr(FXPArray, '_' + op)(a, b, intg, frac, type, opmode, sat, round)
+        return getattr(FXP, '_' + op)(a, b, intg, frac, type, opmode, sat, round)
+
+    def val(self):
+        # returns the complex floating point representation of the object
+        return self.re.val() + 1j*self.im.val()
+
+    def copy(self, template=None):
+        # returns an independent copy of the object, if template is given its parameters will be used for both parts
+        return CFXP.from_parts(self.re.copy(template), self.im.copy(template))
+
+    def convert(self, intg=None, frac=None, type=None, opmode=None, sat=None, round=None, template=None):
+        # converts both parts of the object, see FXP.convert
+        self.re.convert(intg, frac, type, opmode, sat, round, template)
+        self.im.convert(intg, frac, type, opmode, sat, round, template)
+
+    def conj(self):
+        # returns the complex conjugate of the object
+        return CFXP.from_parts(self.re.copy(), -self.im)
+
+    def mag2(self):
+        # returns the squared magnitude re*re + im*im as a real FXP (or FXPArray) object
+        return self.re*self.re + self.im*self.im
+
+    def __pos__(self):
+        # returns a copy of the object
+        return self.copy()
+
+    def __neg__(self):
+        # returns an object with negative of the value of the object
+        return CFXP.from_parts(-self.re, -self.im)
+
+    def __lshift__(self, other):
+        # shifts both parts to left, see FXP.__lshift__
+        return CFXP.from_parts(self.re << other, self.im << other)
+
+    def __rshift__(self, other):
+        # shifts both parts to right, see FXP.__rshift__
+        return CFXP.from_parts(self.re >> other, self.im >> other)
+
+    def __str__(self):
+        # returns the string format of complex floating point representation of the object
+        return str(self.val())
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __add__(self, b):
+        # magic function of a + b
+        if(isinstance(b, CFXP)):
+            return CFXP.from_parts(self.re + b.re, self.im + b.im)
+        return CFXP.from_parts(self.re + b, self.im.copy())
+
+    def __radd__(self, b):
+        # magic function of b + a
+        return CFXP.from_parts(b + self.re, self.im.copy())
+
+    def __sub__(self, b):
+        # magic function of a - b
+        if(isinstance(b, CFXP)):
+            return CFXP.from_parts(self.re - b.re, self.im - b.im)
+        return CFXP.from_parts(self.re - b, self.im.copy())
+
+    def __rsub__(self, b):
+        # magic function of b - a
+        return CFXP.from_parts(b - self.re, -self.im)
+
+    def __mul__(self, b):
+        # magic function of a * b
+        if(isinstance(b, CFXP)):
+            return CFXP.mul(self, b)
+        return CFXP.from_parts(self.re * b, self.im * b)
+
+    def __rmul__(self, b):
+        # magic function of b * a
+        return CFXP.from_parts(b * self.re, b * self.im)
+
+    def add(a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None):
+        # adds two complex objects and input parameters will be used to set the output parameters, custom output parameter selection
+        return CFXP.from_parts(CFXP._part_op('add', a.re, b.re, intg, frac, type, opmode, sat, round),
+                               CFXP._part_op('add', a.im, b.im, intg, frac, type, opmode, sat, round))
+
+    def sub(a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None):
+        # subtracts two complex objects and input parameters will be used to set the output parameters, custom output parameter selection
+        return CFXP.from_parts(CFXP._part_op('sub', a.re, b.re, intg, frac, type, opmode, sat, round),
+                               CFXP._part_op('sub', a.im, b.im, intg, frac, type, opmode, sat, round))
+
+    def mul(a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None):
+        # multiplies two complex objects with 4 multipliers, input parameters will be used to set the parameters of the final add/sub
+        re = CFXP._part_op('sub', a.re*b.re, a.im*b.im, intg, frac, type, opmode, sat, round)
+        im = CFXP._part_op('add', a.re*b.im, a.im*b.re, intg, frac, type, opmode, sat, round)
+        return CFXP.from_parts(re, im)
+
+    def mul3(a, b, intg=0, frac=0, type=None, opmode=None, sat=None, round=None):
+        # multiplies two complex objects with 3 multipliers (Karatsuba), input parameters will be used to set the parameters of the final add/sub
+        k1 = b.re * (a.re + a.im)
+        k2 = a.re * (b.im - b.re)
+        k3 = a.im * (b.re + b.im)
+        re = CFXP._part_op('sub', k1, k3, intg, frac, type, opmode, sat, round)
+        im = CFXP._part_op('add', k1, k2, intg, frac, type, opmode, sat, round)
+        return CFXP.from_parts(re, im)
+
+
+class CFXPArray(CFXP):
+    '''
+    Vectorized complex fixedpoint array class
+    CFXPArray object holds the in-phase and quadrature parts as two FXPArray objects re and im and supports all operations
+    of CFXP, each element of the result is bit-exact to the result of the same operation on CFXP objects.
+
+    CFXPArray object can be generated using two methods:
+        - pass an array of complex values and a template (tuple, Format, FXP or FXPArray object)
+            a = CFXPArray(x, (1,14,dtype.fxp, modes.FIXEDWIDTH,True,True))
+        - pass two FXPArray objects to from_parts method
+            a = CFXPArray.from_parts(i, q)
+
+    Example:
+        x = CFXPArray(samples, (1,14,dtype.fxp, modes.FIXEDWIDTH,True,True))
+        w = CFXP(0.7071-0.7071j, (1,14,dtype.fxp, modes.FIXEDWIDTH,True,True))
+
+        y = x * w
+        y0 = y[0]
+    '''
+    __slots__ = ()
+
+    def __init__(self, val, template):
+        '''
+        public method
+        Class constructor
+        val is an array of complex values
+        template is a tuple, Format, FXP or FXPArray object
+        '''
+        val = numpy.asarray(val, dtype=numpy.complex128)
+        self.re = FXPArray(val.real, template)
+        self.im = FXPArray(val.imag, template)
+
+    @property
+    def shape(self):
+        # shape of the array
+        return self.re.shape
+
+    def __len__(self):
+        return len(self.re)
+
+    def __getitem__(self, index):
+        # returns a CFXP object for an integer index, otherwise a CFXPArray object sharing the raw words
+        return CFXP.from_parts(self.re[index], self.im[index])
+
+    def __iter__(self):
+        for i in range(len(self.re)):
+            yield self[i]
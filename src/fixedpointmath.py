@@ -0,0 +1,387 @@
+#   Copyright:
+#       Copyright 2017 Ahmad RezazadehReyhani
+#
+#       Licensed under the Apache License, Version 2.0 (the "License");
+#       you may not use this file except in compliance with the License.
+#       You may obtain a copy of the License at
+#
+#          http://www.apache.org/licenses/LICENSE-2.0
+#
+#       Unless required by applicable law or agreed to in writing, software
+#       distributed under the License is distributed on an "AS IS" BASIS,
+#       WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#       See the License for the specific language governing permissions and
+#       limitations under the License.
+#
+#   Acknowledgment:
+#       Grateful appreciation to the Farhang Wireless Inc. for their support and generously funding the implementation of this library.
+#       http://farhangwireless.com/
+
+
+
+from functools import lru_cache
+import numpy
+from fixedpointlib import FXP, FXPArray, Format, dtype, modes, quantize
+from fixedpointdsp import _to_array
+
+
+# widest fractional width of the Newton-Raphson iterations, products of two work words must fit in int64
+_WORK = 29
+
+
+@lru_cache(maxsize=None)
+def _sincos_table(lut_bits, fmt):
+    '''
+    private function
+    returns the raw words of cos(2*pi*k/N) and sin(2*pi*k/N), k = 0, ..., N-1 with N = 2^lut_bits quantized to fmt
+    tables are memoized by the table size and the format, the arrays are read only
+    '''
+    phase = 2*numpy.pi*numpy.arange(int(1)<<lut_bits)/(int(1)<<lut_bits)
+    cos = quantize(numpy.cos(phase), fmt, raw=True).astype(numpy.int64)
+    sin = quantize(numpy.sin(phase), fmt, raw=True).astype(numpy.int64)
+    cos.flags.writeable = False
+    sin.flags.writeable = False
+    return cos, sin
+
+
+@lru_cache(maxsize=None)
+def _atan_table(iterations, frac):
+    '''
+    private function
+    returns the raw words of atan(2^-i), i = 0, ..., iterations-1, the CORDIC gain 1/K and pi/2 with frac fractional bits
+    the values are rounded to nearest, tables are memoized by the number of iterations and the fractional width
+    '''
+    i = numpy.arange(iterations)
+    atan = numpy.round(numpy.arctan(2.0**-i) * 2.0**frac).astype(numpy.int64)
+    atan.flags.writeable = False
+    gain = numpy.prod(numpy.sqrt(1 + 2.0**(-2*i)))
+    return atan, int(round(2.0**frac/gain)), int(round(numpy.pi/2 * 2.0**frac))
+
+
+@lru_cache(maxsize=None)
+def _seed_table(kind, lut_bits, work):
+    '''
+    private function
+    returns the initial estimates of the Newton-Raphson iterations with work fractional bits, memoized by all arguments
+    - 'recip'   : 1/m at the centers of the 2^lut_bits intervals of the normalized input m in [0.5, 1)
+    - 'rsqrt'   : 1/sqrt(m) at the centers of the 2^lut_bits intervals of m in [0, 1), only m >= 0.25 is addressed
+    '''
+    k = numpy.arange(int(1)<<lut_bits)
+    if(kind == 'recip'):
+        table = numpy.round(2.0**work / (0.5 + (k + 0.5)/(int(1)<<(lut_bits+1))))
+    else:
+        table = numpy.round(2.0**work / numpy.sqrt((k + 0.5)/(int(1)<<lut_bits)))
+    table = table.astype(numpy.int64)
+    table.flags.writeable = False
+    return table
+
+
+def cache_info():
+    '''
+    public function
+    returns hits, misses and size of the table caches, tables are built once for each size and format
+        cache_info() -> {'sincos': CacheInfo(hits=..., misses=..., maxsize=None, currsize=...), ...}
+    '''
+    return {'sincos': _sincos_table.cache_info(), 'atan': _atan_table.cache_info(), 'seed': _seed_table.cache_info()}
+
+
+def cache_clear():
+    # public function, clears the table caches and their statistics
+    _sincos_table.cache_clear()
+    _atan_table.cache_clear()
+    _seed_table.cache_clear()
+
+
+def _raw(x):
+    # private function, returns the raw words of a FXPArray object (or list of FXP objects) widened to int64 and its format
+    x = _to_array(x)
+    if(x.type == dtype.float):
+        raise Exception("float type is not supported, use numpy functions")
+    return x._val.astype(numpy.int64), x.fmt
+
+
+def _normalize(v):
+    # private function, returns the bit length of the positive integer values v (position of the leading one plus one)
+    e = numpy.frexp(v.astype(numpy.float64))[1].astype(numpy.int64)
+    # float conversion can round up to the next power of two
+    return e - ((v >> numpy.maximum(e - 1, 0)) == 0)
+
+
+def _scaled(raw, frac, fmt):
+    '''
+    private function
+    returns the FXPArray object of format fmt from exact integer values raw with per element fractional widths frac
+    the elements are requantized in groups of equal fractional width, same as FXPArray._from_int
+    '''
+    out = numpy.empty(raw.shape, dtype=FXPArray._container(fmt))
+    for f in numpy.unique(frac):
+        mask = frac == f
+        out[mask] = FXPArray._from_int(raw[mask], int(f), fmt)._val
+    return FXPArray.from_raw(out, fmt)
+
+
+class NCO:
+    '''
+    Bit-accurate numerically controlled oscillator
+    The phase accumulator is an unsigned phase_bits wide register in wrap around mode, it advances by the frequency control
+    word fcw every sample: phase[n+1] = (phase[n] + fcw) mod 2^phase_bits, so the frequency is fcw/2^phase_bits cycles per
+    sample. The lut_bits most significant bits of the phase address the cos/sin lookup tables (phase truncation), the tables
+    hold cos(2*pi*k/2^lut_bits) and sin(2*pi*k/2^lut_bits) quantized to out_format and are shared by all NCO objects with
+    the same table size and output format.
+
+    Parameters:
+    - fcw           : frequency control word, integer number
+    - out_format    : output template (tuple, Format, FXP or FXPArray) of the cos/sin samples
+    - phase_bits    : width of the phase accumulator, up to 62 bits
+    - lut_bits      : address width of the lookup tables, up to phase_bits
+    - phase         : initial phase, integer number
+
+    NCO object keeps the phase between calls, so a long signal can be generated in chunks. Use reset() to restore the
+    initial phase. A per sample frequency control word (frequency modulation) can be given to the call.
+
+    Example:
+        nco = NCO(round(0.01*2**32), (1,14,dtype.fxp, modes.FIXEDWIDTH,True,True))
+        c, s = nco(1000)            # 1000 samples of cos and sin as FXPArray objects
+        c, s = nco(1000, fcw)       # frequency control word of every sample (integer array)
+    '''
+    def __init__(self, fcw, out_format, phase_bits=32, lut_bits=10, phase=0):
+        if(not 0 < lut_bits <= phase_bits <= 62):
+            raise Exception("lut_bits must be in 1, ..., phase_bits and phase_bits in 1, ..., 62")
+        self.fcw        = int(fcw)
+        self.out_format = Format.of(out_format)
+        self.phase_bits = phase_bits
+        self.lut_bits   = lut_bits
+        self.phase      = int(phase) & ((int(1)<<phase_bits) - 1)
+        self._phase0    = self.phase
+        self._cos, self._sin = _sincos_table(lut_bits, self.out_format)
+
+    def reset(self):
+        # public method, restores the initial phase
+        self.phase = self._phase0
+
+    def phases(self, n, fcw=None):
+        '''
+        public method
+        returns the phase accumulator values (integer array) of the next n samples and advances the accumulator
+        '''
+        mask = (int(1)<<self.phase_bits) - 1
+        if(fcw is None):
+            step = numpy.full(n, self.fcw & mask, dtype=numpy.int64)
+        else:
+            step = numpy.asarray(fcw, dtype=numpy.int64) & mask
+            assert(len(step) == n) or not FXP._DBG, 'one frequency control word per sample'
+        # int64 sums wrap around modulo 2^64, which keeps them exact modulo 2^phase_bits
+        phase = numpy.empty(n, dtype=numpy.int64)
+        if(n > 0):
+            phase[0] = 0
+            numpy.cumsum(step[:-1], out=phase[1:])
+            phase = (phase + self.phase) & mask
+            self.phase = (int(phase[-1]) + int(step[-1])) & mask
+        return phase
+
+    def __call__(self, n, fcw=None):
+        '''
+        public method
+        returns the next n cos and sin samples as FXPArray objects, fcw optionally gives the frequency control word of every sample
+        '''
+        index = self.phases(n, fcw) >> (self.phase_bits - self.lut_bits)
+        fmt = self.out_format
+        return FXPArray.from_raw(self._cos[index], fmt), FXPArray.from_raw(self._sin[index], fmt)
+
+
+def nco(n, fcw, out_format, phase_bits=32, lut_bits=10, phase=0):
+    '''
+    public function
+    returns n cos and sin samples of an NCO starting at the given phase, see NCO for the parameters
+        c, s = nco(1000, round(0.01*2**32), (1,14,dtype.fxp, modes.FIXEDWIDTH,True,True))
+    '''
+    return NCO(fcw, out_format, phase_bits, lut_bits, phase)(n)
+
+
+class CORDIC:
+    '''
+    Bit-accurate CORDIC in rotation and vectoring mode
+    All elements of the input arrays are processed together, one vectorized step per iteration. x and y are integer words
+    with guard extra fractional bits and the angle z is an integer word of angle_format with guard extra fractional bits
+    (radians). Iteration i = 0, ..., iterations-1 with d = +1 or -1:
+        x' = x - d*(y >> i)
+        y' = y + d*(x >> i)
+        z' = z - d*atan(2^-i)
+    where >> is the arithmetic (flooring) right shift and atan(2^-i) is rounded to the angle word. Rotation mode chooses d
+    from the sign of z (z is driven to zero), vectoring mode from the sign of y (y is driven to zero). Inputs outside the
+    convergence range are first rotated by +-pi/2 (rotation for |z| > pi/2, vectoring for x < 0), so rotation accepts angles
+    in [-pi, pi] and vectoring returns angles in [-pi, pi].
+    The CORDIC gain K = prod(sqrt(1 + 2^-2i)) is removed by one multiplication with 1/K rounded to the word when compensate is
+    True. The results are requantized once to the output formats (rounding/truncation and saturation/wrap around of the formats).
+
+    Parameters:
+    - iterations    : number of iterations, the angle resolution is about atan(2^-(iterations-1))
+    - angle_format  : template of the angles (input of rotate, output of vector), fxp with intg >= 2 for [-pi, pi]
+    - guard         : extra fractional bits of the internal words, default is the bit length of iterations
+    - compensate    : if set to True, the results are multiplied by 1/K, otherwise they are K (about 1.647) times larger
+
+    Example:
+        c = CORDIC(16, (2,13,dtype.fxp, modes.FIXEDWIDTH,True,True))
+        xr, yr   = c.rotate(x, y, z)     # (x, y) rotated by z
+        r, theta = c.vector(x, y)        # magnitude and atan2(y, x)
+    '''
+    def __init__(self, iterations, angle_format, guard=None, compensate=True):
+        self.iterations   = iterations
+        self.angle_format = Format.of(angle_format)
+        self.guard        = iterations.bit_length() if guard is None else guard
+        self.compensate   = compensate
+        self._atan, self._gain, self._halfpi = _atan_table(iterations, self.angle_format.frac + self.guard)
+
+    def _iterate(self, x, y, z, rotate):
+        # private method, runs the iterations on the internal words
+        for i in range(self.iterations):
+            if(rotate):
+                d = numpy.where(z >= 0, 1, -1)
+            else:
+                d = numpy.where(y < 0, 1, -1)
+            x, y = x - d*(y >> i), y + d*(x >> i)
+            z = z - d*self._atan[i]
+        return x, y, z
+
+    def _scale(self, v, frac):
+        # private method, removes the CORDIC gain from internal words with frac fractional bits
+        if(not self.compensate):
+            return v
+        FXPArray._check_width(int(numpy.max(numpy.abs(v), initial=0)).bit_length() + self.angle_format.frac + self.guard + 2)
+        return FXPArray._round_shift(v*self._gain, self.angle_format.frac + self.guard, True)
+
+    def _words(self, x, y):
+        # private method, returns the internal words of x and y with guard extra fractional bits and their format
+        x, fx = _raw(x)
+        y, fy = _raw(y)
+        assert(fx == fy) or not FXP._DBG, 'x and y must have the same format'
+        FXPArray._check_width(fx.intg + fx.frac + self.guard + 4)
+        return x << self.guard, y << self.guard, fx
+
+    def rotate(self, x, y, z, out_format=None):
+        '''
+        public method
+        rotates the vectors (x, y) by the angles z (FXPArray objects), returns the rotated x and y as FXPArray objects
+        of out_format, default is the format of x with one more integer bit
+        '''
+        x, y, fx = self._words(x, y)
+        z, fz = _raw(z)
+        af = self.angle_format
+        frac = af.frac + self.guard
+        z = FXPArray._from_int(z, fz.frac, af)._val.astype(numpy.int64) << self.guard
+        # angles beyond +-pi/2 are rotated by pi/2 first
+        up, down = z > self._halfpi, z < -self._halfpi
+        x, y = numpy.where(up, -y, numpy.where(down, y, x)), numpy.where(up, x, numpy.where(down, -x, y))
+        z = numpy.where(up, z - self._halfpi, numpy.where(down, z + self._halfpi, z))
+        x, y, z = self._iterate(x, y, z, True)
+        fmt = Format.of(out_format) if out_format is not None else fx._with(0, fx.intg + 1)
+        x, y = self._scale(x, frac), self._scale(y, frac)
+        return FXPArray._from_int(x, fx.frac + self.guard, fmt), FXPArray._from_int(y, fx.frac + self.guard, fmt)
+
+    def vector(self, x, y, out_format=None):
+        '''
+        public method
+        returns the magnitudes sqrt(x^2 + y^2) of the vectors (x, y) (FXPArray objects) in out_format (default is the format
+        of x with one more integer bit) and their angles atan2(y, x) in angle_format as FXPArray objects
+        '''
+        x, y, fx = self._words(x, y)
+        af = self.angle_format
+        frac = af.frac + self.guard
+        # vectors with x < 0 are rotated by -+pi/2 first
+        left = x < 0
+        up = left & (y >= 0)
+        down = left & (y < 0)
+        x, y = numpy.where(up, y, numpy.where(down, -y, x)), numpy.where(up, -x, numpy.where(down, x, y))
+        z = numpy.where(up, self._halfpi, numpy.where(down, -self._halfpi, 0)).astype(numpy.int64)
+        x, y, z = self._iterate(x, y, z, False)
+        fmt = Format.of(out_format) if out_format is not None else fx._with(0, fx.intg + 1)
+        return FXPArray._from_int(self._scale(x, frac), fx.frac + self.guard, fmt), FXPArray._from_int(z, frac, af)
+
+
+def atan2(y, x, angle_format, iterations=16):
+    '''
+    public function
+    returns atan2(y, x) of the FXPArray objects y and x in angle_format by CORDIC vectoring, see CORDIC
+        theta = atan2(q, i, (2,13,dtype.fxp, modes.FIXEDWIDTH,True,True))
+    '''
+    return CORDIC(iterations, angle_format, compensate=False).vector(x, y)[1]
+
+
+def _work(fmt, guard):
+    # private function, returns the fractional width of the Newton-Raphson iterations for output format fmt
+    work = fmt.intg + fmt.frac + guard
+    if(work > _WORK):
+        raise Exception("Newton-Raphson iterations support up to %d-bit outputs" % (_WORK - guard))
+    return work
+
+
+def _mantissa(v, e, w):
+    # private function, returns the positive integer values v of bit length e aligned to bit length w (low bits are truncated)
+    return numpy.where(e <= w, v << numpy.maximum(w - e, 0), v >> numpy.maximum(e - w, 0))
+
+
+def reciprocal(x, out_format, iterations=2, lut_bits=8, guard=4):
+    '''
+    public function
+    returns 1/x of the FXPArray object x in out_format by Newton-Raphson iterations
+    |x| is normalized to m*2^e with m in [0.5, 1) (leading one detection, m keeps w = out width + guard fractional bits,
+    extra low bits are truncated), the lut_bits bits after the leading one address a table of 1/m at the interval centers
+    and every iteration refines the estimate y with integer words of w fractional bits:
+        y = y*(2 - m*y)
+    both products are rounded (half to even) or truncated to w fractional bits by the round setting of out_format.
+    The result y*2^-e takes the sign of x and is requantized to out_format, 1/0 is the highest value of out_format.
+    Every iteration doubles the number of correct bits, about 2*lut_bits bits after one and 4*lut_bits bits after two.
+        r = reciprocal(x, (4,12,dtype.fxp, modes.FIXEDWIDTH,True,True))
+    '''
+    v, fx = _raw(x)
+    fmt = Format.of(out_format)
+    w = _work(fmt, guard)
+    lut_bits = min(lut_bits, w - 1)
+    zero = v == 0
+    sign = v < 0
+    v = numpy.where(zero, 1, numpy.abs(v))
+    e = _normalize(v)
+    m = _mantissa(v, e, w)
+    # m is in [2^(w-1), 2^w), the bits after the leading one address the table
+    y = _seed_table('recip', lut_bits, w)[(m >> (w - 1 - lut_bits)) - (int(1)<<lut_bits)]
+    for k in range(iterations):
+        t = FXPArray._round_shift(m*y, w, fmt.round)
+        y = FXPArray._round_shift(y*((int(1)<<(w+1)) - t), w, fmt.round)
+    # x = m*2^-w * 2^(e - fx.frac), so 1/x = y*2^-(w + e - fx.frac)
+    out = _scaled(numpy.where(sign, -y, y), w + e - fx.frac, fmt)
+    out._val[zero] = fmt.hi
+    return out
+
+
+def sqrt(x, out_format, iterations=2, lut_bits=8, guard=4):
+    '''
+    public function
+    returns the square root of the FXPArray object x (non-negative values) in out_format by Newton-Raphson iterations
+    x is normalized to m*2^2p with m in [0.25, 1) (leading one detection, m keeps w = out width + guard fractional bits,
+    extra low bits are truncated), the lut_bits most significant bits of m address a table of 1/sqrt(m) at the interval
+    centers and every iteration refines the inverse square root estimate y with integer words of w fractional bits:
+        y = y*(3 - m*y*y)/2
+    then sqrt(x) = m*y*2^p. All products are rounded (half to even) or truncated to w fractional bits by the round
+    setting of out_format and the result is requantized to out_format, negative values give zero.
+        r = sqrt(x, (4,12,dtype.ufxp, modes.FIXEDWIDTH,True,True))
+    '''
+    v, fx = _raw(x)
+    assert(v >= 0).all() or not FXP._DBG, 'square root of negative number'
+    fmt = Format.of(out_format)
+    w = _work(fmt, guard)
+    lut_bits = min(lut_bits, w)
+    zero = v <= 0
+    v = numpy.where(zero, 1, v)
+    e = _normalize(v)
+    # x = v*2^-fx.frac = (v*2^-e) * 2^(e - fx.frac), one more leading zero of m makes the exponent even
+    e = e + ((e - fx.frac) & 1)
+    m = _mantissa(v, e, w)
+    # m is in [2^(w-2), 2^w), its most significant bits address the table
+    y = _seed_table('rsqrt', lut_bits, w)[m >> (w - lut_bits)]
+    r = fmt.round
+    for k in range(iterations):
+        t = FXPArray._round_shift(m*FXPArray._round_shift(y*y, w, r), w, r)
+        y = FXPArray._round_shift(y*((int(3)<<w) - t), w + 1, r)
+    y = numpy.where(zero, 0, FXPArray._round_shift(m*y, w, r))
+    # sqrt(x) = y*2^-w * 2^((e - fx.frac)/2)
+    return _scaled(y, w - (e - fx.frac)//2, fmt)
@@ -0,0 +1,152 @@
+//   Copyright:
+//       Copyright 2017 Ahmad RezazadehReyhani
+//
+//       Licensed under the Apache License, Version 2.0 (the "License");
+//       you may not use this file except in compliance with the License.
+//       You may obtain a copy of the License at
+//
+//          http://WWW.apache.org/licenses/LICENSE-2.0
+//
+//       Unless required by applicable law or agreed to in writing, software
+//       distributed under the License is distributed on an "AS IS" BASIS,
+//       WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+//       See the License for the specific language governing permissions and
+//       limitations under the License.
+//
+//   Acknowledgment:
+//       Grateful appreciation to the Farhang Wireless Inc. for their support and generously funding the implementation of this library.
+//       http://farhangwireless.com/
+
+/*
+    Batched kernels of the Python FXPArray class (fixedpointlib.py), loaded by ctypes from libfixedpointnative.so
+    Build with "make native" in the src directory.
+
+    The kernels work on int64 raw words in integer domain, exactly as FXPArray does:
+    - rounding is half to even (same as numpy round), otherwise values are truncated (floor)
+    - saturation clips to [lo, hi], otherwise values wrap around: ((raw + half) & mask) - half
+    so they are bit-exact to the pure Python path. Unlike the double based FXP class of fixedpointlib.cpp,
+    raw words up to 63 bits are supported.
+*/
+
+#include <stdint.h>
+#include <math.h>
+
+// -----------------------------------
+// removes shift fractional bits of raw (shift > 0), rounds half to even when rounding is set, otherwise truncates
+static inline int64_t round_shift(int64_t raw, int shift, int rounding)
+{
+    int64_t temp = raw >> shift;
+    if(rounding)
+    {
+        int64_t rem  = raw & ((((int64_t)1) << shift) - 1);
+        int64_t half = ((int64_t)1) << (shift - 1);
+        if((rem > half) | ((rem == half) & ((temp & 1) == 1)))
+            temp += 1;
+    }
+    return temp;
+}
+// -----------------------------------
+// saturates or wraps around raw to the bit width given by lo, hi, half and mask
+static inline int64_t saturate_wrap(int64_t raw, int64_t lo, int64_t hi, int64_t half, uint64_t mask, int sat)
+{
+    if(sat)
+    {
+        if(raw > hi)
+            raw = hi;
+        if(raw < lo)
+            raw = lo;
+    }
+    return (int64_t)(((uint64_t)raw + (uint64_t)half) & mask) - half;
+}
+// -----------------------------------
+// requantizes exact integer value raw with shift extra fractional bits (shift < 0 adds fractional bits)
+static inline int64_t requantize(int64_t raw, int shift, int64_t lo, int64_t hi, int64_t half, uint64_t mask, int sat, int rounding)
+{
+    if(shift > 0)
+        raw = round_shift(raw, shift, rounding);
+    else if(shift < 0)
+    {
+        // values out of range are clipped before the shift, so their shifted words stay out of range instead of overflowing
+        if(sat)
+            raw = (raw > (hi >> -shift)) ? (hi >> -shift) + 1 : ((raw < (lo >> -shift)) ? (lo >> -shift) - 1 : raw);
+        raw = (int64_t)((uint64_t)raw << (-shift));
+    }
+    return saturate_wrap(raw, lo, hi, half, mask, sat);
+}
+
+extern "C"
+{
+// -----------------------------------
+/*
+requantizes n exact integer values to the output format
+shift is the number of removed fractional bits (negative values add fractional bits)
+*/
+void fxp_requantize(const int64_t* raw, int64_t n, int shift,
+                    int64_t lo, int64_t hi, int64_t half, uint64_t mask, int sat, int rounding, int64_t* out)
+{
+    for(int64_t i = 0; i < n; i++)
+        out[i] = requantize(raw[i], shift, lo, hi, half, mask, sat, rounding);
+}
+// -----------------------------------
+/*
+computes n results of an operation (0: add, 1: sub, 2: mul) and requantizes them to the output format
+a and b are the raw words of the operands with strides sa and sb (0 for a scalar operand)
+for add/sub the operands are aligned by left shifts ashift and bshift before the operation
+shift is the number of fractional bits removed from the exact results
+*/
+void fxp_binop(int op, const int64_t* a, int64_t sa, int ashift, const int64_t* b, int64_t sb, int bshift, int64_t n, int shift,
+               int64_t lo, int64_t hi, int64_t half, uint64_t mask, int sat, int rounding, int64_t* out)
+{
+    int64_t i;
+    if(op == 0)
+        for(i = 0; i < n; i++)
+            out[i] = requantize((int64_t)(((uint64_t)a[i*sa] << ashift) + ((uint64_t)b[i*sb] << bshift)), shift, lo, hi, half, mask, sat, rounding);
+    else if(op == 1)
+        for(i = 0; i < n; i++)
+            out[i] = requantize((int64_t)(((uint64_t)a[i*sa] << ashift) - ((uint64_t)b[i*sb] << bshift)), shift, lo, hi, half, mask, sat, rounding);
+    else
+        for(i = 0; i < n; i++)
+            out[i] = requantize(a[i*sa] * b[i*sb], shift, lo, hi, half, mask, sat, rounding);
+}
+// -----------------------------------
+/*
+quantizes n floating point values to raw words, same as FXPArray._quantize
+scale is 2^frac, +inf/-inf are mapped to hi/lo
+if ovf is not NULL, it marks the values out of range of the format (saturated or wrapped around)
+*/
+void fxp_quantize(const double* val, int64_t n, double scale,
+                  int64_t lo, int64_t hi, int64_t half, uint64_t mask, int sat, int rounding, int64_t* out, uint8_t* ovf)
+{
+    // hi+1 and lo are powers of two, exact in double unlike hi of formats wider than 53 bits
+    double dlo     = (double)lo;
+    double dtop    = (double)((uint64_t)hi + 1);
+    double modulus = (double)mask + 1.0;
+    for(int64_t i = 0; i < n; i++)
+    {
+        double x = val[i];
+        if((x == HUGE_VAL) | (x == -HUGE_VAL))
+        {
+            out[i] = (x > 0) ? hi : lo;
+            if(ovf)
+                ovf[i] = 0;
+            continue;
+        }
+        double temp = x * scale;
+        if(rounding)
+            temp = nearbyint(temp);
+        else
+            temp = floor(temp);
+        int over  = temp >= dtop;
+        int under = temp < dlo;
+        if(ovf)
+            ovf[i] = (uint8_t)(over | under);
+        // float modulo is exact for power of two modulus, it brings the values into int64 range before wrapping
+        out[i] = saturate_wrap((int64_t)fmod(temp, modulus), lo, hi, half, mask, 0);
+        // saturated values are set in integer words, double can not hold hi of wide formats
+        if(sat & over)
+            out[i] = hi;
+        if(sat & under)
+            out[i] = lo;
+    }
+}
+}
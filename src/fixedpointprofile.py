@@ -0,0 +1,170 @@
+#   Copyright:
+#       Copyright 2017 Ahmad RezazadehReyhani
+#
+#       Licensed under the Apache License, Version 2.0 (the "License");
+#       you may not use this file except in compliance with the License.
+#       You may obtain a copy of the License at
+#
+#          http://www.apache.org/licenses/LICENSE-2.0
+#
+#       Unless required by applicable law or agreed to in writing, software
+#       distributed under the License is distributed on an "AS IS" BASIS,
+#       WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#       See the License for the specific language governing permissions and
+#       limitations under the License.
+#
+#   Acknowledgment:
+#       Grateful appreciation to the Farhang Wireless Inc. for their support and generously funding the implementation of this library.
+#       http://farhangwireless.com/
+
+
+import numpy
+from math import ceil, log2, log10, sqrt
+from fixedpointlib import FXP, FXPArray, CFXP, dtype, modes
+
+
+class Profiler:
+    '''
+    Dynamic range profiler
+    records per signal statistics of a model running in float (dtype.float templates) or fixedpoint, and proposes
+    fixedpoint templates for a target overflow probability and SQNR.
+    Statistics are streaming aggregates, so memory does not grow with the number of samples:
+    - number of samples, min, max, sum and sum of squares (mean, rms and peak-to-rms ratio)
+    - histogram of the magnitude exponents floor(log2(abs(x))), one bin per power of 2 from 2^-EXP to 2^(EXP-1)
+
+    Example:
+        prof = Profiler()
+        for chunk in capture:
+            x = prof('adc', chunk)                  # records the samples and returns them
+            y = prof('mixer', model_mixer(x))       # FXP, FXPArray, CFXP, CFXPArray objects or numbers
+        print(prof.table(overflow=1e-6, sqnr=60))
+        templ = prof.templates(overflow=1e-6, sqnr=60, opmode=modes.FIXEDWIDTH, sat=True, round=True)
+        a = FXP(0.3, templ['mixer'])
+        print(prof.emit(overflow=1e-6, sqnr=60))     # python source of the templates
+    '''
+    # exponent range of the histogram
+    EXP = 128
+
+    def __init__(self):
+        self.stats = {}
+
+    def reset(self):
+        # public method, clears the statistics of all signals
+        self.stats = {}
+
+    def __call__(self, name, x):
+        # public method, records the samples of x under the given signal name and returns x
+        self.record(name, x)
+        return x
+
+    def record(self, name, x):
+        '''
+        public method
+        adds the samples of x (numbers, numpy arrays, FXP, FXPArray, CFXP or CFXPArray objects) to the statistics of signal name
+        real and imaginary parts of complex signals share the statistics, as they share the format
+        '''
+        if(isinstance(x, CFXP)):
+            v = numpy.concatenate((numpy.ravel(x.re.val()), numpy.ravel(x.im.val())))
+        elif(isinstance(x, (FXP, FXPArray))):
+            v = numpy.ravel(x.val())
+        else:
+            v = numpy.ravel(numpy.asarray(x))
+            if(v.dtype.kind == 'c'):
+                v = numpy.concatenate((v.real, v.imag))
+        v = v.astype(numpy.float64)
+        s = self.stats.get(name)
+        if(s is None):
+            s = dict(count=0, min=numpy.inf, max=-numpy.inf, sum=0.0, sum2=0.0, zeros=0,
+                     hist=numpy.zeros(2*Profiler.EXP, dtype=numpy.int64))
+            self.stats[name] = s
+        if(len(v) == 0):
+            return
+        s['count'] += len(v)
+        s['min']    = min(s['min'], float(v.min()))
+        s['max']    = max(s['max'], float(v.max()))
+        s['sum']   += float(v.sum())
+        s['sum2']  += float(numpy.dot(v, v))
+        nz = v[v != 0]
+        s['zeros'] += len(v) - len(nz)
+        # abs(x) = m * 2^e with 0.5 <= m < 1, so floor(log2(abs(x))) = e - 1
+        e = numpy.frexp(nz)[1] - 1
+        s['hist'] += numpy.bincount(numpy.clip(e + Profiler.EXP, 0, 2*Profiler.EXP - 1), minlength=2*Profiler.EXP)
+
+    def summary(self, name):
+        '''
+        public method
+        returns a dict of the statistics of signal name: count, min, max, mean, rms, peak (max abs), par (peak-to-rms ratio in dB)
+        '''
+        s = self.stats[name]
+        n = max(s['count'], 1)
+        rms  = sqrt(s['sum2'] / n)
+        peak = max(abs(s['min']), abs(s['max'])) if s['count'] else 0.0
+        par  = 20*log10(peak / rms) if rms > 0 else 0.0
+        return dict(count=s['count'], min=s['min'], max=s['max'], mean=s['sum'] / n, rms=rms, peak=peak, par=par)
+
+    def overflow_probability(self, name, intg):
+        # public method, returns the fraction of samples of signal name with abs(x) >= 2^intg (out of range of intg integer bits)
+        s = self.stats[name]
+        if(s['count'] == 0):
+            return 0.0
+        k = min(max(intg + Profiler.EXP, 0), 2*Profiler.EXP)
+        return float(s['hist'][k:].sum()) / s['count']
+
+    def propose(self, name, overflow=0.0, sqnr=None, width=None, opmode=modes.FULL, sat=False, round=False):
+        '''
+        public method
+        returns the proposed template (intg, frac, type, opmode, sat, round) of signal name
+        - overflow  : target probability of samples out of range, intg is the smallest integer width which keeps the
+                      fraction of samples with abs(x) >= 2^intg not larger than overflow (0 means no sample overflows)
+        - sqnr      : target signal to quantization noise ratio in dB, frac is the smallest fractional width which gives
+                      noise power 2^(-2*frac)/12 (rounding) or 2^(-2*frac)/3 (truncation) below rms^2 / 10^(sqnr/10)
+        - width     : total bit width (sign bit included for signed types), used instead of sqnr when given
+        type is ufxp for non-negative signals, otherwise fxp
+        '''
+        s = self.summary(name)
+        intg = 0
+        while(self.overflow_probability(name, intg) > overflow and intg < Profiler.EXP):
+            intg += 1
+        signed = s['min'] < 0
+        if(width is not None):
+            frac = width - intg - (1 if signed else 0)
+        elif(sqnr is not None):
+            # a signal which is always zero needs no fractional bits
+            frac = 0
+            if(s['rms'] > 0):
+                noise = s['rms']**2 / 10**(sqnr / 10.0)
+                step  = sqrt((12.0 if round else 3.0) * noise)
+                frac  = int(ceil(-log2(step)))
+        else:
+            raise Exception("sqnr or width must be given")
+        frac = max(frac, 0)
+        return (intg, frac, dtype.fxp if signed else dtype.ufxp, opmode, sat, round)
+
+    def templates(self, overflow=0.0, sqnr=None, width=None, opmode=modes.FULL, sat=False, round=False):
+        # public method, returns a dict of the proposed templates of all signals, see propose()
+        return {name: self.propose(name, overflow, sqnr, width, opmode, sat, round) for name in self.stats}
+
+    def emit(self, overflow=0.0, sqnr=None, width=None, opmode=modes.FULL, sat=False, round=False):
+        '''
+        public method
+        returns python source lines which define the proposed templates of all signals, e.g.
+            adc = (0, 11, dtype.fxp, modes.FULL, False, True)
+        signal names are converted to identifiers by replacing other characters with '_'
+        '''
+        lines = []
+        for name, t in self.templates(overflow, sqnr, width, opmode, sat, round).items():
+            ident = ''.join(c if c.isalnum() or c == '_' else '_' for c in str(name))
+            if(not ident or ident[0].isdigit()):
+                ident = '_' + ident
+            mode = 'None' if t[3] is None else 'modes.' + t[3]
+            lines.append('%s = (%d, %d, dtype.%s, %s, %s, %s)' % (ident, t[0], t[1], t[2], mode, t[4], t[5]))
+        return '\n'.join(lines)
+
+    def table(self, overflow=0.0, sqnr=None, width=None, opmode=modes.FULL, sat=False, round=False):
+        # public method, returns the statistics and proposed templates of all signals as a printable summary table
+        lines = ['%-16s %12s %12s %12s %12s %10s  %s' % ('signal', 'samples', 'min', 'max', 'rms', 'par(dB)', 'template')]
+        for name in self.stats:
+            s = self.summary(name)
+            t = self.propose(name, overflow, sqnr, width, opmode, sat, round)
+            lines.append('%-16s %12d %12.6g %12.6g %12.6g %10.2f  %s' % (name, s['count'], s['min'], s['max'], s['rms'], s['par'], t))
+        return '\n'.join(lines)
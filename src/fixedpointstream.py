@@ -0,0 +1,215 @@
+#   Copyright:
+#       Copyright 2017 Ahmad RezazadehReyhani
+#
+#       Licensed under the Apache License, Version 2.0 (the 'License');
+#       you may not use this file except in compliance with the License.
+#       You may obtain a copy of the License at
+#
+#          http://www.apache.org/licenses/LICENSE-2.0
+#
+#       Unless required by applicable law or agreed to in writing, software
+#       distributed under the License is distributed on an 'AS IS' BASIS,
+#       WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#       See the License for the specific language governing permissions and
+#       limitations under the License.
+#
+#   Acknowledgment:
+#       Grateful appreciation to the Farhang Wireless Inc. for their support and generously funding the implementation of this library.
+#       http://farhangwireless.com/
+
+
+import numpy
+from fixedpointlib import FXPArray, CFXP, CFXPArray, Format, quantize
+from fixedpointdsp import FIR
+
+
+def chunks(source, chunk_size):
+    '''
+    public function
+    generator of fixed size chunks of a capture
+    - source        : array of samples (numpy array, numpy.memmap, list, ...), which is sliced into chunks of chunk_size samples
+                      or any other iterable of chunks, which are passed as they are
+    - chunk_size    : number of samples of each chunk (the last chunk can be shorter)
+    '''
+    if(isinstance(source, (numpy.ndarray, list, tuple, FXPArray, CFXPArray))):
+        for start in range(0, len(source), chunk_size):
+            yield source[start:start+chunk_size]
+    else:
+        for chunk in source:
+            yield chunk
+
+
+def concatenate(outputs):
+    '''
+    public function
+    concatenates a list of FXPArray (or CFXPArray) chunks with the same format to one object
+    returns None for an empty list (e.g. an empty capture), the format of the output is not known then
+    '''
+    if(len(outputs) == 0):
+        return None
+    if(isinstance(outputs[0], CFXP)):
+        return CFXP.from_parts(concatenate([x.re for x in outputs]), concatenate([x.im for x in outputs]))
+    return FXPArray.from_raw(numpy.concatenate([x._val for x in outputs]), outputs[0])
+
+
+class Quantize:
+    '''
+    Quantization block
+    converts chunks of floating point (real or complex) samples to FXPArray (or CFXPArray) objects of the given template
+    '''
+    def __init__(self, template):
+        self.fmt = Format.of(template)
+
+    def reset(self):
+        # public method, the block has no state
+        pass
+
+    def __call__(self, x):
+        x = numpy.asarray(x)
+        if(x.dtype.kind == 'c'):
+            return CFXPArray(x, self.fmt)
+        return quantize(x, self.fmt)
+
+
+class Filter:
+    '''
+    FIR filter block, see fixedpointdsp.FIR for the parameters
+    real and imaginary parts of complex chunks are filtered by two FIR filters with the same taps
+    the delay lines are kept between chunks
+    '''
+    def __init__(self, taps, acc_format=None, out_format=None):
+        self._fir_re = FIR(taps, acc_format, out_format)
+        self._fir_im = FIR(taps, acc_format, out_format)
+
+    def reset(self):
+        # public method, clears the delay lines
+        self._fir_re.reset()
+        self._fir_im.reset()
+
+    def __call__(self, x):
+        if(isinstance(x, CFXP)):
+            return CFXP.from_parts(self._fir_re(x.re), self._fir_im(x.im))
+        return self._fir_re(x)
+
+
+class Mix:
+    '''
+    Mixer block
+    multiplies the samples by the local oscillator exp(j*2*pi*freq*n), e.g. negative freq for down conversion
+    - freq          : normalized frequency (cycles per sample)
+    - lo_format     : template of the real and imaginary parts of the local oscillator samples
+    - out_format    : output template, default is the format given by the FXP rules of the operands
+    - phase_bits    : width of the phase accumulator (up to 32 bits), the frequency resolution is 2^-phase_bits
+    - karatsuba     : if set to True, complex samples are multiplied by the 3 multiplier form (CFXP.mul3)
+    The phase accumulator is kept between chunks, real chunks give complex outputs.
+    '''
+    def __init__(self, freq, lo_format, out_format=None, phase_bits=32, karatsuba=False):
+        if(phase_bits > 32):
+            raise Exception("phase accumulator must not be wider than 32 bits")
+        self.lo_format  = Format.of(lo_format)
+        self.out_format = None if out_format is None else Format.of(out_format)
+        self.phase_bits = phase_bits
+        self.step       = int(round(freq * (int(1)<<phase_bits))) % (int(1)<<phase_bits)
+        self.karatsuba  = karatsuba
+        self.phase      = 0
+
+    def reset(self):
+        # public method, clears the phase accumulator
+        self.phase = 0
+
+    def __call__(self, x):
+        n     = len(x)
+        mask  = (int(1)<<self.phase_bits) - 1
+        phase = (self.phase + self.step*numpy.arange(n, dtype=numpy.int64)) & mask
+        self.phase = (self.phase + self.step*n) & mask
+        lo = CFXPArray(numpy.exp(2j*numpy.pi*phase/float(mask + 1)), self.lo_format)
+        if(isinstance(x, CFXP)):
+            y = x.mul3(lo) if self.karatsuba else x * lo
+        else:
+            y = CFXP.from_parts(x * lo.re, x * lo.im)
+        if(self.out_format is not None):
+            y = y.copy(self.out_format)
+        return y
+
+
+class Decimate:
+    '''
+    Decimation block
+    keeps every factor-th sample starting from sample offset of the capture, the position is kept between chunks
+    '''
+    def __init__(self, factor, offset=0):
+        self.factor = factor
+        self.offset = offset
+        self._skip  = offset
+
+    def reset(self):
+        # public method, restarts from sample offset
+        self._skip = self.offset
+
+    def __call__(self, x):
+        y = x[self._skip::self.factor]
+        # the offset can be longer than the chunk, then only the samples of the chunk are skipped
+        self._skip = self._skip - len(x) if self._skip >= len(x) else (self._skip - len(x)) % self.factor
+        return y
+
+
+class Requantize:
+    '''
+    Requantization block
+    converts the chunks to the given template (rounding/truncation and saturation/wrap around of the template)
+    '''
+    def __init__(self, template):
+        self.fmt = Format.of(template)
+
+    def reset(self):
+        # public method, the block has no state
+        pass
+
+    def __call__(self, x):
+        return x.copy(self.fmt)
+
+
+class Pipeline:
+    '''
+    Streaming block processing pipeline
+    chunks of a capture flow through the blocks in the given order. Each block keeps its state (delay lines,
+    phase accumulators, decimation position) between chunks, so memory is bounded by the chunk size and the output is
+    bit-exact to processing the whole capture at once. The chunk size trades latency against throughput.
+
+    Blocks are Quantize, Filter, Mix, Decimate, Requantize or any callable object with a reset() method.
+
+    Example:
+        p = Pipeline(Quantize((0,11,dtype.fxp,modes.FIXEDWIDTH,True,True)),
+                     Mix(-0.125, (1,14,dtype.fxp,modes.FIXEDWIDTH,True,True)),
+                     Filter(taps, out_format=(1,14,dtype.fxp,modes.FIXEDWIDTH,True,True)),
+                     Decimate(4),
+                     Requantize((0,7,dtype.fxp,modes.FIXEDWIDTH,True,True)))
+        for y in p.run(numpy.memmap('capture.bin', dtype=numpy.complex64), chunk_size=65536):
+            ...
+        y = p(x)    # whole capture at once
+    '''
+    def __init__(self, *blocks):
+        self.blocks = list(blocks)
+
+    def reset(self):
+        # public method, resets the state of all blocks
+        for block in self.blocks:
+            block.reset()
+
+    def process(self, chunk):
+        # public method, passes one chunk through all blocks and returns the output chunk
+        for block in self.blocks:
+            chunk = block(chunk)
+        return chunk
+
+    def run(self, source, chunk_size=65536):
+        '''
+        public method
+        generator of the output chunks of a capture, see chunks() for the source types
+        '''
+        for chunk in chunks(source, chunk_size):
+            yield self.process(chunk)
+
+    def __call__(self, source, chunk_size=65536):
+        # processes the whole capture and returns the concatenated output (None for an empty capture)
+        return concatenate(list(self.run(source, chunk_size)))
@@ -0,0 +1,185 @@
+#   Copyright:
+#       Copyright 2017 Ahmad RezazadehReyhani
+#
+#       Licensed under the Apache License, Version 2.0 (the "License");
+#       you may not use this file except in compliance with the License.
+#       You may obtain a copy of the License at
+#
+#          http://www.apache.org/licenses/LICENSE-2.0
+#
+#       Unless required by applicable law or agreed to in writing, software
+#       distributed under the License is distributed on an "AS IS" BASIS,
+#       WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#       See the License for the specific language governing permissions and
+#       limitations under the License.
+#
+#   Acknowledgment:
+#       Grateful appreciation to the Farhang Wireless Inc. for their support and generously funding the implementation of this library.
+#       http://farhangwireless.com/
+
+
+import itertools
+import json
+import os
+import numpy
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+
+def grid(**axes):
+    '''
+    public function
+    returns the list of all combinations of the given parameter values as dicts
+        grid(intg=[1,2], frac=range(8,16), sat=[True,False], round=[True,False], opmode=[modes.FIXEDWIDTH])
+    '''
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*[list(axes[name]) for name in names])]
+
+
+def _key(config):
+    # private function, returns the cache key of a configuration
+    return json.dumps(config, sort_keys=True)
+
+
+def _metrics(result):
+    # private function, converts the result of a model to a dict of json serializable metrics
+    if(not isinstance(result, dict)):
+        result = {'metric': result}
+    return {name: (value.item() if isinstance(value, numpy.generic) else value) for name, value in result.items()}
+
+
+# input vectors of a worker process, attached to the shared memory blocks by _attach
+_inputs = {}
+_blocks = []
+
+
+def _attach(specs):
+    # private function, initializer of the worker processes, maps the shared memory blocks of the inputs to numpy arrays
+    for name, (block, shape, dtype) in specs.items():
+        try:
+            shm = shared_memory.SharedMemory(name=block, track=False)
+        except TypeError:
+            # python < 3.13 has no track argument
+            shm = shared_memory.SharedMemory(name=block)
+        _blocks.append(shm)
+        x = numpy.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        x.flags.writeable = False
+        _inputs[name] = x
+
+
+def _run(model, config):
+    # private function, runs one configuration in a worker process
+    return _metrics(model(config, _inputs))
+
+
+def sweep(model, configs, inputs=None, cache=None, workers=None):
+    '''
+    public function
+    runs model(config, inputs) for every configuration and returns the list of result rows (config merged with metrics)
+    in the order of configs
+    - model     : module level function (it is sent to the worker processes) which returns a dict of metrics (or a number)
+    - configs   : list of json serializable configurations, e.g. dicts of grid() or template tuples
+    - inputs    : dict of numpy arrays, which are shared by all workers through shared memory (read only)
+    - cache     : results file name, every finished configuration is appended as one json line, configurations which
+                  are already in the file are not run again, so an interrupted sweep resumes where it stopped
+                  a configuration which raises stops the sweep: finished configurations are cached, pending ones are
+                  cancelled and the exception is raised again
+    - workers   : number of worker processes, default is the number of CPUs, 0 runs the configurations in this process
+
+    Example:
+        def ber(config, inputs):
+            templ = (config['intg'], config['frac'], dtype.fxp, modes.FIXEDWIDTH, config['sat'], config['round'])
+            y = model(FXPArray(inputs['rx'], templ))
+            return {'ber': numpy.mean(y != inputs['bits'])}
+
+        rows = sweep(ber, grid(intg=[1,2], frac=range(6,12), sat=[True,False], round=[True,False]),
+                     inputs={'rx': rx, 'bits': bits}, cache='ber_sweep.jsonl')
+        print(table(rows))
+    '''
+    inputs = {} if inputs is None else inputs
+    done = {}
+    line = '\n'
+    if(cache is not None and os.path.exists(cache)):
+        with open(cache) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # line of an interrupted write
+                    continue
+                done[entry['key']] = entry['metrics']
+    todo = [config for config in configs if _key(config) not in done]
+    out = open(cache, 'a') if cache is not None else None
+    if(out is not None and not line.endswith('\n')):
+        # the last line was cut off by a crash, the next entry starts on its own line
+        out.write('\n')
+    try:
+        for config, metrics in _execute(model, todo, inputs, workers):
+            done[_key(config)] = metrics
+            if(out is not None):
+                out.write(json.dumps({'key': _key(config), 'config': config, 'metrics': metrics}) + '\n')
+                out.flush()
+    finally:
+        if(out is not None):
+            out.close()
+    rows = []
+    for config in configs:
+        row = dict(config) if isinstance(config, dict) else {'config': config}
+        row.update(done[_key(config)])
+        rows.append(row)
+    return rows
+
+
+def _execute(model, configs, inputs, workers):
+    # private function, generator of (config, metrics) of the configurations in the order of completion
+    if(len(configs) == 0):
+        return
+    if(workers == 0):
+        for config in configs:
+            yield config, _metrics(model(config, inputs))
+        return
+    blocks = []
+    specs  = {}
+    try:
+        for name, x in inputs.items():
+            x = numpy.ascontiguousarray(x)
+            shm = shared_memory.SharedMemory(create=True, size=max(x.nbytes, 1))
+            blocks.append(shm)
+            numpy.ndarray(x.shape, dtype=x.dtype, buffer=shm.buf)[...] = x
+            specs[name] = (shm.name, x.shape, x.dtype.str)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(specs,)) as pool:
+            tasks = {pool.submit(_run, model, config): config for config in configs}
+            error = None
+            for task in as_completed(tasks):
+                if(task.cancelled()):
+                    continue
+                if(task.exception() is not None):
+                    if(error is None):
+                        # pending configurations are cancelled, running ones still finish and their results are cached
+                        error = task.exception()
+                        for pending in tasks:
+                            pending.cancel()
+                    continue
+                yield tasks[task], task.result()
+        if(error is not None):
+            raise error
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+def table(rows, columns=None):
+    '''
+    public function
+    returns the result rows of sweep() as a printable table, columns default to all keys of the rows
+    '''
+    if(columns is None):
+        columns = []
+        for row in rows:
+            columns += [name for name in row if name not in columns]
+    text = [[str(name) for name in columns]]
+    for row in rows:
+        text.append([('%.6g' % row[name]) if isinstance(row.get(name), float) else str(row.get(name, '')) for name in columns])
+    widths = [max(len(line[i]) for line in text) for i in range(len(columns))]
+    return '\n'.join(' '.join(cell.rjust(width) for cell, width in zip(line, widths)) for line in text)
@@ -0,0 +1,56 @@
+#   Copyright:
+#       Copyright 2017 Ahmad RezazadehReyhani
+#
+#       Licensed under the Apache License, Version 2.0 (the "License");
+#       you may not use this file except in compliance with the License.
+#       You may obtain a copy of the License at
+#
+#          http://www.apache.org/licenses/LICENSE-2.0
+#
+#       Unless required by applicable law or agreed to in writing, software
+#       distributed under the License is distributed on an "AS IS" BASIS,
+#       WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#       See the License for the specific language governing permissions and
+#       limitations under the License.
+#
+#   Acknowledgment:
+#       Grateful appreciation to the Farhang Wireless Inc. for their support and generously funding the implementation of this library.
+#       http://farhangwireless.com/
+
+
+
+import numpy
+from fixedpointlib import FXP, dtype, modes
+from fixedpointcpp import trace
+
+templ = (1,14,dtype.fxp, modes.FIXEDWIDTH,True,True)
+acc   = (4,28,dtype.fxp, modes.FULL,False,False)
+taps  = [FXP(c, templ) for c in (0.125, 0.375, 0.375, 0.125)]
+
+def fir4(x, d1, d2, d3):
+    # one output sample of a 4 tap FIR filter, d1, d2 and d3 are the delay line registers
+    y = FXP(0, acc)
+    for v, h in zip((x, d1, d2, d3), taps):
+        y += v * h
+    return y.copy(templ), x, d1, d2
+
+prog = trace(fir4, [templ], state=[FXP(0, templ)]*3)
+print(prog.source())
+
+x  = numpy.sin(0.05*numpy.arange(100000))
+y1 = prog.run(x)
+y2 = prog.simulate(x[:1000])
+print(' run(x)[:8]      = ', y1[:8])
+print(' simulate(x)[:8] = ', y2[:8])
+print(' bit-exact       = ', numpy.array_equal(y1._val[:1000], y2._val))
+
+# exact products wider than 52 bits can not be computed in double, such models are rejected
+wide = (10,25,dtype.fxp, modes.FIXEDWIDTH,False,True)
+try:
+    trace(lambda x, y: x*y, [wide, wide])
+    print(' wide product    =  traced')
+except Exception as e:
+    print(' wide product    = ', e)
+prog = trace(lambda x, y: x*y, [(10,7,dtype.fxp, modes.FIXEDWIDTH,False,True), wide])
+x  = numpy.random.default_rng(0).uniform(-1000, 1000, (2, 20000))
+print(' 52-bit product  = ', numpy.array_equal(prog.run(x[0], x[1])._val, prog.simulate(x[0], x[1])._val))
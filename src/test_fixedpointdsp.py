@@ -0,0 +1,54 @@
+#   Copyright:
+#       Copyright 2017 Ahmad RezazadehReyhani
+#
+#       Licensed under the Apache License, Version 2.0 (the 'License');
+#       you may not use this file except in compliance with the License.
+#       You may obtain a copy of the License at
+#
+#          http://www.apache.org/licenses/LICENSE-2.0
+#
+#       Unless required by applicable law or agreed to in writing, software
+#       distributed under the License is distributed on an 'AS IS' BASIS,
+#       WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#       See the License for the specific language governing permissions and
+#       limitations under the License.
+#
+#   Acknowledgment:
+#       Grateful appreciation to the Farhang Wireless Inc. for their support and generously funding the implementation of this library.
+#       http://farhangwireless.com/
+
+
+import numpy
+from fixedpointlib import dtype, modes, quantize
+from fixedpointdsp import FIR, FFT, fir
+
+samples = quantize([0.5, -0.25, 0.125, 0.75, -1.0, 0.3], (0,7,dtype.fxp, modes.FULL,False,False))
+taps    = quantize([0.25, 0.5, 0.25], (0,7,dtype.fxp, modes.FULL,False,False))
+
+print(' samples          = ',samples)
+print(' taps             = ',taps)
+print(' fir full         = ',fir(samples, taps))
+print(' fir (1,7)        = ',fir(samples, taps, out_format=(1,7,dtype.fxp, modes.FULL,True,True)))
+
+f = FIR(taps, out_format=(1,7,dtype.fxp, modes.FULL,True,True))
+print(' fir streaming    = ',f(samples[:4]), f(samples[4:]))
+
+x = quantize([0.5, 0.25, -0.25, 0.125, 0.75, -0.5, 0.0, 0.375], (1,14,dtype.fxp, modes.FIXEDWIDTH,True,True))
+f = FFT(8, (1,14,dtype.fxp, modes.FIXEDWIDTH,True,True))
+yr, yi = f(x)
+print(' fft real         = ',yr)
+print(' fft imag         = ',yi)
+print(' fft overflows    = ',f.overflows)
+g = FFT(8, (1,14,dtype.fxp, modes.FIXEDWIDTH,True,True), shifts=[0,0,0], inverse=True)
+print(' ifft real        = ',g(yr, yi)[0])
+
+# full scale input, block floating point keeps headroom for the twiddle products
+rng = numpy.random.default_rng(1)
+x = quantize(rng.choice([-1.99, 1.99], size=16), (1,14,dtype.fxp, modes.FIXEDWIDTH,True,True))
+y = quantize(rng.choice([-1.99, 1.99], size=16), (1,14,dtype.fxp, modes.FIXEDWIDTH,True,True))
+f = FFT(16, (1,14,dtype.fxp, modes.FIXEDWIDTH,True,True), shifts='block')
+yr, yi = f(x, y)
+print(' block radix 2    = ',f.overflows, f.exponent)
+f = FFT(16, (1,14,dtype.fxp, modes.FIXEDWIDTH,True,True), shifts='block', radix=4)
+yr, yi = f(x, y)
+print(' block radix 4    = ',f.overflows, f.exponent)
@@ -0,0 +1,52 @@
+#   Copyright:
+#       Copyright 2017 Ahmad RezazadehReyhani
+#
+#       Licensed under the Apache License, Version 2.0 (the "License");
+#       you may not use this file except in compliance with the License.
+#       You may obtain a copy of the License at
+#
+#          http://www.apache.org/licenses/LICENSE-2.0
+#
+#       Unless required by applicable law or agreed to in writing, software
+#       distributed under the License is distributed on an "AS IS" BASIS,
+#       WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#       See the License for the specific language governing permissions and
+#       limitations under the License.
+#
+#   Acknowledgment:
+#       Grateful appreciation to the Farhang Wireless Inc. for their support and generously funding the implementation of this library.
+#       http://farhangwireless.com/
+
+
+
+import numpy
+from fixedpointlib import FXP, FXPArray, dtype, modes
+from fixedpointexpr import lazy
+
+templ = (3,12,dtype.fxp, modes.FIXEDWIDTH,True,True)
+x     = numpy.sin(0.1*numpy.arange(8))
+
+a = FXPArray(x, templ)
+b = FXPArray(x[::-1], templ)
+c = FXPArray(0.5*x, templ)
+d = FXP(-1.25, templ)
+e = FXPArray(0.25*x, templ)
+
+A, B, C, D, E = lazy(a, b, c, d, e)
+y = ((A*B) + (C*D)) - E
+
+print(y.table())
+print()
+print(' ((a*b) + (c*d)) - e          = ', ((a*b) + (c*d)) - e)
+print(' y.evaluate()                 = ', y.evaluate())
+
+a += 1
+print(' y.evaluate() after a += 1    = ', y.evaluate())
+print(' ((a*b) + (c*d)) - e          = ', ((a*b) + (c*d)) - e)
+
+# FULL mode keeps the exact sums, only the products of the lowest values are wrapped around
+full = (3,12,dtype.fxp, modes.FULL,False,False)
+P, Q = lazy(FXPArray(x, full), FXPArray(0.5*x, full))
+print()
+print((P*Q + P).table())
+print(' (p*q + p).evaluate()         = ', (P*Q + P).evaluate())
@@ -0,0 +1,67 @@
+#   Copyright:
+#       Copyright 2017 Ahmad RezazadehReyhani
+#
+#       Licensed under the Apache License, Version 2.0 (the "License");
+#       you may not use this file except in compliance with the License.
+#       You may obtain a copy of the License at
+#
+#          http://www.apache.org/licenses/LICENSE-2.0
+#
+#       Unless required by applicable law or agreed to in writing, software
+#       distributed under the License is distributed on an "AS IS" BASIS,
+#       WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#       See the License for the specific language governing permissions and
+#       limitations under the License.
+#
+#   Acknowledgment:
+#       Grateful appreciation to the Farhang Wireless Inc. for their support and generously funding the implementation of this library.
+#       http://farhangwireless.com/
+
+
+import os
+import tempfile
+import numpy
+from fixedpointlib import dtype, modes, quantize
+from fixedpointio import RawReader, RawWriter, load_raw, save_raw, save_hex, save_binary, pack, unpack
+
+adc  = quantize([0.5, -0.25, 0.999, -1.0, 0.125, 0.0, -0.5, 0.75], (0,11,dtype.fxp, modes.FULL,True,True))
+path = os.path.join(tempfile.mkdtemp(), 'adc.bin')
+
+save_raw(path, adc, container=numpy.int16)
+print(' int16 container  = ',load_raw(path, (0,11,dtype.fxp), container=numpy.int16))
+
+with RawWriter(path, (0,11,dtype.fxp), packed=True) as w:
+    w.write(adc[:3])
+    w.write(adc[3:])
+print(' packed bytes     = ',os.path.getsize(path))
+
+r = RawReader(path, (0,11,dtype.fxp), packed=True)
+print(' packed [2:6]     = ',r[2:6])
+print(' packed chunks    = ',[c for c in r.chunks(3)])
+
+print(' container        = ',adc._val.dtype)
+data = pack(adc)
+print(' pack             = ',len(data), 'bytes')
+print(' unpack           = ',unpack(data, adc, len(adc)))
+# words narrower than 8 bits with a full word of padding in the last byte, the sample count reads back the written words
+exact = True
+for width in range(1, 8):
+    for count in range(1, 9):
+        if((-count*width) % 8 < width):
+            continue
+        x = quantize(numpy.linspace(-1, 1, count), (0,width-1,dtype.fxp, modes.FULL,True,True))
+        save_raw(path, x, packed=True)
+        exact &= numpy.array_equal(load_raw(path, x, packed=True, n=count)._val, x._val)
+        exact &= len(RawReader(path, x, packed=True, n=count)) == count
+        exact &= numpy.array_equal(unpack(pack(x), x, count)._val, x._val)
+print(' padded widths    = ',exact, len(load_raw(path, x, packed=True)), 'words without n')
+empty = quantize(numpy.zeros(0), (10,10,dtype.fxp, modes.FIXEDWIDTH,True,True))
+print(' empty round trip = ',len(pack(empty)), 'bytes', unpack(pack(empty), empty).shape)
+
+print(' to_hex           = ',adc[:4].to_hex())
+print(' to_binary        = ',adc[:4].to_binary())
+
+save_hex(path, adc, prefix=False)
+print(' readmemh file    = ',open(path).read().split())
+save_binary(path, adc)
+print(' binary file      = ',open(path).read().split())
@@ -55,6 +55,47 @@ int main()
     cout << " 3 - var_3 = " << 3 - var_3 << " \n";
     cout << " 5 * var_3 = " << 5 * var_3 << " \n";
 
+    cout << "\n";
+
+    cout << " add(var_3, var_4, 4, 3) = " << _add(var_3, var_4, tuple(4,3,d_FXP, MANUAL,true,true)) << " \n";
+    cout << " sub(var_3, var_4, 6, 4) = " << _sub(var_3, var_4, tuple(6,4,d_FXP, MANUAL,false,false)) << " \n";
+    cout << " mul(var_3, var_4, 9, 2) = " << _mul(var_3, var_4, tuple(9,2,d_FXP, MANUAL,true,true)) << " \n";
+
+    cout << "\n";
+
+    // rounding of ties is half to even, same as fixedpointlib.py (2.5 -> 2, 3.5 -> 4, -2.5 -> -2, 0.375 -> 0.5 with 2 fractional bits)
+    cout << " round  2.5   = " << FXP( 2.5,   tuple(3,0,d_INT, FULL,false,true)) << " \n";
+    cout << " round  3.5   = " << FXP( 3.5,   tuple(3,0,d_INT, FULL,false,true)) << " \n";
+    cout << " round -2.5   = " << FXP(-2.5,   tuple(3,0,d_INT, FULL,false,true)) << " \n";
+    cout << " round  0.375 = " << FXP( 0.375, tuple(1,2,d_UFXP, FULL,false,true)) << " \n";
+    assert((FXP( 2.5,   tuple(3,0,d_INT, FULL,false,true)).val() ==  2.0));
+    assert((FXP( 3.5,   tuple(3,0,d_INT, FULL,false,true)).val() ==  4.0));
+    assert((FXP(-2.5,   tuple(3,0,d_INT, FULL,false,true)).val() == -2.0));
+    assert((FXP( 0.375, tuple(1,2,d_UFXP, FULL,false,true)).val() ==  0.5));
+
+    cout << "\n";
+
+    // saturation bounds of formats with intg or frac of 31 bits or more (4 - 2^-31 and -4 for 2 integer and 31 fractional bits)
+    cout << " sat  1000    = " << FXP( 1000.0, tuple(2,31,d_FXP, FULL,true,false)) << " \n";
+    cout << " sat -inf     = " << FXP(-inf,    tuple(2,31,d_FXP, FULL,true,false)) << " \n";
+    assert((FXP( 1000.0, tuple(2,31,d_FXP, FULL,true,false)).val() ==  4.0 - 1.0/2147483648.0));
+    assert((FXP(-inf,    tuple(2,31,d_FXP, FULL,true,false)).val() == -4.0));
+
+    cout << "\n";
+
+    // right shift keeps the value, the integer bits move to the fraction (7 >> 2 = 1.75 in 2 integer and 2 fractional bits)
+    FXP var_7  = FXP(7.0, tuple(4,0,d_FXP, FULL,false,false));
+    cout << " var_7 >> 2   = " << (var_7 >> 2) << " \n";
+    assert(((var_7 >> 2).val() == 1.75) && ((var_7 >> 2).intg == 2));
+
+    cout << "\n";
+
+    // wrap around of values beyond 2^63 raw words (2^45 + 3 wraps to 3 in 10 integer and 20 fractional bits)
+    cout << " wrap 2^45+3  = " << FXP(35184372088835.0, tuple(10,20,d_FXP, FULL,false,false)) << " \n";
+    cout << " wrap 2^45+3  = " << FXP(35184372088835.0, tuple(10,20,d_UFXP, FULL,false,false)) << " \n";
+    assert((FXP(35184372088835.0, tuple(10,20,d_FXP,  FULL,false,false)).val() == 3.0));
+    assert((FXP(35184372088835.0, tuple(10,20,d_UFXP, FULL,false,false)).val() == 3.0));
+
     return 0;
 }
 
@@ -18,7 +18,7 @@
 #       http://farhangwireless.com/
 
 
-from fixedpointlib import FXP, dtype, modes
+from fixedpointlib import FXP, FXPArray, CFXP, CFXPArray, dtype, modes, quantize
 
 FXP.debug(True)
 
@@ -55,3 +55,90 @@ print()
 print(' var_3 + 2 = ',var_3 + 2 )
 print(' 3 - var_3 = ',3 - var_3 )
 print(' 5 * var_3 = ',5 * var_3 )
+
+print()
+
+arr_1  = FXPArray([number1, number2, -0.5], var_3)
+
+print(' arr_1         = ',arr_1 )
+print(' arr_1 + var_4 = ',arr_1 + var_4 )
+print(' arr_1 * var_4 = ',arr_1 * var_4 )
+print(' 3 - arr_1     = ',3 - arr_1 )
+
+# saturation of a 54-bit unsigned format, hi is not exact in float64
+arr_5  = FXPArray([2.13e9, 1.5], (30,24,dtype.ufxp, modes.FIXEDWIDTH,True,False))
+print(' arr_5 raw     = ',arr_5._val, ' FXP raw = ', FXP(2.13e9, arr_5)._val )
+
+# saturated narrowing conversion with a left shift of the raw words, the shifted words must not overflow
+arr_6  = FXPArray([5.0e8, -5.0e8, 1.5], (30,0,dtype.int, modes.FULL,True,False))
+FXPArray.native(False)
+print(' arr_6 to 1.40  = ',arr_6.copy((1,40,dtype.fxp, modes.FULL,True,False))._val, ' FXP raw = ', [FXP(v, (1,40,dtype.fxp, modes.FULL,True,False))._val for v in arr_6.val()] )
+FXPArray.native(FXPArray._lib is not None)
+
+# NaN raises the same error as FXP(nan, template) on both paths
+for native in (False, True):
+    FXPArray.native(native)
+    try:
+        quantize([0.5, float('nan')], var_3, overflow=True)
+        print(' quantize nan   = ', 'no error')
+    except ValueError as e:
+        print(' quantize nan   = ', e)
+FXPArray.native(FXPArray._lib is not None)
+
+print()
+
+acc_1 = FXP(0, (12,6,dtype.fxp, modes.FIXEDWIDTH,False,False))
+for i in range(len(arr_1)):
+    FXP.mac(acc_1, arr_1[i], var_4)
+print(' mac(arr_1, var_4)      = ',acc_1 )
+acc_2 = FXP(0.0, (0,0,dtype.float, modes.FULL,False,False))
+FXP.mac(acc_2, FXP(0.5, (2,10,dtype.fxp, modes.FIXEDWIDTH,True,True)), FXP(0.25, (2,10,dtype.fxp, modes.FIXEDWIDTH,True,True)))
+print(' mac(float, 0.5, 0.25)  = ',acc_2, ' (0.125)' )
+acc_3 = FXPArray([0.0, 1.0], (0,0,dtype.float, modes.FULL,False,False))
+FXPArray.mac(acc_3, arr_1[:2], var_4)
+print(' mac(float arr, arr_1)  = ',acc_3, ' (', arr_1[:2].val() * var_4.val() + [0.0, 1.0], ')' )
+print(' dot(arr_1, arr_1)      = ',FXP.dot(arr_1, arr_1) )
+print(' dot(arr_1, arr_1, ...) = ',FXP.dot(list(arr_1), list(arr_1), (8,2,dtype.fxp, modes.FIXEDWIDTH,True,True)) )
+print(' sum(arr_1)             = ',FXP.sum(arr_1) )
+mat_1 = FXPArray([[number1, number2], [-0.5, 0.25]], var_3)
+print(' mat_1[1]               = ',mat_1[1] )
+print(' mat_1[1][0], mat_1[0,1]= ',mat_1[1][0], mat_1[0,1] )
+print(' rows of mat_1          = ',[row.shape for row in mat_1] )
+print(' sum(mat_1, axis=0)     = ',FXPArray.sum(mat_1, axis=0) )
+acc_1 *= 2
+print(' acc_1 *= 2             = ',acc_1 )
+arr_4 = arr_1.copy()
+FXPArray.mul(arr_1, var_4, out=arr_4)
+arr_4 += 1
+print(' arr_1 * var_4 + 1      = ',arr_4 )
+
+print()
+
+cvar_1 = CFXP(0.5-0.25j, (1,14,dtype.fxp, modes.FIXEDWIDTH,True,True))
+carr_1 = CFXPArray([0.7071+0.7071j, -0.5j, 0.25+0.125j], cvar_1.re)
+
+print(' cvar_1               = ',cvar_1 )
+print(' carr_1 * cvar_1      = ',carr_1 * cvar_1 )
+print(' carr_1.mul3(cvar_1)  = ',carr_1.mul3(cvar_1) )
+print(' carr_1.conj()        = ',carr_1.conj() )
+print(' carr_1.mag2()        = ',carr_1.mag2() )
+
+print()
+
+FXP.count(True)
+with FXP.signal('arr_1 * var_4'):
+    arr_2 = arr_1.mul(var_4, 2, 3, dtype.fxp, modes.MANUAL)
+var_5 = FXP(100.0, (2,3,dtype.fxp, modes.FULL,True,False))
+FXP.count(False)
+print(FXP.counters_table())
+
+print()
+
+FXP.shadow(True)
+with FXP.signal('arr_3'):
+    arr_3 = FXPArray([number1, number2, -0.5], var_3) * var_4
+with FXP.signal('int_3'):
+    int_3 = FXP(300, (3,0,dtype.int, modes.FULL,False,False)) + 3
+print(' arr_3 ideal   = ',arr_3.ideal() )
+FXP.shadow(False)
+print(FXP.errors_table())
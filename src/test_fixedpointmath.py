@@ -0,0 +1,54 @@
+#   Copyright:
+#       Copyright 2017 Ahmad RezazadehReyhani
+#
+#       Licensed under the Apache License, Version 2.0 (the 'License');
+#       you may not use this file except in compliance with the License.
+#       You may obtain a copy of the License at
+#
+#          http://www.apache.org/licenses/LICENSE-2.0
+#
+#       Unless required by applicable law or agreed to in writing, software
+#       distributed under the License is distributed on an 'AS IS' BASIS,
+#       WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#       See the License for the specific language governing permissions and
+#       limitations under the License.
+#
+#   Acknowledgment:
+#       Grateful appreciation to the Farhang Wireless Inc. for their support and generously funding the implementation of this library.
+#       http://farhangwireless.com/
+
+
+
+import numpy
+from fixedpointlib import dtype, modes, quantize
+from fixedpointmath import NCO, CORDIC, atan2, reciprocal, sqrt, cache_info
+
+templ = (1,14,dtype.fxp, modes.FIXEDWIDTH,True,True)
+angle = (2,13,dtype.fxp, modes.FIXEDWIDTH,True,True)
+
+nco = NCO(2**29, templ, phase_bits=32, lut_bits=10)
+c, s = nco(8)
+print(' nco cos          = ',c)
+print(' nco sin          = ',s)
+print(' nco phase        = ',nco.phase)
+
+x = quantize([0.5, -0.25, 0.75, -0.5], templ)
+y = quantize([0.25, 0.5, -0.125, -0.5], templ)
+z = quantize([0.5, -1.0, 3.0, -2.5], angle)
+f = CORDIC(16, angle)
+xr, yr = f.rotate(x, y, z)
+print(' cordic rotate x  = ',xr)
+print(' cordic rotate y  = ',yr)
+r, theta = f.vector(x, y)
+print(' cordic magnitude = ',r)
+print(' cordic angle     = ',theta)
+print(' atan2            = ',atan2(y, x, angle))
+print(' numpy atan2      = ',numpy.arctan2(y.val(), x.val()))
+
+d = quantize([0.3, -1.7, 5.25, 0.0078125], (3,12,dtype.fxp, modes.FIXEDWIDTH,True,True))
+print(' reciprocal       = ',reciprocal(d, (7,12,dtype.fxp, modes.FIXEDWIDTH,True,True)))
+print(' numpy 1/x        = ',1/d.val())
+u = quantize([0.3, 2.0, 5.25, 0.0078125], (3,12,dtype.ufxp, modes.FIXEDWIDTH,True,True))
+print(' sqrt             = ',sqrt(u, (2,14,dtype.ufxp, modes.FIXEDWIDTH,True,True)))
+print(' numpy sqrt       = ',numpy.sqrt(u.val()))
+print(' table caches     = ',cache_info())
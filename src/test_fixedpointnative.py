@@ -0,0 +1,96 @@
+#   Copyright:
+#       Copyright 2017 Ahmad RezazadehReyhani
+#
+#       Licensed under the Apache License, Version 2.0 (the "License");
+#       you may not use this file except in compliance with the License.
+#       You may obtain a copy of the License at
+#
+#          http://www.apache.org/licenses/LICENSE-2.0
+#
+#       Unless required by applicable law or agreed to in writing, software
+#       distributed under the License is distributed on an "AS IS" BASIS,
+#       WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#       See the License for the specific language governing permissions and
+#       limitations under the License.
+#
+#   Acknowledgment:
+#       Grateful appreciation to the Farhang Wireless Inc. for their support and generously funding the implementation of this library.
+#       http://farhangwireless.com/
+
+
+import numpy
+from fixedpointlib import FXP, FXPArray, dtype, modes
+
+# the same operations are computed with the native kernels of libfixedpointnative.so and with the numpy path,
+# raw words, containers and formats of the results must be equal
+rng = numpy.random.default_rng(10)
+
+
+def template(type, width):
+    # returns a random template of the given type with intg+frac = width
+    if(type == dtype.int or type == dtype.uint):
+        intg = width
+    else:
+        intg = int(rng.integers(0, width + 1))
+    return (intg, width - intg, type, [modes.FULL, modes.FIXEDFRAC, modes.FIXEDWIDTH][int(rng.integers(3))], bool(rng.integers(2)), bool(rng.integers(2)))
+
+
+def values(templ, n):
+    # returns n random values of the template, a quarter of them out of its range
+    m = 2.0**templ[0]
+    lo = 0 if templ[2] in (dtype.uint, dtype.ufxp) else -1.25*m
+    return rng.uniform(lo, 1.25*m, n)
+
+
+def operations(va, vb, ta, tb):
+    # returns the results of the kernels on the values va and vb quantized to the templates ta and tb
+    a = FXPArray(va, ta)
+    b = FXPArray(vb, tb)
+    out = FXPArray(numpy.zeros(len(va)), ta)
+    return [('quantize', a),
+            ('requantize', a.copy(tb)),
+            ('add', a + b),
+            ('sub', FXPArray.sub(a, b, tb[0], tb[1], dtype.fxp)),
+            ('mul', a * b),
+            ('mul templ', FXPArray.mul(a, b, ta[0], ta[1], ta[2], ta[3], ta[4], ta[5])),
+            ('add out', FXPArray.add(a, b, out=out))]
+
+
+cases, mismatches = 0, 0
+for compact in (True, False):
+    FXPArray.compact(compact)
+    for k in range(400):
+        signed = bool(rng.integers(2))
+        fixed  = bool(rng.integers(2))
+        type   = {(True, True): dtype.fxp, (True, False): dtype.int, (False, True): dtype.ufxp, (False, False): dtype.uint}[(signed, fixed)]
+        wa = int(rng.integers(1, 60))
+        wb = int(rng.integers(1, 61 - wa + 1)) if wa < 60 else 1
+        ta = template(type, wa)
+        tb = template(type, wb)[:3] + ta[3:]
+        va, vb = values(ta, 64), values(tb, 64)
+        results = []
+        for native in (False, True):
+            FXPArray.native(native)
+            results.append(operations(va, vb, ta, tb))
+        for (name, x), (_, y) in zip(*results):
+            cases += 1
+            if(x.fmt is not y.fmt or x._val.dtype != y._val.dtype or not numpy.array_equal(x._val, y._val)):
+                mismatches += 1
+                print(' mismatch         = ', name, ta, tb, compact)
+FXPArray.compact(True)
+FXPArray.native(FXPArray._lib is not None)
+
+# saturated narrowing conversion with a left shift of the raw words, both paths must agree with scalar FXP objects
+templ = (1, 30, dtype.fxp, modes.FULL, True, False)
+wide  = FXPArray([6.0e11, -6.0e11, 1.5], (40, 0, dtype.int, modes.FULL, True, False))
+expected = [FXP(v, templ)._val for v in wide.val()]
+for native in (False, True):
+    FXPArray.native(native)
+    cases += 1
+    if(wide.copy(templ)._val.tolist() != expected):
+        mismatches += 1
+        print(' mismatch         = ', 'saturated requantize', 'native' if native else 'numpy')
+FXPArray.native(FXPArray._lib is not None)
+
+print(' native kernels   = ', 'built' if FXPArray._lib is not None else 'not built, both runs use numpy')
+print(' native vs numpy  = ', cases, 'cases checked,', mismatches, 'mismatches')
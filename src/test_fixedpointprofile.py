@@ -0,0 +1,34 @@
+#   Copyright:
+#       Copyright 2017 Ahmad RezazadehReyhani
+#
+#       Licensed under the Apache License, Version 2.0 (the "License");
+#       you may not use this file except in compliance with the License.
+#       You may obtain a copy of the License at
+#
+#          http://www.apache.org/licenses/LICENSE-2.0
+#
+#       Unless required by applicable law or agreed to in writing, software
+#       distributed under the License is distributed on an "AS IS" BASIS,
+#       WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#       See the License for the specific language governing permissions and
+#       limitations under the License.
+#
+#   Acknowledgment:
+#       Grateful appreciation to the Farhang Wireless Inc. for their support and generously funding the implementation of this library.
+#       http://farhangwireless.com/
+
+
+import numpy
+from fixedpointlib import FXPArray, dtype, modes
+from fixedpointprofile import Profiler
+
+flt  = (0,0,dtype.float, None,None,None)
+prof = Profiler()
+x    = numpy.sin(2*numpy.pi*0.01*numpy.arange(1000))
+
+for k in range(0, 1000, 100):
+    a = prof('a', FXPArray(x[k:k+100], flt))
+    b = prof('a*a*3', a*a*3)
+
+print(prof.table(overflow=0, sqnr=40, round=True))
+print(prof.emit(overflow=0, sqnr=40, opmode=modes.FIXEDWIDTH, sat=True, round=True))
@@ -0,0 +1,50 @@
+#   Copyright:
+#       Copyright 2017 Ahmad RezazadehReyhani
+#
+#       Licensed under the Apache License, Version 2.0 (the 'License');
+#       you may not use this file except in compliance with the License.
+#       You may obtain a copy of the License at
+#
+#          http://www.apache.org/licenses/LICENSE-2.0
+#
+#       Unless required by applicable law or agreed to in writing, software
+#       distributed under the License is distributed on an 'AS IS' BASIS,
+#       WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#       See the License for the specific language governing permissions and
+#       limitations under the License.
+#
+#   Acknowledgment:
+#       Grateful appreciation to the Farhang Wireless Inc. for their support and generously funding the implementation of this library.
+#       http://farhangwireless.com/
+
+
+import numpy
+from fixedpointlib import dtype, modes, quantize
+from fixedpointstream import Pipeline, Quantize, Filter, Mix, Decimate, Requantize
+
+x    = numpy.cos(2*numpy.pi*0.2*numpy.arange(64))
+taps = quantize([0.125, 0.375, 0.375, 0.125], (1,14,dtype.fxp, modes.FIXEDWIDTH,True,True))
+
+p = Pipeline(Quantize((0,11,dtype.fxp, modes.FIXEDWIDTH,True,True)),
+             Mix(-0.2, (1,14,dtype.fxp, modes.FIXEDWIDTH,True,True)),
+             Filter(taps, out_format=(1,14,dtype.fxp, modes.FIXEDWIDTH,True,True)),
+             Decimate(4),
+             Requantize((0,7,dtype.fxp, modes.FIXEDWIDTH,True,True)))
+
+y = p(x, chunk_size=64)
+p.reset()
+z = p(x, chunk_size=5)
+
+print(' one chunk        = ',y)
+print(' chunks of 5      = ',z)
+print(' bit-exact        = ',(y.re._val == z.re._val).all() and (y.im._val == z.im._val).all())
+p.reset()
+print(' empty capture    = ',p(x[:0], chunk_size=5))
+
+# offset longer than the chunks
+d = Pipeline(Quantize((0,11,dtype.fxp, modes.FIXEDWIDTH,True,True)), Decimate(4, offset=10))
+y = d(x[:40], chunk_size=40)
+d.reset()
+z = d(x[:40], chunk_size=5)
+print(' offset 10        = ',y)
+print(' bit-exact        = ',len(y) == len(z) and (y._val == z._val).all())
@@ -0,0 +1,62 @@
+#   Copyright:
+#       Copyright 2017 Ahmad RezazadehReyhani
+#
+#       Licensed under the Apache License, Version 2.0 (the "License");
+#       you may not use this file except in compliance with the License.
+#       You may obtain a copy of the License at
+#
+#          http://www.apache.org/licenses/LICENSE-2.0
+#
+#       Unless required by applicable law or agreed to in writing, software
+#       distributed under the License is distributed on an "AS IS" BASIS,
+#       WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#       See the License for the specific language governing permissions and
+#       limitations under the License.
+#
+#   Acknowledgment:
+#       Grateful appreciation to the Farhang Wireless Inc. for their support and generously funding the implementation of this library.
+#       http://farhangwireless.com/
+
+
+import json
+import os
+import tempfile
+import numpy
+from fixedpointlib import FXPArray, dtype, modes
+from fixedpointsweep import grid, sweep, table
+
+
+def product_sqnr(config, inputs):
+    # SQNR of the product of two quantized signals
+    templ = (config['intg'], config['frac'], dtype.fxp, modes.FIXEDWIDTH, config['sat'], config['round'])
+    x, h  = inputs['x'], inputs['h']
+    e = (FXPArray(x, templ) * FXPArray(h, templ)).val() - x*h
+    return {'sqnr': 10*numpy.log10(numpy.mean((x*h)**2) / numpy.mean(e**2))}
+
+
+def failing_sqnr(config, inputs):
+    # product_sqnr which raises for the first configuration
+    if(config['frac'] == 7 and config['intg'] == 0 and not config['round']):
+        raise ValueError('failed configuration')
+    return product_sqnr(config, inputs)
+
+
+if __name__ == '__main__':
+    inputs = {'x': numpy.sin(0.01*numpy.arange(10000)), 'h': numpy.cos(0.03*numpy.arange(10000))}
+    rows = sweep(product_sqnr, grid(intg=[0, 1], frac=[7, 11], sat=[True], round=[False, True]), inputs, workers=2)
+    print(table(rows))
+
+    # a failing configuration stops the sweep, finished configurations stay in the cache after a line cut off by a crash
+    cache = os.path.join(tempfile.mkdtemp(), 'sweep.jsonl')
+    with open(cache, 'w') as f:
+        f.write('{"key": "cut off')
+    configs = grid(intg=[0, 1], frac=[7, 11], sat=[True], round=[False, True])
+    try:
+        sweep(failing_sqnr, configs, inputs, cache=cache, workers=2)
+    except ValueError as e:
+        print(' failed sweep     = ', e)
+    cached = [json.loads(line) for line in open(cache).readlines()[1:]]
+    # the number of cached results depends on the timing of the workers, all of them are finished configurations
+    print(' cached results   = ', all(entry['config'] in configs and entry['config'] != configs[0] for entry in cached))
+    rows = sweep(product_sqnr, configs, inputs, cache=cache, workers=0)
+    print(' resumed sweep    = ', len(rows), 'rows')
@@ -27,3 +27,53 @@ echo
 echo
 echo "Executing test_fixedpointlib.py"
 python3 ../src/test_fixedpointlib.py
+
+echo
+echo
+echo "Executing test_fixedpointnative.py"
+python3 ../src/test_fixedpointnative.py
+
+echo
+echo
+echo "Executing test_fixedpointdsp.py"
+python3 ../src/test_fixedpointdsp.py
+
+echo
+echo
+echo "Executing test_fixedpointmath.py"
+python3 ../src/test_fixedpointmath.py
+
+echo
+echo
+echo "Executing test_fixedpointstream.py"
+python3 ../src/test_fixedpointstream.py
+
+echo
+echo
+echo "Executing test_fixedpointio.py"
+python3 ../src/test_fixedpointio.py
+
+echo
+echo
+echo "Executing test_fixedpointprofile.py"
+python3 ../src/test_fixedpointprofile.py
+
+echo
+echo
+echo "Executing test_fixedpointsweep.py"
+python3 ../src/test_fixedpointsweep.py
+
+echo
+echo
+echo "Executing test_fixedpointexpr.py"
+python3 ../src/test_fixedpointexpr.py
+
+echo
+echo
+echo "Executing test_fixedpointcpp.py"
+python3 ../src/test_fixedpointcpp.py
+
+echo
+echo
+echo "Executing conformance_fixedpointlib.py"
+python3 ../src/conformance_fixedpointlib.py --cases 200000